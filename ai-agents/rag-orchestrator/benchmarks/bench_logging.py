@@ -0,0 +1,88 @@
+"""
+Hot-path Logging Benchmark
+
+Measures the time a request thread spends in logging calls per record:
+1. Synchronous StreamHandler with eager f-string messages (previous setup)
+2. Queue handler with lazy %-args and JSON formatting on the listener thread
+
+Output goes to a file (default: /dev/null); --write-latency-us simulates a
+slow stdout pipe (e.g. a busy log shipper), which is where a synchronous
+handler stalls the request thread.
+
+Usage: python benchmarks/bench_logging.py [--records 20000] [--write-latency-us 50]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import structured_logging  # noqa: E402
+
+
+class SlowStream:
+    """File wrapper whose writes block for a fixed time, like a backed-up pipe"""
+
+    def __init__(self, stream, latency_s: float):
+        self.stream = stream
+        self.latency_s = latency_s
+
+    def write(self, text: str):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def run(logger: logging.Logger, records: int, lazy: bool) -> float:
+    """Microseconds per call spent in the caller's thread"""
+    timings = {'embed': 41.2, 'retrieve': 12.7}
+    start = time.perf_counter()
+    for i in range(records):
+        if lazy:
+            logger.info("Retrieved %d similar cases for complaint %s", 5, i)
+        else:
+            logger.info(f"Retrieved {5} similar cases for complaint {i} ({timings})")
+    return (time.perf_counter() - start) * 1e6 / records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronous vs. queued logging cost per call")
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--output', default=os.devnull)
+    parser.add_argument('--write-latency-us', type=float, default=50.0)
+    args = parser.parse_args()
+
+    sink = SlowStream(open(args.output, 'w'), args.write_latency_us / 1e6)
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger.handlers = [handler]
+    sync_us = run(logger, args.records, lazy=False)
+
+    structured_logging.configure_logging({'LOG_QUEUE_SIZE': str(args.records * 2)})
+    structured_logging._listener.handlers[0].setStream(sink)
+    logger.handlers = logging.getLogger().handlers
+    with structured_logging.request_context(complaint_id='bench', stage_timings={'embed': 41.2}):
+        queued_us = run(logger, args.records, lazy=True)
+    drain_start = time.perf_counter()
+    structured_logging.shutdown_logging()
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+
+    print(f"records={args.records} write_latency={args.write_latency_us:.0f}us")
+    print(f"{'mode':<30} {'us/call':>9}")
+    print(f"{'sync StreamHandler, f-string':<30} {sync_us:>9.2f}")
+    print(f"{'queued JSON, lazy args':<30} {queued_us:>9.2f}")
+    print(f"listener drained the backlog in {drain_ms:.0f}ms (off the request thread)")
+
+
+if __name__ == '__main__':
+    main()
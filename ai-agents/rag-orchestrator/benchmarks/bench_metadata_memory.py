@@ -0,0 +1,133 @@
+"""
+Case Metadata Memory Benchmark
+
+Measures peak Python heap (tracemalloc) for one request's retrieval ->
+prompt -> response path when cited cases carry megabyte-sized legacy
+metadata, with and without source filtering, allow-lists and the size cap.
+
+Source filtering happens server-side in OpenSearch; here it is simulated
+by encoding only the allow-listed fields into the search response bytes.
+
+Usage: python benchmarks/bench_metadata_memory.py [--metadata-mb 2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from case_metadata import MetadataPolicy, cap_metadata, project  # noqa: E402
+from models import HistoricalCase, ResolutionRecommendation  # noqa: E402
+from prompts import build_recommendation_prompt  # noqa: E402
+from serialization import dumps  # noqa: E402
+
+CASES_PER_REQUEST = 5
+EMBEDDING_DIM = 1536
+
+
+def make_source(n: int, metadata_mb: float) -> dict:
+    """A legacy case document: a few small fields plus a huge audit trail"""
+    entry = 'x' * 1000
+    return {
+        'case_id': f'case-{n}',
+        'complaint_type': 'billing',
+        'complaint_summary': 'Customer charged twice for the same order',
+        'resolution': 'Refund applied',
+        'outcome': 'resolved',
+        'embedding': [0.001 * i for i in range(EMBEDDING_DIM)],
+        'metadata': {
+            'channel': 'phone',
+            'product': 'checking',
+            'region': 'us-east',
+            'audit_log': [entry] * int(metadata_mb * 1000),
+        },
+    }
+
+
+def filter_source(source: dict, policy: MetadataPolicy) -> dict:
+    """What OpenSearch returns for `_source.includes = policy.source_includes()`"""
+    filtered = {}
+    for path in policy.source_includes():
+        if path.startswith('metadata.'):
+            name = path.split('.', 1)[1]
+            if name in source['metadata']:
+                filtered.setdefault('metadata', {})[name] = source['metadata'][name]
+        elif path in source:
+            filtered[path] = source[path]
+    return filtered
+
+
+def search_response(sources: list[dict]) -> bytes:
+    hits = [{'_index': 'historical-cases', '_score': 0.9, '_source': source} for source in sources]
+    return json.dumps({'hits': {'hits': hits}}).encode('utf-8')
+
+
+def run_request(response_bytes: bytes, policy: MetadataPolicy) -> int:
+    """Decode hits, build cases, prompt and response; returns response size"""
+    cases = []
+    for hit in json.loads(response_bytes)['hits']['hits']:
+        source = hit['_source']
+        metadata, truncated = cap_metadata(source.get('metadata', {}), policy.max_bytes)
+        cases.append(HistoricalCase(
+            case_id=source['case_id'],
+            complaint_type=source['complaint_type'],
+            resolution=source['resolution'],
+            outcome=source['outcome'],
+            embedding=source.get('embedding', []),
+            similarity_score=hit['_score'],
+            metadata=metadata,
+            metadata_truncated=truncated,
+        ))
+
+    prompt = build_recommendation_prompt('Charged twice', cases, policy.prompt_fields)
+    cited = tuple(
+        HistoricalCase(c.case_id, c.complaint_type, c.resolution, c.outcome, c.embedding,
+                       c.similarity_score, project(c.metadata, policy.response_fields), c.metadata_truncated)
+        for c in cases
+    )
+    recommendation = ResolutionRecommendation(
+        id='rec-1', complaint_id='complaint-1', recommendations=[], primary_recommendation='Refund fee',
+        confidence_score=0.8, cited_cases=cited, reasoning=prompt[:100], created_at='2024-01-01T00:00:00',
+        processing_time_ms=0.0,
+    )
+    return len(dumps(recommendation))
+
+
+def measure(label: str, sources: list[dict], policy: MetadataPolicy, filtered: bool) -> None:
+    if filtered:
+        sources = [filter_source(source, policy) for source in sources]
+    response_bytes = search_response(sources)
+
+    tracemalloc.start()
+    response_size = run_request(response_bytes, policy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<34} {len(response_bytes) / 1e6:>10.2f} {peak / 1e6:>10.2f} {response_size / 1e3:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the metadata path per request")
+    parser.add_argument('--metadata-mb', type=float, default=2.0, help="Metadata size per cited case")
+    args = parser.parse_args()
+
+    sources = [make_source(n, args.metadata_mb) for n in range(CASES_PER_REQUEST)]
+    unbounded = MetadataPolicy(max_bytes=1 << 40)
+    capped = MetadataPolicy(max_bytes=4096)
+    allow_listed = MetadataPolicy(
+        prompt_fields=('channel', 'product'),
+        response_fields=('channel', 'product', 'region'),
+        max_bytes=4096,
+    )
+
+    print(f"{'mode':<34} {'search MB':>10} {'peak MB':>10} {'response KB':>12}")
+    measure('unbounded (previous behaviour)', sources, unbounded, filtered=False)
+    measure('size cap only', sources, capped, filtered=False)
+    measure('source filtering + allow-lists', sources, allow_listed, filtered=True)
+
+
+if __name__ == '__main__':
+    main()
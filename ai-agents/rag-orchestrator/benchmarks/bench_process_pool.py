@@ -0,0 +1,96 @@
+"""
+Process-pool CPU Stage Benchmark
+
+Measures batch throughput as the number of worker processes grows. I/O
+stages are simulated with sleeps (SageMaker, OpenSearch, Bedrock latency);
+the CPU stages (prompt assembly over large case metadata, response
+parsing, serialization) are the real implementations.
+
+Usage: python benchmarks/bench_process_pool.py [num_items]
+"""
+
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models import HistoricalCase  # noqa: E402
+from case_metadata import MetadataPolicy  # noqa: E402
+from parallel_pipeline import ProcessPoolBatchRunner  # noqa: E402
+
+EMBED_LATENCY = 0.005
+RETRIEVE_LATENCY = 0.005
+LLM_LATENCY = 0.02
+
+
+class SimulatedOrchestrator:
+    """Stand-in with fixed I/O latency and realistically sized payloads"""
+
+    def __init__(self):
+        rng = random.Random(3)
+        # Default policy: all (capped) metadata reaches prompts and responses
+        self.metadata_policy = MetadataPolicy()
+        self.cases = [
+            HistoricalCase(
+                case_id=f'case-{n}',
+                complaint_type='billing',
+                resolution='Refund applied and fee waived ' * 4,
+                outcome='resolved',
+                embedding=[rng.random() for _ in range(1536)],
+                similarity_score=0.9 - n * 0.01,
+                metadata={f'field_{k}': 'value ' * 20 for k in range(100)},
+            )
+            for n in range(5)
+        ]
+        self.response = '{"recommendations": [%s], "primary": "Refund", "confidence": 0.9, "reasoning": "%s"}' % (
+            ', '.join('{"rank": %d, "resolution": "%s"}' % (r, 'x' * 400) for r in (1, 2, 3)),
+            'because ' * 300,
+        )
+
+    def _generate_embedding(self, text):
+        time.sleep(EMBED_LATENCY)
+        return [0.1] * 1536
+
+    def _retrieve_similar_cases(self, embedding, top_k=5, tenant_id=None, filters=None):
+        time.sleep(RETRIEVE_LATENCY)
+        return self.cases[:top_k]
+
+    def _call_bedrock_metered(self, prompt, priority=None, tenant_id=None, complaint_type=None):
+        time.sleep(LLM_LATENCY)
+        return self.response, {'model_id': 'simulated', 'input_tokens': len(prompt) // 4, 'output_tokens': 400}
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    items = [
+        SimpleNamespace(
+            complaint_id=f'c-{i}',
+            complaint_summary='Charged twice ' * 50,
+            tenant_id=None,
+            filters=None,
+            complaint_type='billing',
+        )
+        for i in range(num_items)
+    ]
+    orchestrator = SimulatedOrchestrator()
+
+    cpu_count = os.cpu_count() or 1
+    process_counts = sorted({0, 1, 2, 4, cpu_count} - {p for p in (2, 4) if p > cpu_count})
+
+    print(f"{num_items} items, {cpu_count} cores")
+    print(f"{'processes':>10} {'seconds':>8} {'items/s':>9}")
+    for processes in process_counts:
+        runner = ProcessPoolBatchRunner(orchestrator, processes=processes, io_concurrency=64, chunk_size=32)
+        start = time.perf_counter()
+        results = runner.run(items)
+        elapsed = time.perf_counter() - start
+        assert len(results) == num_items
+        label = 'inline' if processes == 0 else str(processes)
+        print(f"{label:>10} {elapsed:>8.2f} {num_items / elapsed:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
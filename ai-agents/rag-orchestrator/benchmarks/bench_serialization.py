@@ -0,0 +1,79 @@
+"""
+Serialization Micro-benchmark
+
+Compares the previous response path (`dataclasses.asdict` + `json.dumps`)
+with the direct serializer at batch sizes of 1, 100 and 10k
+recommendations, each citing five cases with 1536-d embeddings.
+
+Usage: python benchmarks/bench_serialization.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import serialization  # noqa: E402
+from models import HistoricalCase, ResolutionRecommendation  # noqa: E402
+
+BATCH_SIZES = (1, 100, 10000)
+CASES_PER_RECOMMENDATION = 5
+EMBEDDING_DIM = 1536
+
+
+def make_recommendation(i: int, cases: tuple) -> ResolutionRecommendation:
+    return ResolutionRecommendation(
+        id=f'rec-{i}',
+        complaint_id=f'complaint-{i}',
+        recommendations=[{'rank': r, 'resolution': 'Refund fee', 'expectedOutcome': 'Resolved'} for r in (1, 2, 3)],
+        primary_recommendation='Refund fee',
+        confidence_score=0.87,
+        cited_cases=cases,
+        reasoning='Similar to prior billing disputes.',
+        created_at='2024-01-01T00:00:00',
+        processing_time_ms=1234.5,
+        stage_timings_ms={'embed': 40.0, 'retrieve': 25.0, 'prompt': 0.3, 'llm': 1150.0, 'parse': 0.2},
+    )
+
+
+def make_cases() -> tuple:
+    rng = random.Random(7)
+    return tuple(
+        HistoricalCase(
+            case_id=f'case-{n}',
+            complaint_type='billing',
+            resolution='Refund applied',
+            outcome='resolved',
+            embedding=[rng.random() for _ in range(EMBEDDING_DIM)],
+            similarity_score=0.9 - n * 0.01,
+            metadata={'channel': 'phone', 'tags': ['fee', 'refund']},
+        )
+        for n in range(CASES_PER_RECOMMENDATION)
+    )
+
+
+def timed(fn, batch) -> float:
+    start = time.perf_counter()
+    for recommendation in batch:
+        fn(recommendation)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    cases = make_cases()
+    print(f"orjson available: {serialization.orjson is not None}")
+    print(f"{'batch':>8} {'asdict+json (ms)':>18} {'direct (ms)':>12} {'speedup':>8}")
+
+    for size in BATCH_SIZES:
+        batch = [make_recommendation(i, cases) for i in range(size)]
+        baseline = timed(lambda r: json.dumps(asdict(r)), batch)
+        direct = timed(serialization.dumps, batch)
+        print(f"{size:>8} {baseline:>18.1f} {direct:>12.1f} {baseline / direct:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
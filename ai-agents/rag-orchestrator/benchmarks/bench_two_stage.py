@@ -0,0 +1,104 @@
+"""
+Two-stage Retrieval Benchmark
+
+Compares the current single-stage query (exact search over full 1536-d
+vectors) with two-stage retrieval (exact search over the truncated,
+re-normalized prefix, then NumPy rescoring of the candidates with full
+vectors). Reports per-query latency and recall@k against single-stage.
+
+Both stages are brute force in NumPy, so the numbers show the compute and
+candidate-size trade-off; an OpenSearch HNSW index adds graph and network
+costs that scale with dimension the same way. The rescoring measured here is
+TWO_STAGE_RESCORE=client; it leaves out the cost of fetching every
+candidate's full embedding, which the default server-side rescore avoids.
+Compare the two modes on a live cluster by running `evaluation.py --opensearch`
+once with each TWO_STAGE_RESCORE value.
+
+The synthetic corpus has a decaying spectrum (leading dimensions carry most
+of the variance), as Matryoshka-trained embeddings do. Pass --corpus with a
+JSONL export (see evaluation.py) to measure real embeddings instead.
+
+Usage: python benchmarks/bench_two_stage.py [--corpus cases.jsonl] [--dims 128,256,512]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models import HistoricalCase  # noqa: E402
+from two_stage_retrieval import rescore_cases  # noqa: E402
+
+EMBEDDING_DIM = 1536
+
+
+def synthetic_corpus(size: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    spectrum = np.exp(-np.arange(EMBEDDING_DIM) / 300.0).astype(np.float32)
+    return rng.standard_normal((size, EMBEDDING_DIM), dtype=np.float32) * spectrum
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-stage vs. two-stage retrieval")
+    parser.add_argument('--corpus', help="JSONL of cases with embeddings (default: synthetic)")
+    parser.add_argument('--size', type=int, default=50000, help="Synthetic corpus size")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--dims', default='128,256,512')
+    parser.add_argument('--candidates', default='50,100,200')
+    args = parser.parse_args()
+
+    if args.corpus:
+        from evaluation import load_corpus
+        vectors = np.asarray([case.embedding for case in load_corpus(args.corpus)], dtype=np.float32)
+    else:
+        vectors = synthetic_corpus(args.size)
+    full = normalize(vectors)
+    cases = [
+        HistoricalCase(str(i), '', '', '', row, 0.0, {})
+        for i, row in enumerate(full.tolist())
+    ]
+
+    rng = np.random.default_rng(11)
+    picks = rng.choice(len(full), size=args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, full.shape[1]), dtype=np.float32) * 0.02
+    queries = normalize(full[picks] + noise)
+
+    start = time.perf_counter()
+    truth = [set(top_k(full, query, args.k).tolist()) for query in queries]
+    baseline_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"corpus={len(full)} queries={len(queries)} k={args.k}")
+    print(f"{'mode':<26} {'ms/query':>9} {'recall@k':>9}")
+    print(f"{'single-stage 1536-d':<26} {baseline_ms:>9.2f} {1.0:>9.3f}")
+
+    for dim in (int(d) for d in args.dims.split(',')):
+        truncated = normalize(full[:, :dim])
+        for candidates in (int(c) for c in args.candidates.split(',')):
+            hits = 0
+            start = time.perf_counter()
+            for query, relevant in zip(queries, truth):
+                first_pass = top_k(truncated, normalize(query[:dim]), candidates)
+                ranked = rescore_cases(query.tolist(), [cases[i] for i in first_pass], args.k)
+                hits += len(relevant & {int(case.case_id) for case in ranked})
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            label = f"two-stage {dim}-d, C={candidates}"
+            print(f"{label:<26} {elapsed_ms:>9.2f} {hits / (len(queries) * args.k):>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Bedrock Batch Inference for Backfills
+
+Runs recommendations for large non-interactive backlogs through Bedrock
+Batch Inference instead of on-demand `invoke_model` calls:
+1. Retrieve cases and build prompts with the orchestrator's own steps
+2. Write the Bedrock request bodies as a JSONL job file keyed by complaint ID
+3. Submit a model invocation job and poll until it finishes
+4. Map outputs back to complaint IDs through `_parse_llm_response`
+
+Bedrock requires a minimum number of records per job (100 for most
+models); smaller backlogs should use the on-demand path.
+
+Usage:
+    python batch_inference.py --input complaints.jsonl --bucket my-bucket --role-arn arn:aws:iam::...
+    python batch_inference.py --input complaints.jsonl --executor process
+
+`--executor` runs the backlog on-demand instead of as a batch job: `thread`
+keeps the CPU stages on the event loop thread, `process` moves them to a
+process pool (see parallel_pipeline.py), and `staged` runs each step as its
+own stage with `--stage-workers` threads (see stage_pipeline.py).
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+import logging
+
+import boto3
+
+from serialization import dumps
+from token_accounting import ModelPricing
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {'Completed', 'PartiallyCompleted', 'Failed', 'Stopped', 'Expired'}
+MAX_RECORDS_PER_JOB = 50000
+# Batch inference is billed at half the on-demand token price
+BATCH_PRICE_FACTOR = 0.5
+
+
+@dataclass
+class BatchItem:
+    """One complaint to process in a batch job"""
+    complaint_id: str
+    complaint_summary: str
+    tenant_id: Optional[str] = None
+    filters: Optional[dict] = None
+    complaint_type: Optional[str] = None
+
+
+@dataclass
+class PreparedBatch:
+    """Job records plus the retrieval context needed to map outputs back"""
+    job_name: str
+    records: list = field(default_factory=list)
+    cases: dict = field(default_factory=dict)
+    prepare_ms: dict = field(default_factory=dict)
+    items: dict = field(default_factory=dict)
+
+    def to_jsonl(self) -> bytes:
+        return b''.join(json.dumps(record).encode('utf-8') + b'\n' for record in self.records)
+
+
+class BatchInferencePipeline:
+    """Builds, submits and collects Bedrock batch inference jobs"""
+
+    def __init__(
+        self,
+        orchestrator,
+        bucket: str,
+        role_arn: str,
+        prefix: str = 'batch-inference',
+        bedrock_control=None,
+        s3=None,
+        usage_aggregator=None,
+        token_budgets=None,
+    ):
+        region = os.getenv('AWS_REGION', 'us-east-1')
+        self.orchestrator = orchestrator
+        self.bucket = bucket
+        self.role_arn = role_arn
+        self.prefix = prefix.strip('/')
+        self.bedrock_control = bedrock_control or boto3.client('bedrock', region_name=region)
+        self.s3 = s3 or boto3.client('s3', region_name=region)
+        self.pricing = ModelPricing.from_env(os.environ)
+        # The orchestrator's accounting, so batch tokens show up next to on-demand ones
+        self.usage_aggregator = usage_aggregator
+        self.token_budgets = token_budgets
+
+    def prepare(self, items: list[BatchItem], job_name: str) -> PreparedBatch:
+        """Retrieve context and build one Bedrock request body per complaint"""
+        prepared = PreparedBatch(job_name=job_name)
+        for item in items:
+            start = time.perf_counter()
+            embedding = self.orchestrator._generate_embedding(item.complaint_summary)
+            cases = self.orchestrator._retrieve_similar_cases(
+                embedding, top_k=5, tenant_id=item.tenant_id, filters=item.filters
+            )
+            prompt = self.orchestrator._build_recommendation_prompt(item.complaint_summary, cases)
+
+            model_input = self.orchestrator._build_bedrock_request(prompt)
+            prepared.records.append({"recordId": item.complaint_id, "modelInput": model_input})
+            prepared.cases[item.complaint_id] = cases
+            prepared.prepare_ms[item.complaint_id] = (time.perf_counter() - start) * 1000
+            prepared.items[item.complaint_id] = item
+        return prepared
+
+    def submit(self, prepared: PreparedBatch) -> str:
+        """Upload the job file and start the model invocation job; returns the job ARN"""
+        input_key = f"{self.prefix}/input/{prepared.job_name}.jsonl"
+        self.s3.put_object(Bucket=self.bucket, Key=input_key, Body=prepared.to_jsonl())
+
+        response = self.bedrock_control.create_model_invocation_job(
+            jobName=prepared.job_name,
+            roleArn=self.role_arn,
+            modelId=self.orchestrator.model_id,
+            inputDataConfig={
+                's3InputDataConfig': {'s3Uri': f"s3://{self.bucket}/{input_key}", 's3InputFormat': 'JSONL'}
+            },
+            outputDataConfig={
+                's3OutputDataConfig': {'s3Uri': f"s3://{self.bucket}/{self.prefix}/output/"}
+            },
+        )
+        logger.info(f"Submitted batch job {prepared.job_name} with {len(prepared.records)} records")
+        return response['jobArn']
+
+    def wait(self, job_arn: str, poll_interval: float = 60.0, timeout: Optional[float] = None) -> str:
+        """Poll until the job reaches a terminal status and return it"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.bedrock_control.get_model_invocation_job(jobIdentifier=job_arn)['status']
+            if status in TERMINAL_STATUSES:
+                logger.info(f"Batch job {job_arn} finished with status {status}")
+                return status
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch job {job_arn} still {status} after {timeout}s")
+            time.sleep(poll_interval)
+
+    def collect(self, job_arn: str, prepared: PreparedBatch) -> dict:
+        """Read job outputs and map them to recommendations keyed by complaint ID"""
+        job_id = job_arn.rsplit('/', 1)[-1]
+        output_key = f"{self.prefix}/output/{job_id}/{prepared.job_name}.jsonl.out"
+        body = self.s3.get_object(Bucket=self.bucket, Key=output_key)['Body']
+
+        results = {}
+        for line in body.iter_lines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            complaint_id = record['recordId']
+            output = record.get('modelOutput')
+            if not output:
+                logger.error(f"Batch record {complaint_id} failed: {record.get('error')}")
+                continue
+
+            token_usage = self.pricing.usage_record(
+                self.orchestrator.model_id, output.get('usage') or {}, price_factor=BATCH_PRICE_FACTOR
+            )
+            self._account(prepared.items.get(complaint_id), token_usage)
+
+            parsed = self.orchestrator._parse_llm_response(output['content'][0]['text'])
+            results[complaint_id] = self.orchestrator._build_recommendation(
+                complaint_id,
+                parsed,
+                prepared.cases.get(complaint_id, []),
+                prepared.prepare_ms.get(complaint_id, 0.0),
+                {'prepare': prepared.prepare_ms.get(complaint_id, 0.0)},
+                token_usage,
+            )
+
+        missing = len(prepared.records) - len(results)
+        if missing:
+            logger.warning(f"{missing} records of {prepared.job_name} produced no recommendation")
+        return results
+
+    def _account(self, item: Optional[BatchItem], token_usage: dict) -> None:
+        """Record a batch record's usage and charge it to its tenant, as on-demand calls are"""
+        tenant_id = item.tenant_id if item else None
+        complaint_type = item.complaint_type if item else None
+        if self.token_budgets:
+            self.token_budgets.charge(tenant_id, token_usage['total_tokens'])
+        if self.usage_aggregator:
+            self.usage_aggregator.record(token_usage['model_id'], complaint_type, token_usage)
+
+    def run(
+        self,
+        items: list[BatchItem],
+        job_prefix: str = 'recommendations',
+        poll_interval: float = 60.0,
+    ) -> dict:
+        """Prepare, submit, wait for and collect jobs for all items"""
+        results = {}
+        stamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        for offset in range(0, len(items), MAX_RECORDS_PER_JOB):
+            chunk = items[offset:offset + MAX_RECORDS_PER_JOB]
+            prepared = self.prepare(chunk, job_name=f"{job_prefix}-{stamp}-{offset // MAX_RECORDS_PER_JOB}")
+            job_arn = self.submit(prepared)
+            status = self.wait(job_arn, poll_interval=poll_interval)
+            if status in ('Completed', 'PartiallyCompleted'):
+                results.update(self.collect(job_arn, prepared))
+        return results
+
+
+def load_items(path: str) -> list[BatchItem]:
+    """Load complaints from JSONL with complaintId / complainSummary fields (as the API)"""
+    items = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            items.append(BatchItem(
+                complaint_id=record['complaintId'],
+                complaint_summary=record['complainSummary'],
+                tenant_id=record.get('tenantId'),
+                filters=record.get('filters'),
+                complaint_type=record.get('complaintType'),
+            ))
+    return items
+
+
+def parse_stage_workers(value: str) -> dict:
+    """Parse `stage=count,...` into worker counts per stage"""
+    workers = {}
+    for part in filter(None, value.split(',')):
+        stage, _, count = part.partition('=')
+        try:
+            workers[stage.strip()] = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected stage=count, got {part!r}")
+    return workers
+
+
+def run_staged(orchestrator, items: list[BatchItem], workers: Optional[dict] = None) -> list[str]:
+    """Run items through the staged pipeline at backfill priority; returns recommendation JSON lines"""
+    from bedrock_scheduler import PRIORITY_BACKFILL
+    from stage_pipeline import PipelineItem, build_recommendation_pipeline
+
+    pipeline = build_recommendation_pipeline(orchestrator, workers=workers)
+    finished = pipeline.run([
+        PipelineItem(
+            complaint_id=item.complaint_id,
+            complaint_summary=item.complaint_summary,
+            tenant_id=item.tenant_id,
+            filters=item.filters,
+            priority=PRIORITY_BACKFILL,
+            complaint_type=item.complaint_type,
+        )
+        for item in items
+    ])
+    logger.info("Staged run finished; bottleneck stage: %s", pipeline.bottleneck())
+    return [dumps(item.result) for item in finished if item.error is None]
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Run recommendation backfills through Bedrock Batch Inference")
+    parser.add_argument('--input', required=True, help="JSONL of complaints")
+    parser.add_argument('--output', default='recommendations.jsonl', help="Where to write recommendations")
+    parser.add_argument('--bucket', help="Required for batch jobs")
+    parser.add_argument('--role-arn', help="Service role Bedrock assumes to read/write S3; required for batch jobs")
+    parser.add_argument('--prefix', default='batch-inference')
+    parser.add_argument('--poll-interval', type=float, default=60.0)
+    parser.add_argument(
+        '--executor', choices=('thread', 'process', 'staged'), default=os.environ.get('BATCH_EXECUTOR') or None,
+        help="Run on-demand instead of as a batch job, with CPU stages inline (thread), in a process pool, "
+             "or as separately sized stages",
+    )
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes for --executor process")
+    parser.add_argument(
+        '--stage-workers', type=parse_stage_workers, default={},
+        help="Threads per stage for --executor staged, e.g. llm=32,embed=8",
+    )
+    args = parser.parse_args(argv)
+    if args.executor is None and not (args.bucket and args.role_arn):
+        parser.error("--bucket and --role-arn are required unless --executor is given")
+
+    logging.basicConfig(level=logging.INFO)
+
+    from orchestrator import RAGOrchestrator, token_budgets, usage_aggregator
+
+    orchestrator = RAGOrchestrator()
+    items = load_items(args.input)
+    if args.executor == 'staged':
+        lines = run_staged(orchestrator, items, args.stage_workers)
+    elif args.executor:
+        from parallel_pipeline import ProcessPoolBatchRunner
+
+        processes = 0 if args.executor == 'thread' else args.processes
+        # The runner serializes in its workers; values are already JSON
+        lines = list(ProcessPoolBatchRunner(orchestrator, processes=processes).run(items).values())
+    else:
+        pipeline = BatchInferencePipeline(
+            orchestrator, bucket=args.bucket, role_arn=args.role_arn, prefix=args.prefix,
+            usage_aggregator=usage_aggregator, token_budgets=token_budgets,
+        )
+        results = pipeline.run(items, poll_interval=args.poll_interval)
+        lines = [dumps(recommendation) for recommendation in results.values()]
+
+    with open(args.output, 'w') as f:
+        for line in lines:
+            f.write(line + '\n')
+    # Final totals for the run; periodic reports may not have fired
+    usage_aggregator.report()
+    print(f"Wrote {len(lines)} recommendations to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
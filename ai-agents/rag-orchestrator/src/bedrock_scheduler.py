@@ -0,0 +1,221 @@
+"""
+Client-side Scheduler for Bedrock Quotas
+
+Keeps Bedrock traffic under the account's requests-per-minute and
+tokens-per-minute quotas:
+1. Token buckets for RPM and TPM, sized from estimated request tokens
+2. Priority lanes so interactive traffic is served before backfills
+3. AIMD rate adaptation driven by throttle responses
+"""
+
+import math
+import time
+import threading
+from dataclasses import dataclass
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKFILL = 'backfill'
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKFILL)
+
+# Rough characters-per-token ratio for English prompts
+CHARS_PER_TOKEN = 4
+
+
+class BedrockThrottledError(Exception):
+    """Raised when a Bedrock call cannot be scheduled or keeps being throttled"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Continuously refilling token bucket expressed as a per-minute budget"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add tokens accrued since the last refill"""
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, per_minute: float) -> None:
+        """Change the refill rate and capacity, keeping the current fill"""
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` tokens are available above `reserve`"""
+        # Requests larger than the whole bucket only need a full bucket
+        needed = min(amount + reserve, self.capacity) - self.tokens
+        return 0.0 if needed <= 0 else needed / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class Reservation:
+    """Capacity held by one in-flight Bedrock call"""
+    estimated_tokens: int
+    priority: str
+    acquired_at: float
+
+
+class BedrockScheduler:
+    """Admits Bedrock calls against RPM/TPM buckets with priority lanes and AIMD limits"""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        backfill_reserve: float = 0.2,
+        min_scale: float = 0.1,
+        increase_step: float = 0.02,
+        decrease_factor: float = 0.5,
+    ):
+        self.quota_rpm = requests_per_minute
+        self.quota_tpm = tokens_per_minute
+        self.backfill_reserve = backfill_reserve
+        self.min_scale = min_scale
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+        # Fraction of the quota currently allowed; adapted by AIMD
+        self.scale = 1.0
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKFILL: 0}
+        self.throttle_count = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'BedrockScheduler':
+        """Build a scheduler from BEDROCK_RPM_QUOTA / BEDROCK_TPM_QUOTA"""
+        return cls(
+            requests_per_minute=float(environ.get('BEDROCK_RPM_QUOTA', '200')),
+            tokens_per_minute=float(environ.get('BEDROCK_TPM_QUOTA', '400000')),
+            backfill_reserve=float(environ.get('BEDROCK_BACKFILL_RESERVE', '0.2')),
+        )
+
+    @staticmethod
+    def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+        """Estimate input + output tokens charged against the TPM quota"""
+        return math.ceil(len(prompt) / CHARS_PER_TOKEN) + max_output_tokens
+
+    def acquire(
+        self,
+        estimated_tokens: int,
+        priority: str = PRIORITY_INTERACTIVE,
+        timeout: Optional[float] = 30.0,
+    ) -> Reservation:
+        """Block until the call fits in both buckets, or raise BedrockThrottledError"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.request_bucket.refill(now)
+                    self.token_bucket.refill(now)
+
+                    wait = self._wait_time(estimated_tokens, priority)
+                    if wait <= 0:
+                        self.request_bucket.consume(1)
+                        self.token_bucket.consume(estimated_tokens)
+                        return Reservation(estimated_tokens, priority, now)
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise BedrockThrottledError(
+                                f"Bedrock quota exhausted for {priority} traffic",
+                                retry_after=wait,
+                            )
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self.waiting[priority] -= 1
+
+    def release(self, reservation: Reservation, actual_tokens: Optional[int] = None) -> None:
+        """Settle a reservation against actual usage (refunds over-estimates)"""
+        if actual_tokens is None:
+            return
+        with self._cond:
+            delta = reservation.estimated_tokens - actual_tokens
+            if delta > 0:
+                self.token_bucket.refund(delta)
+            else:
+                self.token_bucket.consume(-delta)
+            self._cond.notify_all()
+
+    def cancel(self, reservation: Reservation) -> None:
+        """Return all capacity for a call that was rejected before running"""
+        with self._cond:
+            self.request_bucket.refund(1)
+            self.token_bucket.refund(reservation.estimated_tokens)
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """Additive increase towards the configured quota"""
+        with self._cond:
+            if self.scale < 1.0:
+                self._set_scale(self.scale + self.increase_step)
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease after a throttle response"""
+        with self._cond:
+            self.throttle_count += 1
+            self._set_scale(self.scale * self.decrease_factor)
+            logger.warning("Bedrock throttled; scaling quota to %.0f%%", self.scale * 100)
+
+    def stats(self) -> dict:
+        """Current limits, bucket fill and queue depth per lane"""
+        with self._cond:
+            return {
+                'scale': self.scale,
+                'requests_per_minute': self.request_bucket.capacity,
+                'tokens_per_minute': self.token_bucket.capacity,
+                'available_requests': self.request_bucket.tokens,
+                'available_tokens': self.token_bucket.tokens,
+                'waiting': dict(self.waiting),
+                'throttle_count': self.throttle_count,
+            }
+
+    def _wait_time(self, estimated_tokens: int, priority: str) -> float:
+        """Seconds this caller must wait before it may be admitted"""
+        if priority == PRIORITY_BACKFILL:
+            # Backfill yields to queued interactive calls and leaves headroom for them
+            if self.waiting[PRIORITY_INTERACTIVE]:
+                return 0.05
+            request_reserve = self.request_bucket.capacity * self.backfill_reserve
+            token_reserve = self.token_bucket.capacity * self.backfill_reserve
+        else:
+            request_reserve = token_reserve = 0.0
+
+        return max(
+            self.request_bucket.wait_time(1, request_reserve),
+            self.token_bucket.wait_time(estimated_tokens, token_reserve),
+        )
+
+    def _set_scale(self, scale: float) -> None:
+        self.scale = max(self.min_scale, min(1.0, scale))
+        self.request_bucket.set_rate(self.quota_rpm * self.scale)
+        self.token_bucket.set_rate(self.quota_tpm * self.scale)
+        self._cond.notify_all()
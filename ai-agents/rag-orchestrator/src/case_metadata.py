@@ -0,0 +1,106 @@
+"""
+Bounded Case Metadata
+
+Keeps `HistoricalCase.metadata` from dominating memory when legacy cases
+carry megabyte-sized metadata:
+1. Source filtering so OpenSearch only returns allow-listed metadata fields
+2. Per-consumer allow-lists (prompt vs. response)
+3. A byte cap on the metadata kept per case, with the full document
+   loadable on demand
+
+The byte cap bounds what each case holds in memory and passes to prompts
+and responses; it does not shrink the search response. Only the allow-lists
+narrow what OpenSearch sends, so without them every hit still carries its
+full `metadata` over the wire.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Case fields every consumer needs, returned regardless of metadata policy
+CASE_SOURCE_FIELDS = ('case_id', 'complaint_type', 'resolution', 'outcome', 'embedding')
+
+
+def _parse_fields(value: Optional[str]) -> Optional[tuple]:
+    """Comma-separated allow-list; empty/unset means all fields"""
+    if not value:
+        return None
+    return tuple(sorted({name.strip() for name in value.split(',') if name.strip()}))
+
+
+@dataclass(frozen=True)
+class MetadataPolicy:
+    """Which metadata fields each consumer sees, and how much is kept per case
+
+    `max_bytes` is applied after the fetch; set both allow-lists to narrow the fetch itself.
+    """
+    prompt_fields: Optional[tuple] = None
+    response_fields: Optional[tuple] = None
+    max_bytes: int = 4096
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'MetadataPolicy':
+        """Read CASE_METADATA_* allow-lists and the per-case byte cap"""
+        return cls(
+            prompt_fields=_parse_fields(environ.get('CASE_METADATA_PROMPT_FIELDS')),
+            response_fields=_parse_fields(environ.get('CASE_METADATA_RESPONSE_FIELDS')),
+            max_bytes=int(environ.get('CASE_METADATA_MAX_BYTES', '4096')),
+        )
+
+    def source_includes(self) -> list:
+        """`_source.includes` for searches: case fields plus the union of allow-lists"""
+        if self.prompt_fields is None or self.response_fields is None:
+            # A consumer sees every field, so the whole object is fetched and only capped afterwards
+            return [*CASE_SOURCE_FIELDS, 'metadata']
+        fields = sorted(set(self.prompt_fields) | set(self.response_fields))
+        return [*CASE_SOURCE_FIELDS, *(f"metadata.{name}" for name in fields)]
+
+
+def project(metadata: dict, fields: Optional[tuple]) -> dict:
+    """Keep only allow-listed keys (all keys when `fields` is None)"""
+    if fields is None:
+        return metadata
+    return {name: metadata[name] for name in fields if name in metadata}
+
+
+def cap_metadata(metadata: dict, max_bytes: int) -> tuple[dict, bool]:
+    """Keep whole keys, in sorted order, while their compact JSON fits in `max_bytes`
+
+    Keys that do not fit are skipped, so smaller keys after them are still
+    kept. Returns the capped dict and whether anything was dropped.
+    """
+    if not metadata:
+        return metadata, False
+
+    capped = {}
+    truncated = False
+    used = 2  # enclosing braces
+    for name in sorted(metadata):
+        value = metadata[name]
+        # "name":value, plus a comma before every key but the first
+        size = len(json.dumps(name)) + 1 + len(json.dumps(value, default=str)) + (1 if capped else 0)
+        if used + size > max_bytes:
+            truncated = True
+            continue
+        capped[name] = value
+        used += size
+    return capped, truncated
+
+
+class MetadataLoader:
+    """Loads the full, uncapped metadata for a case on demand"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def load(self, index: str, doc_id: str) -> dict:
+        """Fetch full metadata by document _id (see index_management.document_id)"""
+        response = self.client.get(index=index, id=doc_id, _source_includes=['metadata'], ignore=[404])
+        if not response.get('found'):
+            logger.warning("Case %s not found in %s", doc_id, index)
+            return {}
+        return response['_source'].get('metadata', {})
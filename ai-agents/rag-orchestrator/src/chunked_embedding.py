@@ -0,0 +1,161 @@
+"""
+Chunked Embedding for Long Complaints
+
+Embeds long, transcript-derived complaint summaries without truncation:
+1. Split text into token-bounded, overlapping windows on word boundaries
+2. Embed the windows in parallel, so per-call latency stays bounded
+3. Pool the chunk vectors (token-weighted mean, or element-wise max) and
+   L2-normalize the result for the cosine index
+
+Windows default to the embedding model's input limit
+(EMBEDDING_MODEL_MAX_TOKENS) less a margin, since token counts use the
+Bedrock scheduler's characters-per-token estimate rather than the model's
+tokenizer.
+"""
+
+import contextvars
+import math
+import re
+from concurrent.futures import Executor
+from typing import Callable, Optional
+import logging
+
+import numpy as np
+
+from bedrock_scheduler import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+POOLING_MODES = ('mean', 'max')
+# Input limit of the BERT-family encoder behind the embedding endpoint
+DEFAULT_MODEL_MAX_TOKENS = 512
+# Share of the model limit a window may use, absorbing error in the token estimate
+WINDOW_FRACTION = 0.9
+_WORD = re.compile(r'\S+\s*')
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def window_tokens(model_max_tokens: int = DEFAULT_MODEL_MAX_TOKENS) -> int:
+    """Largest window (in estimated tokens) that stays within the model's input limit"""
+    return int(model_max_tokens * WINDOW_FRACTION)
+
+
+DEFAULT_WINDOW_TOKENS = window_tokens()
+
+
+def chunk_text(text: str, max_tokens: int = DEFAULT_WINDOW_TOKENS, overlap_tokens: int = 32) -> list[str]:
+    """Split into windows of at most ~`max_tokens`, each repeating ~`overlap_tokens` of the previous one"""
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    # Words longer than a window (URLs, base64, log lines) are split by characters
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    words = [
+        word[i:i + max_chars]
+        for word in _WORD.findall(text)
+        for i in range(0, len(word), max_chars)
+    ]
+    if not words:
+        return []
+    costs = [estimate_tokens(word) for word in words]
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        end, used = start, 0
+        # Always take at least one word (every piece fits the budget after the split above)
+        while end < len(words) and (end == start or used + costs[end] <= max_tokens):
+            used += costs[end]
+            end += 1
+        chunks.append(''.join(words[start:end]).strip())
+        if end == len(words):
+            break
+
+        # Step back over the trailing words that make up the overlap
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + costs[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += costs[next_start]
+        start = next_start
+    return chunks
+
+
+def pool(vectors: np.ndarray, mode: str = 'mean', weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Combine chunk vectors (n x d) into one L2-normalized vector"""
+    if mode == 'max':
+        pooled = vectors.max(axis=0)
+    elif mode == 'mean':
+        pooled = np.average(vectors, axis=0, weights=weights)
+    else:
+        raise ValueError(f"Unknown pooling mode {mode!r}; expected one of {POOLING_MODES}")
+    norm = np.linalg.norm(pooled)
+    return pooled / norm if norm > 0 else pooled
+
+
+class ChunkedEmbedder:
+    """Embeds text as one call when short, or as pooled overlapping chunks when long"""
+
+    def __init__(
+        self,
+        embed: Callable[[str], list],
+        executor: Optional[Executor] = None,
+        max_tokens: int = DEFAULT_WINDOW_TOKENS,
+        overlap_tokens: int = 32,
+        pooling: str = 'mean',
+    ):
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Unknown pooling mode {pooling!r}; expected one of {POOLING_MODES}")
+        self.embed = embed
+        self.executor = executor
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.pooling = pooling
+
+    @classmethod
+    def from_env(cls, embed: Callable[[str], list], environ: dict, executor: Optional[Executor] = None) -> 'ChunkedEmbedder':
+        """EMBEDDING_MODEL_MAX_TOKENS (or an explicit EMBEDDING_CHUNK_TOKENS), EMBEDDING_CHUNK_OVERLAP, EMBEDDING_POOLING"""
+        model_max_tokens = int(environ.get('EMBEDDING_MODEL_MAX_TOKENS', DEFAULT_MODEL_MAX_TOKENS))
+        return cls(
+            embed,
+            executor=executor,
+            max_tokens=int(environ.get('EMBEDDING_CHUNK_TOKENS') or window_tokens(model_max_tokens)),
+            overlap_tokens=int(environ.get('EMBEDDING_CHUNK_OVERLAP', '32')),
+            pooling=environ.get('EMBEDDING_POOLING', 'mean'),
+        )
+
+    def __call__(self, text: str) -> list:
+        """Embed `text`; `embed` raises on failure, failed chunks are left out of the pool"""
+        if estimate_tokens(text) <= self.max_tokens:
+            return self.embed(text)
+
+        chunks = chunk_text(text, self.max_tokens, self.overlap_tokens)
+        if self.executor is not None:
+            # Each worker runs in its own copy of the caller's context (request fields for logging)
+            context = contextvars.copy_context()
+            outcomes = list(self.executor.map(lambda chunk: context.copy().run(self._embed_chunk, chunk), chunks))
+        else:
+            outcomes = [self._embed_chunk(chunk) for chunk in chunks]
+
+        vectors, weights = [], []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Embedding chunk failed: %s", outcome)
+                continue
+            vectors.append(outcome)
+            weights.append(estimate_tokens(chunk))
+
+        if not vectors:
+            raise RuntimeError(f"All {len(chunks)} embedding chunks failed")
+
+        logger.info("Embedded %d/%d chunks with %s pooling", len(vectors), len(chunks), self.pooling)
+        return pool(np.asarray(vectors, dtype=np.float32), self.pooling, np.asarray(weights)).tolist()
+
+    def _embed_chunk(self, chunk: str):
+        """Vector for one chunk, or the exception it raised"""
+        try:
+            return self.embed(chunk)
+        except Exception as e:
+            return e
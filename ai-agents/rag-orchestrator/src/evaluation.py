@@ -0,0 +1,295 @@
+"""
+Offline Retrieval Evaluation
+
+Measures retrieval quality and latency for a labelled set of
+complaint -> relevant case pairs:
+1. Load labelled queries (JSONL) and, optionally, a local case corpus
+2. Run retrieval against a local stand-in index or the live orchestrator
+3. Report recall@k, MRR and nDCG@k alongside per-query latency percentiles
+
+Queries file (one JSON object per line):
+    {"query_id": "q1", "complaint_summary": "...", "relevant_case_ids": ["c1", "c7"],
+     "relevance": {"c1": 2, "c7": 1}, "query_embedding": [...]}
+`relevance` (graded gains for nDCG) and `query_embedding` are optional.
+
+Corpus file: one HistoricalCase-shaped object per line, with `embedding`.
+"""
+
+import argparse
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import logging
+
+import numpy as np
+
+from models import HistoricalCase
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LabelledQuery:
+    """Complaint with its known relevant historical cases"""
+    query_id: str
+    complaint_summary: str
+    relevant_case_ids: list
+    relevance: dict = field(default_factory=dict)
+    query_embedding: Optional[list] = None
+
+    def gain(self, case_id: str) -> float:
+        if self.relevance:
+            return float(self.relevance.get(case_id, 0))
+        return 1.0 if case_id in self.relevant_case_ids else 0.0
+
+
+@dataclass
+class EvaluationReport:
+    """Aggregate quality and latency metrics for one retrieval configuration"""
+    label: str
+    num_queries: int
+    recall_at_k: dict
+    mrr: float
+    ndcg_at_k: dict
+    latency_ms: dict
+    per_query: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            'label': self.label,
+            'num_queries': self.num_queries,
+            'recall_at_k': self.recall_at_k,
+            'mrr': self.mrr,
+            'ndcg_at_k': self.ndcg_at_k,
+            'latency_ms': self.latency_ms,
+        }
+
+
+def load_queries(path: str) -> list[LabelledQuery]:
+    """Load labelled queries from a JSONL file"""
+    queries = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            queries.append(LabelledQuery(
+                query_id=str(record['query_id']),
+                complaint_summary=record.get('complaint_summary', ''),
+                relevant_case_ids=list(record.get('relevant_case_ids', [])),
+                relevance=record.get('relevance', {}),
+                query_embedding=record.get('query_embedding'),
+            ))
+    return queries
+
+
+def load_corpus(path: str) -> list[HistoricalCase]:
+    """Load historical cases (with embeddings) from a JSONL file"""
+    cases = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            cases.append(HistoricalCase(
+                case_id=str(record['case_id']),
+                complaint_type=record.get('complaint_type', ''),
+                resolution=record.get('resolution', ''),
+                outcome=record.get('outcome', ''),
+                embedding=record['embedding'],
+                similarity_score=0.0,
+                metadata=record.get('metadata', {}),
+            ))
+    return cases
+
+
+class LocalVectorIndex:
+    """Exact cosine-similarity stand-in for the OpenSearch kNN index
+
+    `quantization='int8'` scores against scalar-quantized vectors to
+    approximate the recall cost of a quantized index.
+    """
+
+    def __init__(self, cases: list[HistoricalCase], quantization: Optional[str] = None):
+        if quantization not in (None, 'int8'):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        self.cases = cases
+        self.quantization = quantization
+        vectors = np.asarray([case.embedding for case in cases], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        if quantization == 'int8':
+            # Round-trip through int8 once so scoring sees the quantization error
+            scale = np.maximum(np.abs(vectors).max(axis=0), 1e-12) / 127.0
+            vectors = np.round(vectors / scale).astype(np.int8).astype(np.float32) * scale
+
+        self.vectors = vectors
+
+    def search(self, query_embedding: list, top_k: int = 5) -> list[HistoricalCase]:
+        """Return the top_k cases by cosine similarity"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = self.vectors @ query
+
+        top_k = min(top_k, len(self.cases))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [self._with_score(self.cases[i], float(scores[i])) for i in ranked]
+
+    @staticmethod
+    def _with_score(case: HistoricalCase, score: float) -> HistoricalCase:
+        return HistoricalCase(
+            case_id=case.case_id,
+            complaint_type=case.complaint_type,
+            resolution=case.resolution,
+            outcome=case.outcome,
+            embedding=case.embedding,
+            similarity_score=score,
+            metadata=case.metadata,
+        )
+
+
+def recall_at_k(retrieved_ids: list, query: LabelledQuery, k: int) -> float:
+    relevant = set(query.relevant_case_ids)
+    if not relevant:
+        return 0.0
+    return len(relevant.intersection(retrieved_ids[:k])) / len(relevant)
+
+
+def reciprocal_rank(retrieved_ids: list, query: LabelledQuery) -> float:
+    relevant = set(query.relevant_case_ids)
+    for rank, case_id in enumerate(retrieved_ids, 1):
+        if case_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(retrieved_ids: list, query: LabelledQuery, k: int) -> float:
+    dcg = sum(
+        query.gain(case_id) / math.log2(rank + 1)
+        for rank, case_id in enumerate(retrieved_ids[:k], 1)
+    )
+    ideal_gains = sorted(
+        (query.gain(case_id) for case_id in (query.relevance or query.relevant_case_ids)),
+        reverse=True,
+    )[:k]
+    idcg = sum(gain / math.log2(rank + 1) for rank, gain in enumerate(ideal_gains, 1))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def percentiles(values: list, points: tuple = (50, 95, 99)) -> dict:
+    if not values:
+        return {}
+    ordered = np.asarray(values, dtype=np.float64)
+    result = {f'p{p}': float(np.percentile(ordered, p)) for p in points}
+    result['mean'] = float(ordered.mean())
+    return result
+
+
+def evaluate(
+    queries: list[LabelledQuery],
+    retrieve: Callable[[list, int], list[HistoricalCase]],
+    embed: Optional[Callable[[str], list]] = None,
+    k_values: tuple = (1, 5, 10),
+    label: str = 'default',
+    warmup: int = 3,
+) -> EvaluationReport:
+    """Run every query through `retrieve` and compute quality and latency metrics
+
+    `retrieve(query_embedding, top_k)` matches RAGOrchestrator._retrieve_similar_cases.
+    Embedding time is excluded from latency; only retrieval is timed.
+    """
+    max_k = max(k_values)
+    embeddings = []
+    for query in queries:
+        if query.query_embedding is not None:
+            embeddings.append(query.query_embedding)
+        elif embed is not None:
+            embeddings.append(embed(query.complaint_summary))
+        else:
+            raise ValueError(f"Query {query.query_id} has no embedding and no embed function was given")
+
+    # Warm caches/JIT paths so the first queries do not skew latency
+    for embedding in embeddings[:warmup]:
+        retrieve(embedding, max_k)
+
+    recalls = {k: [] for k in k_values}
+    ndcgs = {k: [] for k in k_values}
+    reciprocal_ranks = []
+    latencies = []
+    per_query = []
+
+    for query, embedding in zip(queries, embeddings):
+        start = time.perf_counter()
+        results = retrieve(embedding, max_k)
+        latency = (time.perf_counter() - start) * 1000
+        retrieved_ids = [case.case_id for case in results]
+
+        latencies.append(latency)
+        reciprocal_ranks.append(reciprocal_rank(retrieved_ids, query))
+        for k in k_values:
+            recalls[k].append(recall_at_k(retrieved_ids, query, k))
+            ndcgs[k].append(ndcg_at_k(retrieved_ids, query, k))
+        per_query.append({'query_id': query.query_id, 'retrieved': retrieved_ids, 'latency_ms': latency})
+
+    count = max(len(queries), 1)
+    return EvaluationReport(
+        label=label,
+        num_queries=len(queries),
+        recall_at_k={k: sum(v) / count for k, v in recalls.items()},
+        mrr=sum(reciprocal_ranks) / count,
+        ndcg_at_k={k: sum(v) / count for k, v in ndcgs.items()},
+        latency_ms=percentiles(latencies),
+        per_query=per_query,
+    )
+
+
+def format_report(report: EvaluationReport) -> str:
+    lines = [f"[{report.label}] {report.num_queries} queries"]
+    for k in sorted(report.recall_at_k):
+        lines.append(f"  recall@{k:<3} {report.recall_at_k[k]:.4f}   nDCG@{k:<3} {report.ndcg_at_k[k]:.4f}")
+    lines.append(f"  MRR        {report.mrr:.4f}")
+    lines.append("  latency    " + ", ".join(f"{name}={value:.2f}ms" for name, value in report.latency_ms.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate RAG retrieval quality and latency")
+    parser.add_argument('--queries', required=True, help="Labelled queries JSONL")
+    parser.add_argument('--corpus', help="Case corpus JSONL for the local stand-in index")
+    parser.add_argument('--opensearch', action='store_true', help="Evaluate against the live orchestrator instead")
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--quantization', choices=['int8'], help="Score against quantized vectors (local index)")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+
+    if args.opensearch:
+        from orchestrator import RAGOrchestrator
+
+        orchestrator = RAGOrchestrator()
+        retrieve = lambda embedding, k: orchestrator._retrieve_similar_cases(embedding, top_k=k)  # noqa: E731
+        embed = orchestrator._generate_embedding
+        label = f"opensearch:{orchestrator.opensearch_index}"
+    elif args.corpus:
+        index = LocalVectorIndex(load_corpus(args.corpus), quantization=args.quantization)
+        retrieve, embed = index.search, None
+        label = f"local:{args.quantization or 'float32'}"
+    else:
+        parser.error("either --corpus or --opensearch is required")
+
+    report = evaluate(queries, retrieve, embed=embed, k_values=tuple(args.k), label=label)
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({**report.to_dict(), 'per_query': report.per_query}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
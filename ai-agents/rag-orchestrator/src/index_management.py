@@ -0,0 +1,362 @@
+"""
+Historical Case Index Management
+
+Creates and versions the OpenSearch kNN index behind the
+`historical-cases` alias:
+1. Explicit mapping with tunable HNSW parameters (m, ef_construction,
+   ef_search), engine and space type
+2. Versioned physical indices (`<alias>-v<N>`) with blue/green alias swaps
+3. kNN warmup so native graphs are loaded before traffic hits a new index
+4. Optional truncated-vector field (`embedding_<dim>`) for two-stage retrieval
+
+Writers keep targeting the alias during a deploy, so documents updated
+after the reindex starts are copied again (by `updated_at`) before and
+after the alias swap. Copies use external versioning: the incremental
+updater versions documents by write time, so a catch-up pass never
+replaces a newer document with an older one.
+
+Usage:
+    python index_management.py describe
+    python index_management.py create
+    python index_management.py deploy [--source INDEX] [--delete-old]
+    python index_management.py warmup [INDEX]
+    python index_management.py rollback
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Engines that keep HNSW graphs off-heap and support the warmup API
+NATIVE_ENGINES = ('faiss', 'nmslib')
+
+# Fills the truncated field from the full embedding for documents indexed before it existed
+TRUNCATE_EMBEDDING_SCRIPT = """
+if (ctx._source.embedding != null && ctx._source[params.field] == null) {
+  def prefix = new ArrayList();
+  double norm = 0;
+  for (int i = 0; i < params.dimension && i < ctx._source.embedding.size(); i++) {
+    double x = ctx._source.embedding[i];
+    prefix.add(x);
+    norm += x * x;
+  }
+  norm = Math.sqrt(norm);
+  if (norm > 0) {
+    for (int i = 0; i < prefix.size(); i++) { prefix[i] = prefix[i] / norm; }
+  }
+  ctx._source[params.field] = prefix;
+}
+"""
+
+
+# Catch-up passes look back this far to absorb clock skew between writers and the deployer
+CATCH_UP_MARGIN_SECONDS = 60
+
+
+def document_id(case_id: str, tenant_id: Optional[str] = None) -> str:
+    """Document _id for a case; tenant-scoped so equal case IDs from two tenants do not collide"""
+    return f"{tenant_id}:{case_id}" if tenant_id else str(case_id)
+
+
+def truncated_field(dimension: int) -> str:
+    """Name of the truncated-vector field, e.g. `embedding_256`"""
+    return f"embedding_{dimension}"
+
+
+@dataclass
+class IndexSettings:
+    """Mapping and HNSW parameters for the historical case index"""
+    dimension: int = 1536
+    engine: str = 'lucene'
+    space_type: str = 'cosinesimil'
+    m: int = 16
+    ef_construction: int = 256
+    ef_search: int = 100
+    shards: int = 3
+    replicas: int = 1
+    refresh_interval: str = '30s'
+    truncated_dimension: int = 0  # e.g. 256 adds an `embedding_256` field; 0 disables it
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'IndexSettings':
+        """Read HNSW/index settings from KNN_* environment variables"""
+        defaults = cls()
+        return cls(
+            dimension=int(environ.get('KNN_DIMENSION', defaults.dimension)),
+            engine=environ.get('KNN_ENGINE', defaults.engine),
+            space_type=environ.get('KNN_SPACE_TYPE', defaults.space_type),
+            m=int(environ.get('KNN_HNSW_M', defaults.m)),
+            ef_construction=int(environ.get('KNN_HNSW_EF_CONSTRUCTION', defaults.ef_construction)),
+            ef_search=int(environ.get('KNN_HNSW_EF_SEARCH', defaults.ef_search)),
+            shards=int(environ.get('KNN_INDEX_SHARDS', defaults.shards)),
+            replicas=int(environ.get('KNN_INDEX_REPLICAS', defaults.replicas)),
+            refresh_interval=environ.get('KNN_REFRESH_INTERVAL', defaults.refresh_interval),
+            truncated_dimension=int(environ.get('KNN_TRUNCATED_DIMENSION', defaults.truncated_dimension)),
+        )
+
+    def fingerprint(self) -> str:
+        """Stable hash of the settings, stored in the index _meta"""
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def index_body(self) -> dict:
+        """Full create-index body: settings plus mapping"""
+        index_settings = {
+            "knn": True,
+            "number_of_shards": self.shards,
+            "number_of_replicas": self.replicas,
+            "refresh_interval": self.refresh_interval,
+        }
+        # Lucene takes ef_search from the query's k; native engines read it from settings
+        if self.engine in NATIVE_ENGINES:
+            index_settings["knn.algo_param.ef_search"] = self.ef_search
+
+        properties = {
+            "case_id": {"type": "keyword"},
+            "tenant_id": {"type": "keyword"},
+            "complaint_type": {"type": "keyword"},
+            "complaint_summary": {"type": "text"},
+            "resolution": {"type": "text"},
+            "outcome": {"type": "keyword"},
+            "content_hash": {"type": "keyword", "index": False},
+            "updated_at": {"type": "date"},
+            "embedding": self._knn_field(self.dimension),
+            # Stored for prompts/responses only; not indexed to avoid mapping explosion
+            "metadata": {"type": "object", "enabled": False},
+        }
+        if self.truncated_dimension:
+            properties[truncated_field(self.truncated_dimension)] = self._knn_field(self.truncated_dimension)
+
+        return {
+            "settings": {"index": index_settings},
+            "mappings": {
+                "_meta": {"settings_fingerprint": self.fingerprint(), "settings": asdict(self)},
+                # Unknown legacy fields stay in _source but are not indexed
+                "dynamic": False,
+                "properties": properties,
+            },
+        }
+
+    def _knn_field(self, dimension: int) -> dict:
+        return {
+            "type": "knn_vector",
+            "dimension": dimension,
+            "method": {
+                "name": "hnsw",
+                "engine": self.engine,
+                "space_type": self.space_type,
+                "parameters": {
+                    "m": self.m,
+                    "ef_construction": self.ef_construction,
+                },
+            },
+        }
+
+
+class IndexManager:
+    """Creates versioned kNN indices and moves the serving alias between them"""
+
+    def __init__(self, client, alias: str, settings: IndexSettings):
+        self.client = client
+        self.alias = alias
+        self.settings = settings
+
+    def versioned_name(self, version: int) -> str:
+        return f"{self.alias}-v{version}"
+
+    def versions(self) -> list[tuple[int, str]]:
+        """Existing (version, index) pairs for this alias, oldest first"""
+        pattern = re.compile(rf"^{re.escape(self.alias)}-v(\d+)$")
+        indices = self.client.indices.get(index=f"{self.alias}-v*", ignore=[404]) or {}
+        found = []
+        for name in indices:
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), name))
+        return sorted(found)
+
+    def current_index(self) -> Optional[str]:
+        """Physical index the alias currently points to"""
+        if not self.client.indices.exists_alias(name=self.alias):
+            return None
+        return next(iter(self.client.indices.get_alias(name=self.alias)), None)
+
+    def create_index(self, version: Optional[int] = None) -> str:
+        """Create the next versioned index with the configured mapping"""
+        if version is None:
+            existing = self.versions()
+            version = existing[-1][0] + 1 if existing else 1
+
+        name = self.versioned_name(version)
+        self.client.indices.create(index=name, body=self.settings.index_body())
+        logger.info(f"Created index {name} (settings {self.settings.fingerprint()})")
+        return name
+
+    def reindex(self, source: str, dest: str, timeout: str = '1h', since: Optional[str] = None) -> dict:
+        """Copy documents (optionally only those updated at/after `since`) from `source` into `dest` server-side
+
+        Versions are carried over externally, so an existing newer document in `dest` is kept.
+        """
+        logger.info("Reindexing %s -> %s%s", source, dest, f" (updated since {since})" if since else "")
+        body = {
+            "conflicts": "proceed",
+            "source": {"index": source},
+            "dest": {"index": dest, "version_type": "external"},
+        }
+        if since:
+            body["source"]["query"] = {"range": {"updated_at": {"gte": since}}}
+        if self.settings.truncated_dimension:
+            body["script"] = {
+                "lang": "painless",
+                "source": TRUNCATE_EMBEDDING_SCRIPT,
+                "params": {
+                    "field": truncated_field(self.settings.truncated_dimension),
+                    "dimension": self.settings.truncated_dimension,
+                },
+            }
+        response = self.client.reindex(
+            body=body,
+            wait_for_completion=True,
+            refresh=True,
+            request_timeout=3600,
+            timeout=timeout,
+        )
+        if response.get('failures'):
+            raise RuntimeError(f"Reindex {source} -> {dest} had {len(response['failures'])} failures")
+        return response
+
+    def catch_up(self, source: str, dest: str, since: str, max_passes: int = 3, threshold: int = 100) -> str:
+        """Re-copy documents updated in `source` since `since` until a pass copies at most `threshold`
+
+        Returns the start time of the last pass, for a final pass after the alias swap.
+        """
+        for _ in range(max_passes):
+            started = self._lookback()
+            response = self.reindex(source, dest, since=since)
+            copied = response.get('created', 0) + response.get('updated', 0)
+            logger.info("Catch-up %s -> %s copied %d documents", source, dest, copied)
+            since = started
+            if copied <= threshold:
+                break
+        return since
+
+    def warmup(self, index: Optional[str] = None) -> dict:
+        """Load HNSW graphs into native memory before the index takes traffic"""
+        index = index or self.current_index() or self.alias
+        if self.settings.engine not in NATIVE_ENGINES:
+            logger.info(f"Skipping warmup for {index}: {self.settings.engine} graphs load with the segment")
+            return {}
+
+        response = self.client.transport.perform_request('GET', f"/_plugins/_knn/warmup/{index}")
+        logger.info(f"Warmed up {index}: {json.dumps(response.get('_shards', {}))}")
+        return response
+
+    def swap_alias(self, new_index: str) -> Optional[str]:
+        """Atomically point the alias at `new_index`; returns the previous index"""
+        previous = self.current_index()
+        actions = [{"add": {"index": new_index, "alias": self.alias}}]
+        if previous and previous != new_index:
+            actions.insert(0, {"remove": {"index": previous, "alias": self.alias}})
+
+        self.client.indices.update_aliases(body={"actions": actions})
+        logger.info(f"Alias {self.alias}: {previous} -> {new_index}")
+        return previous
+
+    def deploy(self, source: Optional[str] = None, delete_old: bool = False) -> str:
+        """Blue/green: create the next version, reindex and catch up, warm up, swap the alias, catch up again"""
+        if self.client.indices.exists(index=self.alias) and not self.client.indices.exists_alias(name=self.alias):
+            # A concrete index holds the alias name; it must be migrated with --source first
+            raise ValueError(
+                f"'{self.alias}' is a concrete index, not an alias. Deploy with source='{self.alias}', "
+                f"verify the new version, then delete '{self.alias}' and swap the alias manually."
+            )
+
+        previous = self.current_index()
+        source = source or previous
+        new_index = self.create_index()
+
+        if source:
+            started = self._lookback()
+            self.reindex(source, new_index)
+            # Writers still target the old index; copy what they changed during the reindex
+            started = self.catch_up(source, new_index, since=started)
+
+        self.warmup(new_index)
+        self.swap_alias(new_index)
+
+        if source:
+            # Writes that reached the old index between the last catch-up and the swap
+            self.reindex(source, new_index, since=started)
+
+        if delete_old and previous and previous != new_index:
+            self.client.indices.delete(index=previous)
+            logger.info(f"Deleted previous index {previous}")
+        return new_index
+
+    def rollback(self) -> str:
+        """Point the alias back at the version before the current one"""
+        current = self.current_index()
+        versions = self.versions()
+        current_version = next((version for version, name in versions if name == current), None)
+        older = [name for version, name in versions if current_version is not None and version < current_version]
+        if not older:
+            raise ValueError(f"No previous version of {self.alias} to roll back to")
+
+        target = older[-1]
+        self.warmup(target)
+        self.swap_alias(target)
+        return target
+
+    def describe(self) -> dict:
+        current = self.current_index()
+        return {
+            'alias': self.alias,
+            'current_index': current,
+            'versions': [name for _, name in self.versions()],
+            'settings': asdict(self.settings),
+            'settings_fingerprint': self.settings.fingerprint(),
+        }
+
+    @staticmethod
+    def _lookback() -> str:
+        """`updated_at` lower bound for a catch-up pass that starts now"""
+        return (datetime.now(timezone.utc) - timedelta(seconds=CATCH_UP_MARGIN_SECONDS)).isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the historical case kNN index")
+    parser.add_argument('command', choices=['describe', 'create', 'deploy', 'warmup', 'rollback'])
+    parser.add_argument('index', nargs='?', help="Index to warm up (defaults to the alias target)")
+    parser.add_argument('--alias', default=os.getenv('OPENSEARCH_INDEX', 'historical-cases'))
+    parser.add_argument('--source', help="Index to reindex from on deploy (defaults to the alias target)")
+    parser.add_argument('--delete-old', action='store_true', help="Delete the previous version after deploy")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from opensearch_transport import TransportConfig, build_opensearch_client
+
+    client = build_opensearch_client(TransportConfig.from_env(os.environ))
+    manager = IndexManager(client, alias=args.alias, settings=IndexSettings.from_env(os.environ))
+
+    if args.command == 'describe':
+        print(json.dumps(manager.describe(), indent=2))
+    elif args.command == 'create':
+        print(manager.create_index())
+    elif args.command == 'deploy':
+        print(manager.deploy(source=args.source, delete_old=args.delete_old))
+    elif args.command == 'warmup':
+        manager.warmup(args.index)
+    elif args.command == 'rollback':
+        print(manager.rollback())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Incremental Historical Case Index Updates
+
+Feeds newly resolved complaints back into the RAG corpus without a full
+rebuild:
+1. Consume resolved-complaint events from a JSONL file or an in-process queue
+2. Skip cases whose content hash matches the indexed document
+3. Embed only new or changed cases
+4. Upsert in small bulk batches with configurable refresh, into the index
+   or alias the tenant is routed to (see tenant_routing), under a
+   tenant-scoped document ID
+5. Write events that fail to embed or index to a dead-letter JSONL file
+   (replay it with --events) before the source offset moves past them
+
+Documents are versioned externally by write time (milliseconds), which lets
+index deploys re-copy recently updated documents without regressing them.
+
+Event format (one JSON object per line or queue item):
+    {"case_id": "...", "tenant_id": "...", "complaint_type": "...",
+     "complaint_summary": "...", "resolution": "...", "outcome": "...",
+     "metadata": {...}}
+
+Usage:
+    python index_updater.py --events resolved.jsonl [--follow] [--refresh wait_for]
+    python index_updater.py --events resolved.jsonl.deadletter   # replay failures
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+import logging
+
+from opensearchpy import helpers
+
+from index_management import document_id, truncated_field
+from two_stage_retrieval import truncate_embedding
+
+logger = logging.getLogger(__name__)
+
+# Fields that define a case's content; a change in any of them triggers re-embedding
+HASHED_FIELDS = ('tenant_id', 'complaint_type', 'complaint_summary', 'resolution', 'outcome', 'metadata')
+
+
+def content_hash(event: dict) -> str:
+    """Stable hash of the fields that affect the indexed document"""
+    canonical = json.dumps({name: event.get(name) for name in HASHED_FIELDS}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class UpdateStats:
+    """Counters for one processed batch"""
+    received: int = 0
+    unchanged: int = 0
+    indexed: int = 0
+    failed: int = 0
+    failed_events: list = field(default_factory=list, repr=False)
+
+    def add(self, other: 'UpdateStats') -> None:
+        self.received += other.received
+        self.unchanged += other.unchanged
+        self.indexed += other.indexed
+        self.failed += other.failed
+
+
+class FileEventSource:
+    """Reads events from a JSONL file, checkpointing the byte offset alongside it"""
+
+    def __init__(self, path: str, checkpoint_path: Optional[str] = None):
+        self.path = path
+        self.checkpoint_path = checkpoint_path or f"{path}.offset"
+        self.offset = self._load_offset()
+        self.committed_offset = self.offset
+
+    def batches(self, batch_size: int) -> Iterator[list[dict]]:
+        """Yield batches of events appended since the last checkpoint"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            batch = []
+            for line in iter(f.readline, b''):
+                if not line.endswith(b'\n'):
+                    # Partially written line; pick it up on the next poll
+                    break
+                self.offset += len(line)
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def commit(self) -> None:
+        """Persist the offset once a batch has been indexed"""
+        with open(self.checkpoint_path, 'w') as f:
+            f.write(str(self.offset))
+        self.committed_offset = self.offset
+
+    def rollback(self) -> None:
+        """Re-read from the last committed offset on the next poll"""
+        self.offset = self.committed_offset
+
+    def _load_offset(self) -> int:
+        try:
+            with open(self.checkpoint_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+
+class QueueEventSource:
+    """Drains events from an in-process queue (stand-in for SQS/Kinesis)"""
+
+    def __init__(self, event_queue: queue.Queue):
+        self.queue = event_queue
+
+    def batches(self, batch_size: int) -> Iterator[list[dict]]:
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+
+class DeadLetterFile:
+    """Appends events that could not be indexed to a JSONL file in the event format"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, events: list[dict]) -> None:
+        with open(self.path, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning(f"Wrote {len(events)} failed events to {self.path}")
+
+
+class IncrementalIndexUpdater:
+    """Embeds and upserts new or changed historical cases in small bulk batches"""
+
+    def __init__(
+        self,
+        client,
+        index: str,
+        embed: Callable[[str], list],
+        batch_size: int = 50,
+        refresh: str = 'false',
+        embed_workers: int = 4,
+        truncated_dimension: int = 0,
+        dead_letter: Optional[DeadLetterFile] = None,
+        router=None,
+    ):
+        self.client = client
+        self.index = index
+        # TenantRouter; without one every event goes to `index`
+        self.router = router
+        self.embed = embed
+        self.batch_size = batch_size
+        self.refresh = refresh
+        self.embed_workers = embed_workers
+        self.truncated_dimension = truncated_dimension
+        self.dead_letter = dead_letter
+
+    def process(self, events: list[dict]) -> UpdateStats:
+        """Index the new/changed cases in one batch of events"""
+        # Later events for the same case (of the same tenant) supersede earlier ones
+        latest = {}
+        for event in events:
+            latest[document_id(event['case_id'], event.get('tenant_id'))] = event
+
+        stats = UpdateStats(received=len(events))
+        stats.unchanged += len(events) - len(latest)
+
+        targets = {doc_id: self._target_index(event) for doc_id, event in latest.items()}
+        hashes = {doc_id: content_hash(event) for doc_id, event in latest.items()}
+        indexed_hashes = self._indexed_hashes(targets)
+        changed = [doc_id for doc_id in latest if indexed_hashes.get(doc_id) != hashes[doc_id]]
+        stats.unchanged += len(latest) - len(changed)
+
+        if not changed:
+            return stats
+
+        with ThreadPoolExecutor(max_workers=self.embed_workers) as executor:
+            embeddings = list(executor.map(
+                lambda doc_id: self.embed(latest[doc_id].get('complaint_summary', '')), changed
+            ))
+
+        actions = []
+        for doc_id, embedding in zip(changed, embeddings):
+            if not embedding or not any(embedding):
+                # The embedder falls back to a zero vector on error; never index that
+                logger.warning("Skipping case %s: embedding unavailable", doc_id)
+                stats.failed += 1
+                stats.failed_events.append(latest[doc_id])
+                continue
+            actions.append(self._action(doc_id, targets[doc_id], latest[doc_id], hashes[doc_id], embedding))
+
+        if actions:
+            success, errors = helpers.bulk(
+                self.client,
+                actions,
+                chunk_size=self.batch_size,
+                refresh=self.refresh,
+                raise_on_error=False,
+            )
+            stats.indexed += success
+            stats.failed += len(errors)
+            for error in errors[:5]:
+                logger.error(f"Bulk upsert error: {json.dumps(error, default=str)}")
+            for error in errors:
+                item = next(iter(error.values()), {})
+                if str(item.get('_id')) in latest:
+                    stats.failed_events.append(latest[str(item.get('_id'))])
+
+        logger.info(
+            f"Processed {stats.received} events: {stats.indexed} indexed, "
+            f"{stats.unchanged} unchanged, {stats.failed} failed"
+        )
+        return stats
+
+    def run(self, source, follow: bool = False, poll_interval: float = 5.0) -> UpdateStats:
+        """Consume `source` batch by batch; with `follow`, keep polling for new events
+
+        The offset only moves past a batch once its failed events are in the
+        dead-letter file; without one, a batch with failures is retried.
+        """
+        totals = UpdateStats()
+        while True:
+            for batch in source.batches(self.batch_size):
+                stats = self.process(batch)
+                totals.add(stats)
+                if stats.failed_events:
+                    if self.dead_letter is None:
+                        logger.error(f"{len(stats.failed_events)} events failed; offset not committed, will retry")
+                        source.rollback()
+                        break
+                    self.dead_letter.write(stats.failed_events)
+                source.commit()
+            if not follow:
+                return totals
+            time.sleep(poll_interval)
+
+    def _target_index(self, event: dict) -> str:
+        """Index or alias the event's tenant is routed to"""
+        tenant_id = event.get('tenant_id')
+        if tenant_id and self.router is not None:
+            return self.router.resolve(tenant_id).index
+        return self.index
+
+    def _indexed_hashes(self, targets: dict) -> dict:
+        """Fetch content hashes of already-indexed cases (document ID -> index) in one mget"""
+        response = self.client.mget(
+            body={"docs": [{"_index": index, "_id": doc_id} for doc_id, index in targets.items()]},
+            _source_includes=['content_hash'],
+        )
+        return {
+            doc['_id']: doc['_source'].get('content_hash')
+            for doc in response.get('docs', [])
+            if doc.get('found')
+        }
+
+    def _action(self, doc_id: str, index: str, event: dict, digest: str, embedding: list) -> dict:
+        now = datetime.now(timezone.utc)
+        source = {
+            'case_id': str(event['case_id']),
+            'complaint_type': event.get('complaint_type', ''),
+            'complaint_summary': event.get('complaint_summary', ''),
+            'resolution': event.get('resolution', ''),
+            'outcome': event.get('outcome', ''),
+            'embedding': embedding,
+            'metadata': event.get('metadata', {}),
+            'content_hash': digest,
+            'updated_at': now.isoformat(),
+        }
+        if event.get('tenant_id'):
+            source['tenant_id'] = event['tenant_id']
+        if self.truncated_dimension:
+            # First-pass vector for two-stage retrieval
+            source[truncated_field(self.truncated_dimension)] = truncate_embedding(embedding, self.truncated_dimension)
+
+        return {
+            '_op_type': 'index',
+            '_index': index,
+            '_id': doc_id,
+            # Write-time version: deploy catch-up copies never overwrite a newer document
+            '_version': int(now.timestamp() * 1000),
+            '_version_type': 'external_gte',
+            '_source': source,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally index resolved complaints")
+    parser.add_argument('--events', required=True, help="JSONL file of resolved-complaint events")
+    parser.add_argument('--index', default=os.getenv('OPENSEARCH_INDEX', 'historical-cases'))
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--refresh', choices=['false', 'true', 'wait_for'], default='false')
+    parser.add_argument('--follow', action='store_true', help="Keep polling the file for new events")
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    parser.add_argument('--dead-letter', help="JSONL file for failed events (default: <events>.deadletter)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from orchestrator import RAGOrchestrator, opensearch_client
+    from tenant_routing import TenantRouter
+
+    updater = IncrementalIndexUpdater(
+        opensearch_client,
+        index=args.index,
+        router=TenantRouter.from_env(opensearch_client, default_index=args.index, environ=os.environ),
+        embed=RAGOrchestrator()._generate_embedding,
+        batch_size=args.batch_size,
+        refresh=args.refresh,
+        truncated_dimension=int(os.getenv('KNN_TRUNCATED_DIMENSION', '0')),
+        dead_letter=DeadLetterFile(args.dead_letter or f"{args.events}.deadletter"),
+    )
+    totals = updater.run(FileEventSource(args.events), follow=args.follow, poll_interval=args.poll_interval)
+    print(json.dumps({name: value for name, value in totals.__dict__.items() if name != 'failed_events'}))
+
+
+if __name__ == '__main__':
+    main()
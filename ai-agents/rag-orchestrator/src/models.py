@@ -0,0 +1,67 @@
+"""
+Result Types for the RAG Pipeline
+
+Slotted, frozen dataclasses shared by the orchestrator, sinks and
+serializers. Slots keep per-instance memory small when thousands of
+cases are held at once; frozen instances can be shared across threads
+and serialized without defensive copies.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class HistoricalCase:
+    """Historical case from RAG database"""
+    case_id: str
+    complaint_type: str
+    resolution: str
+    outcome: str
+    embedding: list
+    similarity_score: float
+    metadata: dict
+    metadata_truncated: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ResolutionRecommendation:
+    """Resolution recommendation with citations"""
+    id: str
+    complaint_id: str
+    recommendations: list
+    primary_recommendation: str
+    confidence_score: float
+    cited_cases: tuple
+    reasoning: str
+    created_at: str
+    processing_time_ms: float
+    stage_timings_ms: dict = field(default_factory=dict)
+    token_usage: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_llm_output(
+        cls,
+        recommendation_id: str,
+        complaint_id: str,
+        parsed: dict,
+        similar_cases: list,
+        processing_time_ms: float,
+        stage_timings_ms: dict,
+        token_usage: Optional[dict] = None,
+    ) -> 'ResolutionRecommendation':
+        """Assemble a recommendation from parsed LLM output and the retrieved cases"""
+        return cls(
+            id=recommendation_id,
+            complaint_id=complaint_id,
+            recommendations=parsed.get('recommendations', []),
+            primary_recommendation=parsed.get('primary', ''),
+            confidence_score=parsed.get('confidence', 0.8),
+            cited_cases=tuple(similar_cases),
+            reasoning=parsed.get('reasoning', ''),
+            created_at=datetime.utcnow().isoformat(),
+            processing_time_ms=processing_time_ms,
+            stage_timings_ms=stage_timings_ms,
+            token_usage=token_usage or {},
+        )
@@ -0,0 +1,173 @@
+"""
+OpenSearch Transport Configuration
+
+Builds the shared OpenSearch client with explicit connection pooling,
+timeouts, retries and request compression, and exposes pool usage metrics
+so saturation under concurrent searches is visible. The pool is sized
+for ~200 concurrent searches per process; metrics are logged periodically
+as structured fields.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+import logging
+
+from opensearchpy import OpenSearch
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(environ: dict, name: str, default: bool) -> bool:
+    """Parse a boolean environment flag"""
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+@dataclass
+class TransportConfig:
+    """Connection pool, timeout and retry settings for the OpenSearch client"""
+    hosts: list
+    http_auth: Optional[tuple] = None
+    use_ssl: bool = True
+    verify_certs: bool = False
+    ca_certs: Optional[str] = None
+    pool_maxsize: int = 256
+    timeout_seconds: float = 5.0
+    max_retries: int = 2
+    retry_on_timeout: bool = True
+    retry_on_status: tuple = (502, 503, 504)
+    http_compress: bool = True
+    sniff_on_start: bool = False
+    sniff_on_connection_fail: bool = False
+    sniffer_timeout: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'TransportConfig':
+        """Read transport settings from OPENSEARCH_* environment variables"""
+        sniffer_timeout = environ.get('OPENSEARCH_SNIFFER_TIMEOUT_SECONDS')
+        return cls(
+            hosts=[h.strip() for h in environ.get('OPENSEARCH_ENDPOINT', 'localhost:9200').split(',') if h.strip()],
+            http_auth=(environ.get('OPENSEARCH_USER', 'admin'), environ.get('OPENSEARCH_PASSWORD', 'admin')),
+            use_ssl=_env_bool(environ, 'OPENSEARCH_USE_SSL', True),
+            verify_certs=_env_bool(environ, 'OPENSEARCH_VERIFY_CERTS', False),
+            ca_certs=environ.get('OPENSEARCH_CA_CERTS') or None,
+            pool_maxsize=int(environ.get('OPENSEARCH_POOL_MAXSIZE', '256')),
+            timeout_seconds=float(environ.get('OPENSEARCH_TIMEOUT_SECONDS', '5')),
+            max_retries=int(environ.get('OPENSEARCH_MAX_RETRIES', '2')),
+            retry_on_timeout=_env_bool(environ, 'OPENSEARCH_RETRY_ON_TIMEOUT', True),
+            http_compress=_env_bool(environ, 'OPENSEARCH_HTTP_COMPRESS', True),
+            sniff_on_start=_env_bool(environ, 'OPENSEARCH_SNIFF_ON_START', False),
+            sniff_on_connection_fail=_env_bool(environ, 'OPENSEARCH_SNIFF_ON_CONNECTION_FAIL', False),
+            sniffer_timeout=float(sniffer_timeout) if sniffer_timeout else None,
+        )
+
+
+def build_opensearch_client(config: TransportConfig) -> OpenSearch:
+    """Create an OpenSearch client from a transport config"""
+    kwargs = dict(
+        hosts=config.hosts,
+        http_auth=config.http_auth,
+        use_ssl=config.use_ssl,
+        verify_certs=config.verify_certs,
+        ssl_show_warn=config.verify_certs,
+        # Keep enough warm keep-alive connections per node for concurrent searches
+        pool_maxsize=config.pool_maxsize,
+        timeout=config.timeout_seconds,
+        max_retries=config.max_retries,
+        retry_on_timeout=config.retry_on_timeout,
+        retry_on_status=config.retry_on_status,
+        # gzip request bodies; a 1536-float kNN vector compresses well
+        http_compress=config.http_compress,
+        sniff_on_start=config.sniff_on_start,
+        sniff_on_connection_fail=config.sniff_on_connection_fail,
+    )
+    if config.ca_certs:
+        kwargs['ca_certs'] = config.ca_certs
+    if config.sniffer_timeout:
+        kwargs['sniffer_timeout'] = config.sniffer_timeout
+
+    logger.info(
+        "OpenSearch transport: pool_maxsize=%d, timeout=%ss, max_retries=%d, http_compress=%s",
+        config.pool_maxsize, config.timeout_seconds, config.max_retries, config.http_compress,
+    )
+    return OpenSearch(**kwargs)
+
+
+@dataclass
+class PoolMetrics:
+    """In-flight request gauge for the OpenSearch client, logged every `report_interval_seconds`"""
+    client: Optional[OpenSearch] = field(default=None, repr=False)
+    report_interval_seconds: float = 60.0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_requests: int = 0
+    _last_report: float = field(default_factory=time.monotonic, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def track(self):
+        """Count a request as in flight for the duration of the block"""
+        with self._lock:
+            self.in_flight += 1
+            self.total_requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                now = time.monotonic()
+                due = self.report_interval_seconds > 0 and now - self._last_report >= self.report_interval_seconds
+                if due:
+                    self._last_report = now
+            if due:
+                self.report()
+
+    def report(self) -> None:
+        """Log a snapshot as structured fields (`opensearch_pool` in JSON logs)"""
+        try:
+            stats = self.snapshot(self.client)
+        except Exception as e:
+            logger.warning("Could not read OpenSearch pool stats: %s", e)
+            return
+        logger.info(
+            "OpenSearch pool: in_flight=%d peak=%d requests=%d",
+            stats['in_flight'], stats['peak_in_flight'], stats['total_requests'],
+            extra={'fields': {'opensearch_pool': stats}},
+        )
+
+    def snapshot(self, client: Optional[OpenSearch] = None) -> dict:
+        """Return gauge values, plus per-node urllib3 pool stats when a client is given"""
+        with self._lock:
+            stats = {
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'total_requests': self.total_requests,
+            }
+        if client is not None:
+            stats['nodes'] = connection_pool_stats(client)
+        return stats
+
+
+def connection_pool_stats(client: OpenSearch) -> list:
+    """Read per-node pool usage from the client's urllib3 connection pools"""
+    stats = []
+    for connection in client.transport.connection_pool.connections:
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            continue
+        # urllib3 keeps free slots (idle sockets or unopened placeholders) in a LIFO queue
+        available = pool.pool.qsize() if getattr(pool, 'pool', None) is not None else 0
+        stats.append({
+            'host': getattr(connection, 'host', ''),
+            'maxsize': getattr(pool, 'maxsize', None),
+            'available_slots': available,
+            'connections_opened': getattr(pool, 'num_connections', 0),
+            'requests': getattr(pool, 'num_requests', 0),
+        })
+    return stats
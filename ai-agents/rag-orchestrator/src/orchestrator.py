@@ -9,58 +9,101 @@ Orchestrates the Retrieval-Augmented Generation pipeline:
 5. Confidence scoring
 """
 
+import contextvars
 import json
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from dataclasses import replace
 from typing import Optional
-from dataclasses import dataclass, asdict
-from datetime import datetime
 import logging
 
 import boto3
-from opensearchpy import OpenSearch, helpers
+from botocore.exceptions import ClientError
+from opensearchpy import helpers
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from models import HistoricalCase, ResolutionRecommendation
+from serialization import dumps
+from prompts import RECOMMENDATION_INSTRUCTIONS, build_recommendation_prompt, parse_llm_response
+from opensearch_transport import TransportConfig, PoolMetrics, build_opensearch_client
+from tenant_routing import TenantRouter, InvalidFilterError, build_knn_filter, validate_filters
+from query_coalescer import QueryCoalescer
+from recommendation_sink import RecommendationSink
+from case_metadata import MetadataPolicy, MetadataLoader, cap_metadata, project
+from chunked_embedding import ChunkedEmbedder
+from index_management import document_id, truncated_field
+from two_stage_retrieval import RESCORE_MODES, knn_rescore, rescore_cases, rescored_similarity, truncate_embedding
+from structured_logging import configure_logging, flush_logs, request_context
+from token_accounting import ModelPricing, UsageAggregator, TokenBudgets, TokenBudgetExceededError
+from bedrock_scheduler import (
+    BedrockScheduler,
+    BedrockThrottledError,
+    PRIORITIES,
+    PRIORITY_INTERACTIVE,
+)
+
+# Configure logging (queued JSON records, written off the request path)
+configure_logging(os.environ)
 logger = logging.getLogger(__name__)
+# Longest a Lambda invocation waits at the end for queued log records to be written
+LOG_FLUSH_TIMEOUT_SECONDS = float(os.getenv('LOG_FLUSH_TIMEOUT_MS', '50')) / 1000
 
 # AWS Clients
 bedrock_client = boto3.client('bedrock-runtime', region_name=os.getenv('AWS_REGION', 'us-east-1'))
 sagemaker_client = boto3.client('sagemaker-runtime', region_name=os.getenv('AWS_REGION', 'us-east-1'))
 
-# OpenSearch client
-opensearch_client = OpenSearch(
-    hosts=[os.getenv('OPENSEARCH_ENDPOINT', 'localhost:9200')],
-    http_auth=(os.getenv('OPENSEARCH_USER', 'admin'), os.getenv('OPENSEARCH_PASSWORD', 'admin')),
-    use_ssl=True,
-    verify_certs=False,
-    ssl_show_warn=False,
+# OpenSearch client (pool size, timeouts and retries from OPENSEARCH_* env vars)
+opensearch_client = build_opensearch_client(TransportConfig.from_env(os.environ))
+opensearch_pool_metrics = PoolMetrics(
+    client=opensearch_client,
+    report_interval_seconds=float(os.getenv('OPENSEARCH_POOL_METRICS_INTERVAL_SECONDS', '60')),
 )
 
+# Shares one kNN search among concurrent/near-simultaneous identical queries
+query_coalescer = QueryCoalescer.from_env(os.environ)
 
-@dataclass
-class HistoricalCase:
-    """Historical case from RAG database"""
-    case_id: str
-    complaint_type: str
-    resolution: str
-    outcome: str
-    embedding: list
-    similarity_score: float
-    metadata: dict
+# Tenant -> index/alias routing (cached across invocations)
+tenant_router = TenantRouter.from_env(
+    opensearch_client,
+    default_index=os.getenv('OPENSEARCH_INDEX', 'historical-cases'),
+    environ=os.environ,
+)
 
+# Authorizer claim/context key that carries the caller's tenant
+TENANT_ID_CLAIM = os.getenv('TENANT_ID_CLAIM', 'tenant_id')
 
-@dataclass
-class ResolutionRecommendation:
-    """Resolution recommendation with citations"""
-    id: str
-    complaint_id: str
-    recommendations: list
-    primary_recommendation: str
-    confidence_score: float
-    cited_cases: list
-    reasoning: str
-    created_at: str
-    processing_time_ms: float
+# Client-side RPM/TPM scheduler shared by every orchestrator in this process
+bedrock_scheduler = BedrockScheduler.from_env(os.environ)
+
+# Background threads for speculative lexical prefetch (SPECULATIVE_RETRIEVAL=true)
+speculation_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('SPECULATIVE_WORKERS', '8')),
+    thread_name_prefix='speculative-retrieval',
+)
+
+# Metadata allow-lists and per-case size cap (CASE_METADATA_* env vars)
+metadata_policy = MetadataPolicy.from_env(os.environ)
+metadata_loader = MetadataLoader(opensearch_client)
+
+# Parallel embedding of long-complaint chunks (EMBEDDING_CHUNKING=true)
+embedding_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('EMBEDDING_WORKERS', '4')),
+    thread_name_prefix='chunk-embedding',
+)
+
+# Token usage/cost accounting and optional per-tenant budgets (TENANT_TOKEN_BUDGET* env vars)
+model_pricing = ModelPricing.from_env(os.environ)
+usage_aggregator = UsageAggregator.from_env(os.environ)
+token_budgets = TokenBudgets.from_env(os.environ)
+
+# Optional columnar analytics sink (enabled by RECOMMENDATION_SINK_URI)
+recommendation_sink = RecommendationSink.from_env(os.environ)
+
+# Upper bound on lexical candidates per speculative prefetch
+MAX_SPECULATIVE_CANDIDATES = 50
+
+BEDROCK_THROTTLE_CODES = {'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException'}
 
 
 class RAGOrchestrator:
@@ -70,190 +113,465 @@ class RAGOrchestrator:
         self.model_id = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
         self.embedding_endpoint = os.getenv('SAGEMAKER_ENDPOINT', 'smartresolve-embeddings')
         self.opensearch_index = os.getenv('OPENSEARCH_INDEX', 'historical-cases')
+        self.max_output_tokens = 1500
+        self.max_throttle_retries = int(os.getenv('BEDROCK_MAX_THROTTLE_RETRIES', '3'))
+        self.speculative_retrieval = os.getenv('SPECULATIVE_RETRIEVAL', 'false').lower() == 'true'
+        # Each candidate carries a full embedding, so the lexical fetch is kept small
+        self.speculative_candidates = min(
+            int(os.getenv('SPECULATIVE_CANDIDATES', '20')), MAX_SPECULATIVE_CANDIDATES
+        )
+        self.speculative_min_score = float(os.getenv('SPECULATIVE_MIN_SCORE', '0.75'))
+        # How long to wait for an unfinished prefetch once the embedding is ready
+        self.speculative_wait_seconds = float(os.getenv('SPECULATIVE_WAIT_MS', '5')) / 1000
+        self.metadata_policy = metadata_policy
+        self.two_stage_retrieval = os.getenv('TWO_STAGE_RETRIEVAL', 'false').lower() == 'true'
+        self.two_stage_candidates = int(os.getenv('TWO_STAGE_CANDIDATES', '100'))
+        # server: knn_score rescore on the nodes; client: fetch candidate embeddings and rescore here
+        self.two_stage_rescore = os.getenv('TWO_STAGE_RESCORE', 'server')
+        if self.two_stage_rescore not in RESCORE_MODES:
+            raise ValueError(f"Unknown TWO_STAGE_RESCORE {self.two_stage_rescore!r}; expected one of {RESCORE_MODES}")
+        self.truncated_dimension = int(os.getenv('KNN_TRUNCATED_DIMENSION', '0'))
+        self.chunked_embedder = None
+        if os.getenv('EMBEDDING_CHUNKING', 'false').lower() == 'true':
+            self.chunked_embedder = ChunkedEmbedder.from_env(
+                self._invoke_embedding_endpoint, os.environ, executor=embedding_executor
+            )
         
-    def generate_recommendation(self, complaint_summary: str, complaint_id: str) -> ResolutionRecommendation:
+    def generate_recommendation(
+        self,
+        complaint_summary: str,
+        complaint_id: str,
+        tenant_id: Optional[str] = None,
+        filters: Optional[dict] = None,
+        priority: str = PRIORITY_INTERACTIVE,
+        complaint_type: Optional[str] = None,
+        keywords: Optional[list] = None,
+    ) -> ResolutionRecommendation:
         """Generate resolution recommendation using RAG pipeline"""
         
-        import time
+        validate_filters(filters)
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+        # Check the tenant's budget before spending embedding and retrieval work on a request it rejects
+        model_id = self._admit_model(tenant_id)
         start_time = time.time()
+        stage_timings = {}
         
-        try:
-            logger.info(f"Generating recommendation for complaint {complaint_id}")
-            
-            # Step 1: Generate embedding for query
-            query_embedding = self._generate_embedding(complaint_summary)
-            
-            # Step 2: Retrieve similar historical cases
-            similar_cases = self._retrieve_similar_cases(query_embedding, top_k=5)
-            
-            if not similar_cases:
-                logger.warning(f"No similar cases found for complaint {complaint_id}")
-                similar_cases = []
-            
-            # Step 3: Generate prompt with context
-            prompt = self._build_recommendation_prompt(complaint_summary, similar_cases)
-            
-            # Step 4: Call Bedrock for recommendations
-            llm_response = self._call_bedrock(prompt)
-            recommendations = self._parse_llm_response(llm_response)
-            
-            # Step 5: Create recommendation object
-            processing_time = (time.time() - start_time) * 1000
-            
-            recommendation = ResolutionRecommendation(
-                id=self._generate_id(),
-                complaint_id=complaint_id,
-                recommendations=recommendations.get('recommendations', []),
-                primary_recommendation=recommendations.get('primary', ''),
-                confidence_score=recommendations.get('confidence', 0.8),
-                cited_cases=[asdict(case) for case in similar_cases],
-                reasoning=recommendations.get('reasoning', ''),
-                created_at=datetime.utcnow().isoformat(),
-                processing_time_ms=processing_time,
-            )
-            
-            logger.info(f"Recommendation generated in {processing_time:.0f}ms")
-            return recommendation
-            
-        except Exception as e:
-            logger.error(f"Error generating recommendation: {str(e)}")
-            raise
+        with request_context(complaint_id=complaint_id, tenant_id=tenant_id, stage_timings=stage_timings):
+            try:
+                logger.info("Generating recommendation for complaint %s", complaint_id)
+                
+                # Speculatively prefetch lexical candidates while the embedding is in flight
+                prefetch = None
+                if self.speculative_retrieval and (complaint_type or keywords):
+                    # Run in a copy of the request context so prefetch logs carry complaint_id
+                    prefetch = speculation_executor.submit(
+                        contextvars.copy_context().run,
+                        self._lexical_prefetch, complaint_summary, complaint_type, keywords, tenant_id, filters,
+                    )
+                
+                # Step 1: Generate embedding for query
+                stage_start = time.perf_counter()
+                query_embedding = self._generate_embedding(complaint_summary)
+                stage_timings['embed'] = (time.perf_counter() - stage_start) * 1000
+                
+                # Step 2: Retrieve similar historical cases
+                stage_start = time.perf_counter()
+                similar_cases = None
+                if prefetch:
+                    _, _, top_k = self._resolve_search_target(tenant_id, filters, 5)
+                    similar_cases = self._rerank_prefetched(prefetch, query_embedding, top_k=top_k)
+                if similar_cases is None:
+                    similar_cases = self._retrieve_similar_cases(
+                        query_embedding, top_k=5, tenant_id=tenant_id, filters=filters
+                    )
+                stage_timings['retrieve'] = (time.perf_counter() - stage_start) * 1000
+                
+                if not similar_cases:
+                    logger.warning("No similar cases found for complaint %s", complaint_id)
+                    similar_cases = []
+                
+                # Step 3: Generate prompt with context
+                stage_start = time.perf_counter()
+                prompt = self._build_recommendation_prompt(complaint_summary, similar_cases)
+                stage_timings['prompt'] = (time.perf_counter() - stage_start) * 1000
+                
+                # Step 4: Call Bedrock for recommendations
+                stage_start = time.perf_counter()
+                llm_response, token_usage = self._call_bedrock_metered(
+                    prompt, priority=priority, tenant_id=tenant_id, complaint_type=complaint_type, model_id=model_id
+                )
+                stage_timings['llm'] = (time.perf_counter() - stage_start) * 1000
+                
+                stage_start = time.perf_counter()
+                recommendations = self._parse_llm_response(llm_response)
+                stage_timings['parse'] = (time.perf_counter() - stage_start) * 1000
+                
+                # Step 5: Create recommendation object
+                processing_time = (time.time() - start_time) * 1000
+                
+                recommendation = self._build_recommendation(
+                    complaint_id, recommendations, similar_cases, processing_time, stage_timings, token_usage
+                )
+                
+                logger.info("Recommendation generated in %.0fms", processing_time)
+                return recommendation
+                
+            except Exception as e:
+                logger.error("Error generating recommendation: %s", e)
+                raise
+    
+    def _build_recommendation(
+        self,
+        complaint_id: str,
+        recommendations: dict,
+        similar_cases: list[HistoricalCase],
+        processing_time: float,
+        stage_timings: dict,
+        token_usage: Optional[dict] = None,
+    ) -> ResolutionRecommendation:
+        """Assemble the result object from parsed LLM output and retrieved cases"""
+        response_fields = self.metadata_policy.response_fields
+        if response_fields is not None:
+            similar_cases = [
+                replace(case, metadata=project(case.metadata, response_fields)) for case in similar_cases
+            ]
+        return ResolutionRecommendation.from_llm_output(
+            self._generate_id(), complaint_id, recommendations, similar_cases, processing_time, stage_timings,
+            token_usage,
+        )
     
     def _generate_embedding(self, text: str) -> list:
-        """Generate embedding using SageMaker endpoint"""
+        """Generate embedding using SageMaker endpoint (chunked and pooled for long text when enabled)"""
         try:
-            response = sagemaker_client.invoke_endpoint(
-                EndpointName=self.embedding_endpoint,
-                ContentType='text/plain',
-                Body=text.encode('utf-8')
-            )
-            
-            embedding = json.loads(response['Body'].read().decode('utf-8'))
-            return embedding['embedding']
+            if self.chunked_embedder is not None:
+                return self.chunked_embedder(text)
+            return self._invoke_embedding_endpoint(text)
         except Exception as e:
-            logger.error(f"Error generating embedding: {str(e)}")
+            logger.error("Error generating embedding: %s", e)
             # Return zero vector as fallback
             return [0.0] * 1536
     
-    def _retrieve_similar_cases(self, query_embedding: list, top_k: int = 5) -> list[HistoricalCase]:
+    def _invoke_embedding_endpoint(self, text: str) -> list:
+        """Embed one piece of text; raises on failure"""
+        response = sagemaker_client.invoke_endpoint(
+            EndpointName=self.embedding_endpoint,
+            ContentType='text/plain',
+            Body=text.encode('utf-8')
+        )
+        
+        embedding = json.loads(response['Body'].read().decode('utf-8'))
+        return embedding['embedding']
+    
+    def _retrieve_similar_cases(
+        self,
+        query_embedding: list,
+        top_k: int = 5,
+        tenant_id: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> list[HistoricalCase]:
         """Search OpenSearch for similar cases using vector similarity"""
         try:
-            search_body = {
-                "size": top_k,
-                "query": {
-                    "knn": {
-                        "embedding": {
-                            "vector": query_embedding,
-                            "k": top_k
-                        }
-                    }
-                }
-            }
+            index, filter_terms, top_k = self._resolve_search_target(tenant_id, filters, top_k)
             
-            response = opensearch_client.search(
-                index=self.opensearch_index,
-                body=search_body
-            )
+            # Two-stage: wide, cheap pass on the truncated field, then full-vector rescoring
+            if self.two_stage_retrieval and self.truncated_dimension > 0:
+                try:
+                    cases = self._knn_search(index, filter_terms, query_embedding, top_k, two_stage=True)
+                    logger.info("Retrieved %d similar cases", len(cases))
+                    return cases
+                except Exception as e:
+                    # e.g. the index predates the truncated field; fall back to the full vector
+                    logger.warning("Two-stage search failed, using single-stage: %s", e)
             
-            cases = []
-            for hit in response['hits']['hits']:
-                case_data = hit['_source']
-                cases.append(HistoricalCase(
-                    case_id=case_data['case_id'],
-                    complaint_type=case_data['complaint_type'],
-                    resolution=case_data['resolution'],
-                    outcome=case_data['outcome'],
-                    embedding=case_data.get('embedding', []),
-                    similarity_score=hit['_score'],
-                    metadata=case_data.get('metadata', {})
-                ))
-            
-            logger.info(f"Retrieved {len(cases)} similar cases")
+            cases = self._knn_search(index, filter_terms, query_embedding, top_k)
+            logger.info("Retrieved %d similar cases", len(cases))
             return cases
             
         except Exception as e:
-            logger.error(f"Error retrieving similar cases: {str(e)}")
+            logger.error("Error retrieving similar cases: %s", e)
             return []
     
-    def _build_recommendation_prompt(self, complaint_summary: str, similar_cases: list[HistoricalCase]) -> str:
-        """Build prompt with complaint and historical context"""
+    def _knn_search(
+        self,
+        index: str,
+        filter_terms: dict,
+        query_embedding: list,
+        top_k: int,
+        two_stage: bool = False,
+    ) -> list[HistoricalCase]:
+        """Run one kNN query (on the truncated field and rescored when two_stage); raises on failure"""
+        server_rescore = two_stage and self.two_stage_rescore == 'server'
+        if two_stage:
+            vector_field = truncated_field(self.truncated_dimension)
+            search_vector = truncate_embedding(query_embedding, self.truncated_dimension)
+            k = max(self.two_stage_candidates, top_k)
+        else:
+            vector_field, search_vector, k = "embedding", query_embedding, top_k
         
-        context = "HISTORICAL SIMILAR CASES:\n"
-        for i, case in enumerate(similar_cases, 1):
-            context += f"""
-Case {i} (Similarity: {case.similarity_score:.2f}):
-- Type: {case.complaint_type}
-- Resolution Applied: {case.resolution}
-- Outcome: {case.outcome}
-- Details: {json.dumps(case.metadata)}
-"""
+        knn_query = {
+            "vector": search_vector,
+            "k": k
+        }
         
-        prompt = f"""You are an expert customer service resolution advisor. Analyze the complaint and recommend optimal resolutions based on historical precedents.
-
-CURRENT COMPLAINT:
-{complaint_summary}
-
-{context}
-
-Based on the complaint and historical cases, provide:
-1. Top 3 resolution recommendations (ranked by effectiveness)
-2. Confidence score (0-1) for the primary recommendation
-3. Reasoning that cites specific historical cases
-4. Expected outcome
-
-Respond with ONLY valid JSON (no markdown):
-{{
-  "recommendations": [
-    {{"rank": 1, "resolution": "...", "expectedOutcome": "...", "implementation": "..."}},
-    {{"rank": 2, "resolution": "...", "expectedOutcome": "...", "implementation": "..."}},
-    {{"rank": 3, "resolution": "...", "expectedOutcome": "...", "implementation": "..."}}
-  ],
-  "primary": "...",
-  "confidence": 0.85,
-  "reasoning": "..."
-}}"""
+        # Pre-filter inside the knn clause so the graph search only visits matching docs
+        knn_filter = build_knn_filter(filter_terms)
+        if knn_filter:
+            knn_query["filter"] = knn_filter
+        
+        search_body = {
+            "size": k,
+            "_source": {"includes": self.metadata_policy.source_includes()},
+            "query": {
+                "knn": {
+                    vector_field: knn_query
+                }
+            }
+        }
+        if server_rescore:
+            # The nodes rescore the k candidates with full vectors; only the top_k hits come back
+            search_body["size"] = top_k
+            search_body["rescore"] = knn_rescore(query_embedding, k)
         
-        return prompt
+        def search():
+            with opensearch_pool_metrics.track():
+                return opensearch_client.search(
+                    index=index,
+                    body=search_body
+                )
+        
+        # Key on the body without the vector; the vector is hashed separately (optionally quantized)
+        key_body = {**search_body, "query": {"knn": {vector_field: {**knn_query, "vector": None}}}}
+        if server_rescore:
+            key_body["rescore"] = knn_rescore(None, k)
+        response = query_coalescer.run(query_coalescer.key(index, query_embedding, key_body), search)
+        
+        hits = response['hits']['hits']
+        if server_rescore:
+            return [self._case_from_hit(hit, similarity_score=rescored_similarity(hit['_score'])) for hit in hits]
+        cases = [self._case_from_hit(hit) for hit in hits]
+        if two_stage:
+            cases = rescore_cases(query_embedding, cases, top_k)
+        return cases
     
-    def _call_bedrock(self, prompt: str) -> str:
-        """Call Bedrock Claude for recommendations"""
+    def _resolve_search_target(
+        self,
+        tenant_id: Optional[str],
+        filters: Optional[dict],
+        top_k: int,
+    ) -> tuple[str, dict, int]:
+        """Resolve the index, filter terms and k for a (possibly tenant-scoped) search"""
+        index = self.opensearch_index
+        filter_terms = dict(filters or {})
+        
+        if tenant_id:
+            tenant_settings = tenant_router.resolve(tenant_id)
+            index = tenant_settings.index
+            top_k = tenant_settings.top_k or top_k
+            # Tenant filters are applied last so request filters cannot widen isolation
+            filter_terms.update(tenant_settings.filters)
+        
+        return index, filter_terms, top_k
+    
+    def _case_from_hit(self, hit: dict, similarity_score: Optional[float] = None) -> HistoricalCase:
+        """Build a HistoricalCase from a search hit, capping oversized metadata"""
+        case_data = hit['_source']
+        metadata, truncated = cap_metadata(case_data.get('metadata', {}), self.metadata_policy.max_bytes)
+        return HistoricalCase(
+            case_id=case_data['case_id'],
+            complaint_type=case_data['complaint_type'],
+            resolution=case_data['resolution'],
+            outcome=case_data['outcome'],
+            embedding=case_data.get('embedding', []),
+            similarity_score=hit['_score'] if similarity_score is None else similarity_score,
+            metadata=metadata,
+            metadata_truncated=truncated,
+        )
+    
+    def _lexical_prefetch(
+        self,
+        complaint_summary: str,
+        complaint_type: Optional[str],
+        keywords: Optional[list],
+        tenant_id: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> list[HistoricalCase]:
+        """Fetch lexical candidates by complaint type/keywords (runs alongside embedding)"""
+        index, filter_terms, _ = self._resolve_search_target(tenant_id, filters, self.speculative_candidates)
+        if complaint_type:
+            filter_terms['complaint_type'] = complaint_type
+        
+        query_text = ' '.join(keywords) if keywords else complaint_summary
+        lexical_query = {
+            "bool": {
+                "should": [
+                    {"multi_match": {"query": query_text, "fields": ["complaint_summary", "resolution"]}}
+                ]
+            }
+        }
+        term_filter = build_knn_filter(filter_terms)
+        if term_filter:
+            lexical_query["bool"]["filter"] = term_filter["bool"]["filter"]
+        
+        search_body = {
+            "size": self.speculative_candidates,
+            "_source": {"includes": self.metadata_policy.source_includes()},
+            "query": lexical_query,
+        }
+        
+        with opensearch_pool_metrics.track():
+            response = opensearch_client.search(index=index, body=search_body)
+        return [self._case_from_hit(hit) for hit in response['hits']['hits']]
+    
+    def _rerank_prefetched(self, prefetch, query_embedding: list, top_k: int = 5) -> Optional[list[HistoricalCase]]:
+        """Rerank prefetched candidates by cosine similarity; None means fall back to kNN"""
         try:
-            response = bedrock_client.invoke_model(
-                modelId=self.model_id,
-                contentType='application/json',
-                accept='application/json',
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-06-01",
-                    "max_tokens": 1500,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                })
-            )
+            candidates = prefetch.result(timeout=self.speculative_wait_seconds)
+        except FuturesTimeoutError:
+            # Never hold the request for the speculation; kNN is already the fallback
+            logger.info("Speculative prefetch not ready, using kNN")
+            return None
+        except Exception as e:
+            logger.warning("Speculative prefetch unavailable, using kNN: %s", e)
+            return None
+        
+        if not any(query_embedding):
+            # Embedding failed (zero-vector fallback); lexical ranking is the best we have
+            return candidates[:top_k] if len(candidates) >= top_k else None
+        
+        scorable = [case for case in candidates if len(case.embedding) == len(query_embedding)]
+        if len(scorable) < top_k:
+            return None
+        
+        reranked = rescore_cases(query_embedding, scorable, top_k)
+        if reranked[-1].similarity_score < self.speculative_min_score:
+            # Lexical candidates are not close enough; a kNN search may find better precedents
+            return None
+        
+        logger.info("Speculative retrieval served %d of %d lexical candidates", top_k, len(candidates))
+        return reranked
+    
+    def _build_recommendation_prompt(self, complaint_summary: str, similar_cases: list[HistoricalCase]) -> str:
+        """Build the per-request prompt (cases + complaint); static instructions live in the system prefix"""
+        return build_recommendation_prompt(complaint_summary, similar_cases, self.metadata_policy.prompt_fields)
+    
+    def load_full_metadata(self, case: HistoricalCase, tenant_id: Optional[str] = None) -> dict:
+        """Fetch a case's complete metadata on demand (for cases marked metadata_truncated)"""
+        if not case.metadata_truncated:
+            return case.metadata
+        index, _, _ = self._resolve_search_target(tenant_id, None, 0)
+        try:
+            with opensearch_pool_metrics.track():
+                return metadata_loader.load(index, document_id(case.case_id, tenant_id))
+        except Exception as e:
+            logger.error("Error loading metadata for case %s: %s", case.case_id, e)
+            return case.metadata
+    
+    def _build_bedrock_request(self, prompt: str) -> dict:
+        """Build the Bedrock messages request with the static instructions as the system prompt"""
+        return {
+            "anthropic_version": "bedrock-2023-06-01",
+            "max_tokens": self.max_output_tokens,
+            "system": [{"type": "text", "text": RECOMMENDATION_INSTRUCTIONS}],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt}]
+                }
+            ]
+        }
+    
+    def _call_bedrock(self, prompt: str, priority: str = PRIORITY_INTERACTIVE) -> str:
+        """Call Bedrock Claude for recommendations"""
+        text, _ = self._invoke_bedrock(prompt, priority=priority)
+        return text
+    
+    def _call_bedrock_metered(
+        self,
+        prompt: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        tenant_id: Optional[str] = None,
+        complaint_type: Optional[str] = None,
+        model_id: Optional[str] = None,
+    ) -> tuple[str, dict]:
+        """Call Bedrock within the tenant's token budget; returns the text and a token usage record
+
+        `model_id` is the result of an earlier `_admit_model` for this request; without it the budget is checked here.
+        """
+        if model_id is None:
+            model_id = self._admit_model(tenant_id)
+        text, usage = self._invoke_bedrock(prompt, priority=priority, model_id=model_id)
+        
+        token_usage = model_pricing.usage_record(model_id, usage)
+        if token_budgets:
+            token_budgets.charge(tenant_id, token_usage['total_tokens'])
+        usage_aggregator.record(model_id, complaint_type, token_usage)
+        return text, token_usage
+    
+    def _admit_model(self, tenant_id: Optional[str]) -> str:
+        """Model to use for the tenant; raises TokenBudgetExceededError when its budget is spent"""
+        return token_budgets.admit(tenant_id, self.model_id) if token_budgets else self.model_id
+    
+    def _invoke_bedrock(
+        self,
+        prompt: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        model_id: Optional[str] = None,
+    ) -> tuple[str, dict]:
+        """Call Bedrock and return the response text together with its usage block"""
+        request_body = json.dumps(self._build_bedrock_request(prompt))
+        estimated_tokens = bedrock_scheduler.estimate_tokens(
+            RECOMMENDATION_INSTRUCTIONS + prompt, self.max_output_tokens
+        )
+        
+        for attempt in range(self.max_throttle_retries + 1):
+            reservation = bedrock_scheduler.acquire(estimated_tokens, priority=priority)
+            try:
+                response = bedrock_client.invoke_model(
+                    modelId=model_id or self.model_id,
+                    contentType='application/json',
+                    accept='application/json',
+                    body=request_body
+                )
+            except Exception as e:
+                bedrock_scheduler.cancel(reservation)
+                if not (isinstance(e, ClientError)
+                        and e.response.get('Error', {}).get('Code') in BEDROCK_THROTTLE_CODES):
+                    logger.error("Error calling Bedrock: %s", e)
+                    raise
+                
+                # Throttled calls are not billed; capacity was returned above, now slow down
+                bedrock_scheduler.on_throttle()
+                backoff = min(8.0, 0.25 * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                logger.warning("Bedrock throttled (attempt %d), retrying in %.2fs", attempt + 1, backoff)
+                time.sleep(backoff)
+                continue
             
             body = json.loads(response['body'].read())
-            return body['content'][0]['text']
-        except Exception as e:
-            logger.error(f"Error calling Bedrock: {str(e)}")
-            raise
+            usage = body.get('usage') or {}
+            bedrock_scheduler.on_success()
+            if usage:
+                bedrock_scheduler.release(
+                    reservation,
+                    actual_tokens=usage.get('input_tokens', 0) + usage.get('output_tokens', 0),
+                )
+                logger.info(
+                    "Bedrock usage: input=%s, output=%s, cache_read=%s, cache_write=%s",
+                    usage.get('input_tokens', 0),
+                    usage.get('output_tokens', 0),
+                    usage.get('cache_read_input_tokens', 0),
+                    usage.get('cache_creation_input_tokens', 0),
+                )
+            return body['content'][0]['text'], usage
+        
+        raise BedrockThrottledError(
+            f"Bedrock still throttled after {self.max_throttle_retries} retries",
+            retry_after=min(8.0, 0.25 * (2 ** self.max_throttle_retries)),
+        )
     
     def _parse_llm_response(self, response: str) -> dict:
         """Parse JSON response from LLM"""
-        try:
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                logger.warning("No JSON found in LLM response")
-                return {"recommendations": [], "primary": "", "confidence": 0.5, "reasoning": ""}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing LLM response: {str(e)}")
-            return {"recommendations": [], "primary": "", "confidence": 0.5, "reasoning": ""}
+        return parse_llm_response(response)
     
     def _generate_id(self) -> str:
         """Generate unique ID"""
@@ -261,13 +579,51 @@ Respond with ONLY valid JSON (no markdown):
         return str(uuid.uuid4())
 
 
+def _authorized_tenant(event: dict) -> Optional[str]:
+    """Tenant asserted by the API Gateway authorizer (Lambda context, Cognito or JWT claims)"""
+    authorizer = (event.get('requestContext') or {}).get('authorizer') or {}
+    for scope in (
+        authorizer,
+        authorizer.get('lambda') or {},
+        authorizer.get('claims') or {},
+        (authorizer.get('jwt') or {}).get('claims') or {},
+    ):
+        if scope.get(TENANT_ID_CLAIM):
+            return str(scope[TENANT_ID_CLAIM])
+    return None
+
+
 # Lambda handler
 def lambda_handler(event, context):
     """AWS Lambda handler for recommendation generation"""
+    # The root logger no longer goes through the runtime's handler, so carry its request ID ourselves
+    with request_context(aws_request_id=getattr(context, 'aws_request_id', None)):
+        try:
+            return _handle_request(event)
+        finally:
+            # Lambda may freeze the sandbox as soon as we return; bound the wait for queued records
+            flush_logs(LOG_FLUSH_TIMEOUT_SECONDS)
+
+
+def _handle_request(event) -> dict:
+    """Validate the API request, generate the recommendation and map errors to status codes"""
     try:
         body = json.loads(event.get('body', '{}'))
         complaint_summary = body.get('complainSummary', '')
         complaint_id = body.get('complaintId', '')
+        # The tenant comes from the authorizer; a body tenantId may only repeat it
+        tenant_id = _authorized_tenant(event)
+        if body.get('tenantId') not in (None, tenant_id):
+            return {
+                'statusCode': 403,
+                'body': json.dumps({'error': 'tenantId does not match the authorized tenant'})
+            }
+        filters = body.get('filters')
+        priority = body.get('priority', PRIORITY_INTERACTIVE)
+        complaint_type = body.get('complaintType')
+        keywords = body.get('keywords')
+        if priority not in PRIORITIES:
+            priority = PRIORITY_INTERACTIVE
         
         if not complaint_summary or not complaint_id:
             return {
@@ -275,18 +631,55 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Missing required fields'})
             }
         
+        try:
+            validate_filters(filters)
+        except InvalidFilterError as e:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': str(e)})
+            }
+        
         orchestrator = RAGOrchestrator()
-        recommendation = orchestrator.generate_recommendation(complaint_summary, complaint_id)
+        recommendation = orchestrator.generate_recommendation(
+            complaint_summary,
+            complaint_id,
+            tenant_id=tenant_id,
+            filters=filters,
+            priority=priority,
+            complaint_type=complaint_type,
+            keywords=keywords,
+        )
+        
+        if recommendation_sink:
+            try:
+                recommendation_sink.write(recommendation, tenant_id=tenant_id)
+            except Exception as e:
+                # Analytics export must never fail the request
+                logger.error("Error writing recommendation to sink: %s", e)
         
         return {
             'statusCode': 201,
-            'body': json.dumps(asdict(recommendation))
+            'body': dumps(recommendation)
+        }
+    except TokenBudgetExceededError as e:
+        logger.warning("Rejecting request, tenant token budget exhausted: %s", e)
+        return {
+            'statusCode': 429,
+            'headers': {'Retry-After': str(round(e.retry_after))},
+            'body': json.dumps({'error': 'Token budget exhausted'})
+        }
+    except BedrockThrottledError as e:
+        logger.warning("Rejecting request, Bedrock quota exhausted: %s", e)
+        return {
+            'statusCode': 429,
+            'headers': {'Retry-After': str(max(1, round(e.retry_after)))},
+            'body': json.dumps({'error': 'Too many requests'})
         }
     except Exception as e:
-        logger.error(f"Error in lambda_handler: {str(e)}")
+        logger.error("Error in lambda_handler: %s", e)
         return {
             'statusCode': 500,
-            'body': json.stringify({'error': 'Internal server error'})
+            'body': json.dumps({'error': 'Internal server error'})
         }
 
 
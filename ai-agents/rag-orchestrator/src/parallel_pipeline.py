@@ -0,0 +1,201 @@
+"""
+Process-pool Execution Mode for Batch Runs
+
+Splits batch/backfill work between an asyncio event loop and a process pool:
+1. I/O stages (embedding, retrieval, Bedrock) run on a thread pool driven
+   by the event loop, since the AWS/OpenSearch clients are synchronous
+2. CPU stages (prompt assembly, response parsing, JSON serialization) run
+   in worker processes on chunks of items, outside the GIL of the I/O threads
+
+Chunks are pipelined: while one chunk is in a worker process, others are
+waiting on I/O. A worker that dies (OOM kill, segfault) breaks the whole
+pool; the runner replaces the pool and retries the affected chunks item by
+item, so only the item that keeps killing workers is dropped.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Optional
+import logging
+
+from models import ResolutionRecommendation
+from prompts import build_recommendation_prompt, parse_llm_response
+from serialization import dumps
+from case_metadata import project
+from bedrock_scheduler import PRIORITY_BACKFILL
+
+logger = logging.getLogger(__name__)
+
+
+def build_prompts_chunk(chunk: list) -> list[str]:
+    """Worker: render prompts for (complaint_summary, cases) pairs"""
+    return [build_recommendation_prompt(summary, cases) for summary, cases in chunk]
+
+
+def finalize_chunk(chunk: list) -> list[tuple[str, str]]:
+    """Worker: parse LLM responses, build recommendations and serialize them to JSON"""
+    results = []
+    for complaint_id, response_text, cases, timings, token_usage in chunk:
+        start = time.perf_counter()
+        parsed = parse_llm_response(response_text)
+        timings = {**timings, 'parse': (time.perf_counter() - start) * 1000}
+
+        recommendation = ResolutionRecommendation.from_llm_output(
+            str(uuid.uuid4()), complaint_id, parsed, cases, sum(timings.values()), timings, token_usage
+        )
+        results.append((complaint_id, dumps(recommendation)))
+    return results
+
+
+class ProcessPoolBatchRunner:
+    """Runs batches with I/O on an event loop and CPU stages in a process pool
+
+    `processes=0` keeps the CPU stages inline on the event loop thread,
+    which is the baseline the benchmark compares against.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        processes: Optional[int] = None,
+        io_concurrency: int = 32,
+        chunk_size: int = 16,
+        max_chunks_in_flight: Optional[int] = None,
+        priority: str = PRIORITY_BACKFILL,
+    ):
+        self.orchestrator = orchestrator
+        self.processes = os.cpu_count() if processes is None else processes
+        self.io_concurrency = io_concurrency
+        self.chunk_size = chunk_size
+        self.max_chunks_in_flight = max_chunks_in_flight or max(2, io_concurrency // chunk_size + self.processes)
+        self.priority = priority
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+
+    def run(self, items: list) -> dict:
+        """Process BatchItems; returns complaint ID -> recommendation JSON"""
+        return asyncio.run(self.run_async(items))
+
+    async def run_async(self, items: list) -> dict:
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        semaphore = asyncio.Semaphore(self.max_chunks_in_flight)
+        if self.processes:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.processes)
+        try:
+            with ThreadPoolExecutor(max_workers=self.io_concurrency) as io_pool:
+                chunk_results = await asyncio.gather(*(self._run_chunk(chunk, semaphore, io_pool) for chunk in chunks))
+        finally:
+            if self._cpu_pool is not None:
+                self._cpu_pool.shutdown()
+                self._cpu_pool = None
+
+        results = {}
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        logger.info("Processed %d/%d items in %d chunks", len(results), len(items), len(chunks))
+        return results
+
+    async def _run_chunk(self, chunk: list, semaphore, io_pool) -> dict:
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            retrieved = await asyncio.gather(
+                *(loop.run_in_executor(io_pool, self._retrieve, item) for item in chunk),
+                return_exceptions=True,
+            )
+            ready = []
+            for item, result in zip(chunk, retrieved):
+                if isinstance(result, Exception):
+                    logger.error("Retrieval failed for %s: %s", item.complaint_id, result)
+                    continue
+                ready.append((item, *result))
+            if not ready:
+                return {}
+
+            # Embeddings and non-prompt metadata are not needed to render prompts; keep them out of the pickle
+            policy = self.orchestrator.metadata_policy
+            prompts = await self._cpu(
+                build_prompts_chunk,
+                [
+                    (
+                        item.complaint_summary,
+                        [replace(c, embedding=[], metadata=project(c.metadata, policy.prompt_fields)) for c in cases],
+                    )
+                    for item, cases, _ in ready
+                ],
+            )
+
+            # Items whose worker died come back as None
+            ready = [entry for entry, prompt in zip(ready, prompts) if prompt is not None]
+            prompts = [prompt for prompt in prompts if prompt is not None]
+            responses = await asyncio.gather(
+                *(
+                    loop.run_in_executor(io_pool, self._generate, prompt, item)
+                    for prompt, (item, _, _) in zip(prompts, ready)
+                ),
+                return_exceptions=True,
+            )
+            finalize_input = []
+            for (item, cases, timings), response in zip(ready, responses):
+                if isinstance(response, Exception):
+                    logger.error("Bedrock call failed for %s: %s", item.complaint_id, response)
+                    continue
+                text, llm_ms, token_usage = response
+                if policy.response_fields is not None:
+                    cases = [replace(c, metadata=project(c.metadata, policy.response_fields)) for c in cases]
+                finalize_input.append((item.complaint_id, text, cases, {**timings, 'llm': llm_ms}, token_usage))
+
+            finalized = await self._cpu(finalize_chunk, finalize_input)
+            return dict(result for result in finalized if result is not None)
+
+    async def _cpu(self, fn, chunk: list) -> list:
+        """Run a worker over a chunk; results are None for items whose worker died"""
+        if self._cpu_pool is None:
+            return fn(chunk)
+        try:
+            return await self._submit(fn, chunk)
+        except BrokenProcessPool:
+            logger.warning("Worker process died in %s; retrying %d items one by one", fn.__name__, len(chunk))
+        results = []
+        for entry in chunk:
+            try:
+                results.extend(await self._submit(fn, [entry]))
+            except BrokenProcessPool:
+                logger.error("Worker process died in %s on a single item; dropping it", fn.__name__)
+                results.append(None)
+        return results
+
+    async def _submit(self, fn, chunk: list) -> list:
+        pool = self._cpu_pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, chunk)
+        except BrokenProcessPool:
+            # Every chunk in flight on the dead pool lands here; only the first replaces it
+            if self._cpu_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self.processes)
+            raise
+
+    def _retrieve(self, item) -> tuple[list, dict]:
+        """I/O thread: embed and retrieve, returning cases and stage timings"""
+        start = time.perf_counter()
+        embedding = self.orchestrator._generate_embedding(item.complaint_summary)
+        embedded = time.perf_counter()
+        cases = self.orchestrator._retrieve_similar_cases(
+            embedding, top_k=5, tenant_id=item.tenant_id, filters=item.filters
+        )
+        return cases, {
+            'embed': (embedded - start) * 1000,
+            'retrieve': (time.perf_counter() - embedded) * 1000,
+        }
+
+    def _generate(self, prompt: str, item) -> tuple[str, float, dict]:
+        """I/O thread: call Bedrock, returning the text, call latency and token usage"""
+        start = time.perf_counter()
+        text, token_usage = self.orchestrator._call_bedrock_metered(
+            prompt, priority=self.priority, tenant_id=item.tenant_id, complaint_type=item.complaint_type
+        )
+        return text, (time.perf_counter() - start) * 1000, token_usage
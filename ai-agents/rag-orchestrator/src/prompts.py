@@ -0,0 +1,92 @@
+"""
+Prompt Assembly and Response Parsing
+
+Pure (I/O-free) functions for the CPU-bound parts of the RAG pipeline:
+rendering the per-request prompt and parsing the LLM's JSON answer.
+Kept free of AWS clients so they can run in worker processes.
+"""
+
+import json
+import re
+from typing import Optional
+import logging
+
+from models import HistoricalCase
+from case_metadata import project
+
+logger = logging.getLogger(__name__)
+
+# Static instructions and output schema, sent as the system prompt. At ~230
+# tokens this is below every model's minimum cacheable prefix (1024+), so no
+# cache_control checkpoint is set; cache token usage is still accounted for.
+RECOMMENDATION_INSTRUCTIONS = """You are an expert customer service resolution advisor. Analyze the complaint and recommend optimal resolutions based on historical precedents.
+
+The user message contains the HISTORICAL SIMILAR CASES retrieved for the complaint, followed by the CURRENT COMPLAINT.
+
+Based on the complaint and historical cases, provide:
+1. Top 3 resolution recommendations (ranked by effectiveness)
+2. Confidence score (0-1) for the primary recommendation
+3. Reasoning that cites specific historical cases by case ID
+4. Expected outcome
+
+Respond with ONLY valid JSON (no markdown):
+{
+  "recommendations": [
+    {"rank": 1, "resolution": "...", "expectedOutcome": "...", "implementation": "..."},
+    {"rank": 2, "resolution": "...", "expectedOutcome": "...", "implementation": "..."},
+    {"rank": 3, "resolution": "...", "expectedOutcome": "...", "implementation": "..."}
+  ],
+  "primary": "...",
+  "confidence": 0.85,
+  "reasoning": "..."
+}"""
+
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+EMPTY_RESPONSE = {"recommendations": [], "primary": "", "confidence": 0.5, "reasoning": ""}
+
+
+def build_recommendation_prompt(
+    complaint_summary: str,
+    similar_cases: list[HistoricalCase],
+    metadata_fields: Optional[tuple] = None,
+) -> str:
+    """Build the per-request prompt (cases + complaint); static instructions live in the system prefix
+
+    `metadata_fields` limits the case metadata rendered into the prompt.
+    """
+
+    # Most similar first; ties broken by ID so the same retrieved set renders identically
+    ordered_cases = sorted(similar_cases, key=lambda case: (-case.similarity_score, case.case_id))
+
+    context = "HISTORICAL SIMILAR CASES:\n"
+    for case in ordered_cases:
+        context += f"""
+Case {case.case_id} (Similarity: {case.similarity_score:.2f}):
+- Type: {case.complaint_type}
+- Resolution Applied: {case.resolution}
+- Outcome: {case.outcome}
+- Details: {json.dumps(project(case.metadata, metadata_fields), sort_keys=True)}
+"""
+
+    prompt = f"""{context}
+
+CURRENT COMPLAINT:
+{complaint_summary}"""
+
+    return prompt
+
+
+def parse_llm_response(response: str) -> dict:
+    """Parse JSON response from LLM"""
+    try:
+        # Extract JSON from response
+        json_match = JSON_OBJECT_PATTERN.search(response)
+        if json_match:
+            return json.loads(json_match.group())
+        else:
+            logger.warning("No JSON found in LLM response")
+            return dict(EMPTY_RESPONSE)
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing LLM response: {str(e)}")
+        return dict(EMPTY_RESPONSE)
@@ -0,0 +1,149 @@
+"""
+kNN Query Coalescing
+
+Collapses identical concurrent vector searches into one OpenSearch call:
+1. Queries are keyed by index, search body and the (optionally quantized)
+   query vector
+2. The first caller runs the search; callers with the same key wait on its
+   in-flight result instead of issuing their own
+3. Optionally, completed results are shared for a short window
+   (KNN_COALESCE_WINDOW_MS, off by default), so a burst of near-identical
+   complaints during an incident costs one search; a result served from
+   the window can miss writes made after it was fetched
+4. Counters are logged every `report_interval_seconds` as structured
+   fields (`knn_coalescer` in JSON logs)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCoalescer:
+    """Single-flight execution with an optional short result window, keyed by query vector"""
+
+    def __init__(
+        self,
+        window_seconds: float = 0.0,
+        quantum: Optional[float] = None,
+        max_entries: int = 1024,
+        report_interval_seconds: float = 60.0,
+    ):
+        self.window_seconds = window_seconds
+        self.quantum = quantum
+        self.max_entries = max_entries
+        self.report_interval_seconds = report_interval_seconds
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._recent: dict[str, tuple[float, object]] = {}
+        self.searches = 0
+        self.in_flight_hits = 0
+        self.window_hits = 0
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'QueryCoalescer':
+        """KNN_COALESCE_WINDOW_MS (default 0: share only in-flight results); KNN_COALESCE_QUANTUM rounds vectors"""
+        quantum = environ.get('KNN_COALESCE_QUANTUM')
+        return cls(
+            window_seconds=float(environ.get('KNN_COALESCE_WINDOW_MS', '0')) / 1000,
+            quantum=float(quantum) if quantum else None,
+            max_entries=int(environ.get('KNN_COALESCE_MAX_ENTRIES', '1024')),
+            report_interval_seconds=float(environ.get('KNN_COALESCE_METRICS_INTERVAL_SECONDS', '60')),
+        )
+
+    def key(self, index: str, vector: list, body: dict) -> str:
+        """Digest of the index, the non-vector search body and the (quantized) vector"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(index.encode('utf-8'))
+        digest.update(json.dumps(body, sort_keys=True, default=str).encode('utf-8'))
+        if self.quantum:
+            digest.update(array('q', (round(x / self.quantum) for x in vector)).tobytes())
+        else:
+            digest.update(array('d', vector).tobytes())
+        return digest.hexdigest()
+
+    def run(self, key: str, search: Callable[[], object]):
+        """Return `search()`'s result, sharing it with concurrent/recent callers of the same key"""
+        with self._lock:
+            now = time.monotonic()
+            due = self.report_interval_seconds > 0 and now - self._last_report >= self.report_interval_seconds
+            if due:
+                self._last_report = now
+
+            recent = self._recent.get(key)
+            shared = recent is not None and now - recent[0] <= self.window_seconds
+            if shared:
+                self.window_hits += 1
+            else:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self.searches += 1
+                else:
+                    self.in_flight_hits += 1
+
+        if due:
+            self.report()
+        if shared:
+            return recent[1]
+        if not leader:
+            return future.result()
+
+        try:
+            result = search()
+        except Exception as e:
+            # Errors are not cached; waiters see the same failure and later callers retry
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if self.window_seconds > 0:
+                self._store(key, result)
+        future.set_result(result)
+        return result
+
+    def report(self) -> None:
+        """Log a snapshot as structured fields (`knn_coalescer` in JSON logs)"""
+        stats = self.snapshot()
+        logger.info(
+            "kNN coalescer: requests=%d searches=%d hit_rate=%.3f",
+            stats['requests'], stats['searches'], stats['hit_rate'],
+            extra={'fields': {'knn_coalescer': stats}},
+        )
+
+    def snapshot(self) -> dict:
+        """Searches issued vs. requests served from an in-flight or recent result"""
+        with self._lock:
+            requests = self.searches + self.in_flight_hits + self.window_hits
+            return {
+                'requests': requests,
+                'searches': self.searches,
+                'in_flight_hits': self.in_flight_hits,
+                'window_hits': self.window_hits,
+                'hit_rate': (requests - self.searches) / requests if requests else 0.0,
+                'in_flight': len(self._in_flight),
+            }
+
+    def _store(self, key: str, result) -> None:
+        """Remember a result for the window, evicting expired (then oldest) entries"""
+        now = time.monotonic()
+        if len(self._recent) >= self.max_entries:
+            self._recent = {
+                k: entry for k, entry in self._recent.items() if now - entry[0] <= self.window_seconds
+            }
+            while len(self._recent) >= self.max_entries:
+                self._recent.pop(next(iter(self._recent)))
+        self._recent[key] = (now, result)
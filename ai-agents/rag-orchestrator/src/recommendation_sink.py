@@ -0,0 +1,320 @@
+"""
+Columnar Recommendation Sink
+
+Buffers ResolutionRecommendation rows (confidence, latency, per-stage
+timings, token usage and cited cases) and writes them as Hive-partitioned Parquet or
+Arrow IPC files for analytics. Buffers flush on row count, estimated size
+or age, from a background thread (and at exit) so writes stay off the
+request path; rows from a failed write go back into the buffer. Also
+provides a small percentile query over the written dataset.
+
+The background thread and exit hook suit long-lived processes. In Lambda
+(AWS_LAMBDA_FUNCTION_NAME set) neither runs reliably once the environment
+is frozen or recycled, so the sink flushes inline from write() on a short
+age threshold instead; rows buffered after the last flush are lost if the
+environment is recycled.
+
+Requires pyarrow; the sink is disabled when it is not installed.
+"""
+
+import atexit
+import sys
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('embed', 'retrieve', 'prompt', 'llm', 'parse')
+
+if pa is not None:
+    RECOMMENDATION_SCHEMA = pa.schema(
+        [
+            ('id', pa.string()),
+            ('complaint_id', pa.string()),
+            ('tenant_id', pa.string()),
+            ('created_at', pa.string()),
+            ('confidence_score', pa.float64()),
+            ('processing_time_ms', pa.float64()),
+            ('num_recommendations', pa.int32()),
+            ('primary_recommendation', pa.string()),
+            ('cited_case_ids', pa.list_(pa.string())),
+            ('cited_similarity_scores', pa.list_(pa.float64())),
+            ('model_id', pa.string()),
+            ('input_tokens', pa.int64()),
+            ('output_tokens', pa.int64()),
+            ('cache_read_tokens', pa.int64()),
+            ('cache_write_tokens', pa.int64()),
+            ('cost_usd', pa.float64()),
+        ]
+        + [(f'{stage}_ms', pa.float64()) for stage in STAGES]
+    )
+
+
+def _case_value(case, name: str):
+    """Read a field from a cited case stored as a dataclass or a dict"""
+    return case[name] if isinstance(case, dict) else getattr(case, name)
+
+
+def recommendation_to_row(recommendation, tenant_id: Optional[str] = None) -> dict:
+    """Flatten a recommendation into a sink row (drops embeddings and metadata)"""
+    timings = recommendation.stage_timings_ms or {}
+    usage = recommendation.token_usage or {}
+    row = {
+        'id': recommendation.id,
+        'complaint_id': recommendation.complaint_id,
+        'tenant_id': tenant_id,
+        'created_at': recommendation.created_at,
+        'confidence_score': float(recommendation.confidence_score),
+        'processing_time_ms': float(recommendation.processing_time_ms),
+        'num_recommendations': len(recommendation.recommendations),
+        'primary_recommendation': recommendation.primary_recommendation,
+        'cited_case_ids': [_case_value(c, 'case_id') for c in recommendation.cited_cases],
+        'cited_similarity_scores': [float(_case_value(c, 'similarity_score')) for c in recommendation.cited_cases],
+        'model_id': usage.get('model_id'),
+        'input_tokens': usage.get('input_tokens'),
+        'output_tokens': usage.get('output_tokens'),
+        'cache_read_tokens': usage.get('cache_read_tokens'),
+        'cache_write_tokens': usage.get('cache_write_tokens'),
+        'cost_usd': usage.get('cost_usd'),
+    }
+    for stage in STAGES:
+        row[f'{stage}_ms'] = timings.get(stage)
+    return row
+
+
+class RecommendationSink:
+    """Buffered writer of recommendation rows to partitioned Parquet/Arrow files"""
+
+    def __init__(
+        self,
+        base_uri: str,
+        file_format: str = 'parquet',
+        max_rows: int = 10000,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_age_seconds: float = 60.0,
+        max_buffered_rows: Optional[int] = None,
+        background: bool = True,
+    ):
+        if pa is None:
+            raise ImportError("pyarrow is required for RecommendationSink")
+        if file_format not in ('parquet', 'arrow'):
+            raise ValueError(f"Unsupported sink format: {file_format}")
+
+        self.filesystem, self.base_path = pafs.FileSystem.from_uri(base_uri)
+        self.file_format = file_format
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        # Bound on rows kept across failed writes; the oldest are dropped beyond it
+        self.max_buffered_rows = max_buffered_rows or max_rows * 5
+
+        self._rows: list[dict] = []
+        self._bytes = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name='recommendation-sink', daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, environ: dict) -> Optional['RecommendationSink']:
+        """Build a sink from RECOMMENDATION_SINK_* variables, or None when disabled"""
+        base_uri = environ.get('RECOMMENDATION_SINK_URI')
+        if not base_uri:
+            return None
+        if pa is None:
+            logger.warning("RECOMMENDATION_SINK_URI is set but pyarrow is not installed; sink disabled")
+            return None
+
+        in_lambda = bool(environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+        return cls(
+            base_uri,
+            file_format=environ.get('RECOMMENDATION_SINK_FORMAT', 'parquet'),
+            max_rows=int(environ.get('RECOMMENDATION_SINK_MAX_ROWS', '10000')),
+            max_bytes=int(environ.get('RECOMMENDATION_SINK_MAX_BYTES', str(8 * 1024 * 1024))),
+            max_age_seconds=float(environ.get('RECOMMENDATION_SINK_MAX_AGE_SECONDS', '5' if in_lambda else '60')),
+            background=not in_lambda,
+        )
+
+    def write(self, recommendation, tenant_id: Optional[str] = None) -> None:
+        """Buffer one recommendation; crossing a size or age threshold triggers a flush"""
+        row = recommendation_to_row(recommendation, tenant_id=tenant_id)
+        with self._lock:
+            self._rows.append(row)
+            self._bytes += self._estimate_bytes(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = self._is_due()
+        if due:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def flush_if_due(self) -> None:
+        """Flush when the oldest buffered row has exceeded max_age_seconds"""
+        with self._lock:
+            due = self._is_due()
+        if due:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Write buffered rows to a new file and return its path; on failure the rows are re-buffered"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                self._bytes = 0
+                self._oldest = None
+            if not rows:
+                return None
+
+            try:
+                return self._write_rows(rows)
+            except Exception:
+                self._requeue(rows)
+                raise
+
+    def close(self) -> None:
+        """Stop the background thread and write whatever is buffered"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing recommendation sink on close: {str(e)}")
+
+    def _run(self) -> None:
+        """Background thread: flush when woken by write() or when the oldest row ages out"""
+        interval = max(1.0, self.max_age_seconds / 4)
+        while not self._closed:
+            self._wake.wait(timeout=interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.flush_if_due()
+            except Exception as e:
+                logger.error(f"Error flushing recommendation sink, rows kept for retry: {str(e)}")
+
+    def _requeue(self, rows: list[dict]) -> None:
+        """Put rows from a failed write back in front of the buffer, keeping at most max_buffered_rows"""
+        with self._lock:
+            combined = rows + self._rows
+            dropped = max(0, len(combined) - self.max_buffered_rows)
+            self._rows = combined[dropped:]
+            self._bytes = sum(self._estimate_bytes(row) for row in self._rows)
+            self._oldest = time.monotonic() if self._rows else None
+        if dropped:
+            logger.error(f"Recommendation sink buffer full; dropped {dropped} oldest rows")
+
+    def _write_rows(self, rows: list[dict]) -> str:
+        table = pa.Table.from_pylist(rows, schema=RECOMMENDATION_SCHEMA)
+        now = datetime.now(timezone.utc)
+        partition = f"{self.base_path}/dt={now:%Y-%m-%d}/hour={now:%H}"
+        self.filesystem.create_dir(partition, recursive=True)
+        path = f"{partition}/part-{uuid.uuid4().hex}.{self.file_format}"
+
+        if self.file_format == 'parquet':
+            pq.write_table(table, path, filesystem=self.filesystem, compression='zstd')
+        else:
+            with self.filesystem.open_output_stream(path) as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        logger.info("Flushed %d recommendations to %s", len(rows), path)
+        return path
+
+    def _is_due(self) -> bool:
+        if len(self._rows) >= self.max_rows or self._bytes >= self.max_bytes:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_age_seconds
+
+    @staticmethod
+    def _estimate_bytes(row: dict) -> int:
+        """Cheap size estimate: string lengths plus 8 bytes per numeric value"""
+        size = 0
+        for value in row.values():
+            if isinstance(value, str):
+                size += len(value)
+            elif isinstance(value, list):
+                size += sum(len(v) if isinstance(v, str) else 8 for v in value)
+            else:
+                size += 8
+        return size
+
+
+def query_percentiles(
+    base_uri: str,
+    columns: tuple = ('processing_time_ms', 'confidence_score') + tuple(f'{s}_ms' for s in STAGES),
+    quantiles: tuple = (0.5, 0.9, 0.95, 0.99),
+    file_format: str = 'parquet',
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+) -> dict:
+    """Compute latency/confidence percentiles over the sink dataset"""
+    if pa is None:
+        raise ImportError("pyarrow is required for query_percentiles")
+
+    filesystem, base_path = pafs.FileSystem.from_uri(base_uri)
+    dataset = ds.dataset(
+        base_path,
+        filesystem=filesystem,
+        format='ipc' if file_format == 'arrow' else 'parquet',
+        partitioning=ds.partitioning(pa.schema([('dt', pa.string()), ('hour', pa.string())]), flavor='hive'),
+    )
+
+    expression = None
+    for condition in (
+        ds.field('dt') >= date_from if date_from else None,
+        ds.field('dt') <= date_to if date_to else None,
+        ds.field('tenant_id') == tenant_id if tenant_id else None,
+    ):
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(columns=list(columns), filter=expression)
+    results = {'rows': table.num_rows}
+    for column in columns:
+        values = pc.drop_null(table[column])
+        if len(values) == 0:
+            results[column] = {}
+            continue
+        points = pc.quantile(values, q=list(quantiles)).to_pylist()
+        results[column] = {f'p{round(q * 100)}': v for q, v in zip(quantiles, points)}
+    return results
+
+
+if __name__ == '__main__':
+    import json
+
+    if len(sys.argv) < 2:
+        print("Usage: python recommendation_sink.py <sink-uri> [parquet|arrow]")
+        sys.exit(1)
+
+    print(json.dumps(
+        query_percentiles(sys.argv[1], file_format=sys.argv[2] if len(sys.argv) > 2 else 'parquet'),
+        indent=2,
+    ))
@@ -0,0 +1,70 @@
+"""
+Fast JSON Serialization for Recommendations
+
+Serializes the slotted result types straight to JSON without
+`dataclasses.asdict`, which deep-copies every nested list and dict
+(including 1536-float embeddings) before `json.dumps` walks them again.
+Uses orjson when installed, which encodes dataclasses natively.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from models import HistoricalCase, ResolutionRecommendation
+
+
+def case_to_dict(case: HistoricalCase) -> dict:
+    """Shallow dict view of a case; nested values are shared, not copied"""
+    return {
+        'case_id': case.case_id,
+        'complaint_type': case.complaint_type,
+        'resolution': case.resolution,
+        'outcome': case.outcome,
+        'embedding': case.embedding,
+        'similarity_score': case.similarity_score,
+        'metadata': case.metadata,
+        'metadata_truncated': case.metadata_truncated,
+    }
+
+
+def recommendation_to_dict(recommendation: ResolutionRecommendation) -> dict:
+    """Shallow dict view of a recommendation, with cited cases as dicts"""
+    return {
+        'id': recommendation.id,
+        'complaint_id': recommendation.complaint_id,
+        'recommendations': recommendation.recommendations,
+        'primary_recommendation': recommendation.primary_recommendation,
+        'confidence_score': recommendation.confidence_score,
+        'cited_cases': [case_to_dict(case) for case in recommendation.cited_cases],
+        'reasoning': recommendation.reasoning,
+        'created_at': recommendation.created_at,
+        'processing_time_ms': recommendation.processing_time_ms,
+        'stage_timings_ms': recommendation.stage_timings_ms,
+        'token_usage': recommendation.token_usage,
+    }
+
+
+def dumps_bytes(obj) -> bytes:
+    """Encode a result object (or a list of them) as UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_to_jsonable(obj), separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj) -> str:
+    """Encode a result object (or a list of them) as a JSON string"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def _to_jsonable(obj):
+    if isinstance(obj, ResolutionRecommendation):
+        return recommendation_to_dict(obj)
+    if isinstance(obj, HistoricalCase):
+        return case_to_dict(obj)
+    if isinstance(obj, (list, tuple)):
+        return [_to_jsonable(item) for item in obj]
+    return obj
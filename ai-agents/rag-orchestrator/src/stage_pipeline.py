@@ -0,0 +1,248 @@
+"""
+Pipeline-parallel Stage Scheduler
+
+Runs the recommendation steps as independent stages (embed, retrieve,
+prompt, llm, parse), each with its own bounded queue and worker count, so
+that embedding complaint N+1 overlaps the Bedrock call for complaint N.
+Queue depth and per-stage utilization are exposed to find the bottleneck
+and size each stage separately.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+import logging
+
+from models import ResolutionRecommendation
+from bedrock_scheduler import PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class PipelineItem:
+    """One complaint travelling through the stages, with intermediate results"""
+    complaint_id: str
+    complaint_summary: str
+    tenant_id: Optional[str] = None
+    filters: Optional[dict] = None
+    priority: str = PRIORITY_INTERACTIVE
+    complaint_type: Optional[str] = None
+    embedding: Optional[list] = None
+    cases: list = field(default_factory=list)
+    prompt: Optional[str] = None
+    llm_response: Optional[str] = None
+    token_usage: dict = field(default_factory=dict)
+    result: Optional[ResolutionRecommendation] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+    stage_timings: dict = field(default_factory=dict)
+
+
+@dataclass
+class Stage:
+    """A pipeline step: `fn` mutates the item in place"""
+    name: str
+    fn: Callable[[PipelineItem], None]
+    workers: int = 1
+    queue_size: int = 64
+
+
+class _StageRuntime:
+    """Queue, worker threads and counters for one stage"""
+
+    def __init__(self, stage: Stage):
+        self.stage = stage
+        self.queue: queue.Queue = queue.Queue(maxsize=stage.queue_size)
+        self.threads: list[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self.failed = 0
+        self.active = 0
+        self.exited = 0
+
+
+class StagedPipeline:
+    """Bounded-queue, multi-worker pipeline over a list of stages"""
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = [_StageRuntime(stage) for stage in stages]
+        self.output: queue.Queue = queue.Queue()
+        self.started_at: Optional[float] = None
+
+    def start(self) -> 'StagedPipeline':
+        self.started_at = time.perf_counter()
+        for index, runtime in enumerate(self.stages):
+            for worker in range(runtime.stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index,),
+                    name=f"stage-{runtime.stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                runtime.threads.append(thread)
+        return self
+
+    def submit(self, item: PipelineItem, timeout: Optional[float] = None) -> None:
+        """Enqueue an item; blocks when the first stage's queue is full (backpressure)"""
+        self.stages[0].queue.put(item, timeout=timeout)
+
+    def close(self) -> None:
+        """Stop accepting work; stages drain and shut down in order"""
+        first = self.stages[0]
+        for _ in range(first.stage.workers):
+            first.queue.put(_STOP)
+
+    def join(self) -> None:
+        for runtime in self.stages:
+            for thread in runtime.threads:
+                thread.join()
+
+    def results(self) -> Iterator[PipelineItem]:
+        """Yield finished items (successful or failed) until the pipeline is drained"""
+        while True:
+            item = self.output.get()
+            if item is _STOP:
+                return
+            yield item
+
+    def run(self, items: list[PipelineItem]) -> list[PipelineItem]:
+        """Convenience: push all items through and collect them in completion order"""
+        self.start()
+        feeder = threading.Thread(target=self._feed, args=(items,), daemon=True)
+        feeder.start()
+        finished = list(self.results())
+        feeder.join()
+        self.join()
+        return finished
+
+    def metrics(self) -> dict:
+        """Queue depth, utilization and throughput per stage"""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        stats = {}
+        for runtime in self.stages:
+            with runtime.lock:
+                capacity = runtime.stage.workers * elapsed
+                stats[runtime.stage.name] = {
+                    'workers': runtime.stage.workers,
+                    'queue_depth': runtime.queue.qsize(),
+                    'queue_capacity': runtime.stage.queue_size,
+                    'active_workers': runtime.active,
+                    'processed': runtime.processed,
+                    'failed': runtime.failed,
+                    'utilization': runtime.busy_seconds / capacity if capacity else 0.0,
+                    'avg_ms': runtime.busy_seconds * 1000 / runtime.processed if runtime.processed else 0.0,
+                }
+        return stats
+
+    def bottleneck(self) -> Optional[str]:
+        """Stage with the highest utilization (the one to give more workers)"""
+        stats = self.metrics()
+        if not stats:
+            return None
+        return max(stats, key=lambda name: stats[name]['utilization'])
+
+    def _feed(self, items: list[PipelineItem]) -> None:
+        for item in items:
+            self.submit(item)
+        self.close()
+
+    def _worker(self, index: int) -> None:
+        runtime = self.stages[index]
+        next_queue = self.stages[index + 1].queue if index + 1 < len(self.stages) else self.output
+
+        while True:
+            item = runtime.queue.get()
+            if item is _STOP:
+                self._worker_exited(index)
+                return
+
+            # Failed items skip the remaining stages but still reach the output
+            if item.error is None:
+                start = time.perf_counter()
+                with runtime.lock:
+                    runtime.active += 1
+                try:
+                    runtime.stage.fn(item)
+                except Exception as e:
+                    item.error = f"{runtime.stage.name}: {str(e)}"
+                    logger.error("Stage %s failed for %s: %s", runtime.stage.name, item.complaint_id, e)
+                elapsed = time.perf_counter() - start
+                item.stage_timings[runtime.stage.name] = elapsed * 1000
+                with runtime.lock:
+                    runtime.active -= 1
+                    runtime.busy_seconds += elapsed
+                    runtime.processed += 1
+                    runtime.failed += item.error is not None
+
+            next_queue.put(item)
+
+    def _worker_exited(self, index: int) -> None:
+        """When the last worker of a stage exits, stop the next stage"""
+        runtime = self.stages[index]
+        with runtime.lock:
+            runtime.exited += 1
+            last = runtime.exited == runtime.stage.workers
+        if not last:
+            return
+        if index + 1 < len(self.stages):
+            following = self.stages[index + 1]
+            for _ in range(following.stage.workers):
+                following.queue.put(_STOP)
+        else:
+            self.output.put(_STOP)
+
+
+def build_recommendation_pipeline(
+    orchestrator,
+    workers: Optional[dict] = None,
+    queue_size: int = 64,
+    top_k: int = 5,
+) -> StagedPipeline:
+    """Stage the orchestrator's five steps with per-stage worker counts"""
+    workers = {'embed': 4, 'retrieve': 4, 'prompt': 1, 'llm': 16, 'parse': 1, **(workers or {})}
+
+    def embed(item: PipelineItem) -> None:
+        item.embedding = orchestrator._generate_embedding(item.complaint_summary)
+
+    def retrieve(item: PipelineItem) -> None:
+        item.cases = orchestrator._retrieve_similar_cases(
+            item.embedding, top_k=top_k, tenant_id=item.tenant_id, filters=item.filters
+        )
+
+    def prompt(item: PipelineItem) -> None:
+        item.prompt = orchestrator._build_recommendation_prompt(item.complaint_summary, item.cases)
+
+    def llm(item: PipelineItem) -> None:
+        item.llm_response, item.token_usage = orchestrator._call_bedrock_metered(
+            item.prompt, priority=item.priority, tenant_id=item.tenant_id, complaint_type=item.complaint_type
+        )
+
+    def parse(item: PipelineItem) -> None:
+        start = time.perf_counter()
+        parsed = orchestrator._parse_llm_response(item.llm_response)
+        # The worker records a stage's time only after fn returns, too late for the result
+        item.stage_timings['parse'] = (time.perf_counter() - start) * 1000
+        item.result = orchestrator._build_recommendation(
+            item.complaint_id,
+            parsed,
+            item.cases,
+            (time.perf_counter() - item.submitted_at) * 1000,
+            dict(item.stage_timings),
+            item.token_usage,
+        )
+
+    stages = [
+        Stage('embed', embed, workers['embed'], queue_size),
+        Stage('retrieve', retrieve, workers['retrieve'], queue_size),
+        Stage('prompt', prompt, workers['prompt'], queue_size),
+        Stage('llm', llm, workers['llm'], queue_size),
+        Stage('parse', parse, workers['parse'], queue_size),
+    ]
+    return StagedPipeline(stages)
@@ -0,0 +1,166 @@
+"""
+Non-blocking Structured Logging
+
+Keeps log I/O off the request path:
+1. Callers only enqueue records (QueueHandler); a background listener
+   thread formats and writes them
+2. Messages use %-style arguments and are formatted lazily on the
+   listener thread, never in the request thread
+3. Per-level sampling drops low-value records before they are enqueued
+4. A request-scoped context (complaint_id, tenant_id, stage timings) is
+   attached to every record as JSON fields
+
+The queue handler replaces the root logger's handlers, including the one the
+Lambda runtime installs, so the Lambda handler adds `aws_request_id` to the
+context itself and flushes the queue before returning.
+
+Configured from LOG_LEVEL, LOG_FORMAT (json|text), LOG_SAMPLE_DEBUG /
+LOG_SAMPLE_INFO / LOG_SAMPLE_WARNING (0-1) and LOG_QUEUE_SIZE.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+_request_context: contextvars.ContextVar = contextvars.ContextVar('request_context', default={})
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+
+@contextmanager
+def request_context(**fields):
+    """Attach fields (e.g. complaint_id) to every record logged inside the block"""
+    token = _request_context.set({**_request_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+def update_context(**fields) -> None:
+    """Add or replace fields of the current request context"""
+    _request_context.set({**_request_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Snapshots the request context onto the record (runs in the caller's thread)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context:
+            # Copy nested dicts (stage timings keep growing after the record is queued)
+            record.context = {k: dict(v) if isinstance(v, dict) else v for k, v in context.items()}
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records per level; unlisted levels are always kept"""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'context', {}))
+        # Per-record structured fields: logger.info(..., extra={'fields': {...}})
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records unformatted and drops them (counting) when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the message here, in the request thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def _sample_rates(environ: dict) -> dict:
+    rates = {}
+    for name in ('DEBUG', 'INFO', 'WARNING'):
+        value = environ.get(f'LOG_SAMPLE_{name}')
+        if value is not None:
+            rates[getattr(logging, name)] = float(value)
+    return rates
+
+
+def configure_logging(environ: dict) -> None:
+    """Route the root logger through a background queue listener (idempotent)"""
+    global _listener, _queue
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if environ.get('LOG_FORMAT', 'json').lower() == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    _queue = queue.Queue(maxsize=int(environ.get('LOG_QUEUE_SIZE', '10000')))
+    handler = NonBlockingQueueHandler(_queue)
+    handler.addFilter(SamplingFilter(_sample_rates(environ)))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(environ.get('LOG_LEVEL', 'INFO').upper())
+
+    _listener = logging.handlers.QueueListener(_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def flush_logs(timeout: float = 0.05) -> bool:
+    """Wait up to `timeout` seconds for queued records to be written
+
+    Call it where the process may be frozen or killed without running exit
+    hooks, e.g. at the end of each Lambda invocation; the wait is bounded,
+    and a record still queued at the deadline is written on the next thaw.
+    """
+    if _queue is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return not _queue.unfinished_tasks
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
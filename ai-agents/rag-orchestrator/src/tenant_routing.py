@@ -0,0 +1,173 @@
+"""
+Tenant-aware Index Routing for RAG Retrieval
+
+Resolves a tenant (line of business) to the OpenSearch index or alias that
+holds its historical cases, plus the metadata filters that must always be
+applied to its kNN queries. Settings are cached per tenant (LRU-bounded)
+so routing does not add a round trip to the retrieval hot path.
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dataclasses import dataclass, field
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Scalar types accepted as knn filter values (alone or as a list of one type)
+FILTER_VALUE_TYPES = (str, int, float, bool)
+
+
+class InvalidFilterError(ValueError):
+    """Raised when request filters cannot be turned into a knn filter"""
+
+
+@dataclass
+class TenantSettings:
+    """Retrieval settings for a single tenant"""
+    tenant_id: str
+    index: str
+    filters: dict = field(default_factory=dict)
+    top_k: Optional[int] = None
+
+
+class TenantRouter:
+    """Resolves tenants to indices/aliases with a TTL cache in front of the settings store"""
+
+    def __init__(
+        self,
+        client,
+        default_index: str,
+        settings_index: Optional[str] = None,
+        static_routes: Optional[dict] = None,
+        ttl_seconds: float = 300.0,
+        error_ttl_seconds: float = 5.0,
+        max_entries: int = 1024,
+    ):
+        self.client = client
+        self.default_index = default_index
+        self.settings_index = settings_index
+        self.static_routes = static_routes or {}
+        self.ttl_seconds = ttl_seconds
+        self.error_ttl_seconds = error_ttl_seconds
+        self.max_entries = max_entries
+        # Least recently used first; bounded because tenant IDs come from callers
+        self._cache: OrderedDict[str, tuple[TenantSettings, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, client, default_index: str, environ: dict) -> 'TenantRouter':
+        """Build a router from TENANT_INDEX_ROUTES / OPENSEARCH_TENANT_SETTINGS_INDEX"""
+        try:
+            static_routes = json.loads(environ.get('TENANT_INDEX_ROUTES', '{}'))
+        except json.JSONDecodeError as e:
+            logger.error(f"Ignoring malformed TENANT_INDEX_ROUTES: {str(e)}")
+            static_routes = {}
+
+        return cls(
+            client,
+            default_index=default_index,
+            settings_index=environ.get('OPENSEARCH_TENANT_SETTINGS_INDEX') or None,
+            static_routes=static_routes,
+            ttl_seconds=float(environ.get('TENANT_SETTINGS_TTL_SECONDS', '300')),
+            error_ttl_seconds=float(environ.get('TENANT_SETTINGS_ERROR_TTL_SECONDS', '5')),
+            max_entries=int(environ.get('TENANT_SETTINGS_CACHE_SIZE', '1024')),
+        )
+
+    def resolve(self, tenant_id: str) -> TenantSettings:
+        """Return cached settings for a tenant, loading them on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(tenant_id)
+            if cached and cached[1] > now:
+                self._cache.move_to_end(tenant_id)
+                return cached[0]
+
+        settings, ttl = self._load(tenant_id)
+        with self._lock:
+            self._cache[tenant_id] = (settings, now + ttl)
+            self._cache.move_to_end(tenant_id)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return settings
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Drop one tenant (or every tenant) from the cache"""
+        with self._lock:
+            if tenant_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(tenant_id, None)
+
+    def _load(self, tenant_id: str) -> tuple[TenantSettings, float]:
+        """Load settings (and how long to cache them) from static routes, the settings index or the shared default"""
+        route = self.static_routes.get(tenant_id)
+        if route is not None:
+            return self._from_route(tenant_id, route), self.ttl_seconds
+
+        ttl = self.ttl_seconds
+        if self.settings_index:
+            try:
+                response = self.client.get(index=self.settings_index, id=tenant_id, ignore=[404])
+                if response.get('found'):
+                    return self._from_route(tenant_id, response['_source']), self.ttl_seconds
+            except Exception as e:
+                logger.error(f"Error loading settings for tenant {tenant_id}: {str(e)}")
+                # The tenant may have a dedicated index; retry soon instead of pinning the fallback
+                ttl = self.error_ttl_seconds
+
+        # Unknown tenants share the default index, isolated by a tenant filter
+        fallback = TenantSettings(
+            tenant_id=tenant_id,
+            index=self.default_index,
+            filters={'tenant_id': tenant_id},
+        )
+        return fallback, ttl
+
+    def _from_route(self, tenant_id: str, route) -> TenantSettings:
+        """Normalize a route given either as an index name or a settings dict"""
+        if isinstance(route, str):
+            return TenantSettings(tenant_id=tenant_id, index=route)
+
+        return TenantSettings(
+            tenant_id=tenant_id,
+            index=route.get('index', self.default_index),
+            filters=route.get('filters', {}),
+            top_k=route.get('top_k'),
+        )
+
+
+def validate_filters(filters) -> None:
+    """Raise InvalidFilterError unless filters map field names to scalars or lists of one scalar type"""
+    if filters is None:
+        return
+    if not isinstance(filters, dict):
+        raise InvalidFilterError("filters must be an object")
+
+    for field_name, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            raise InvalidFilterError(f"Filter {field_name!r} has no values")
+        if not all(isinstance(item, FILTER_VALUE_TYPES) for item in values):
+            raise InvalidFilterError(f"Filter {field_name!r} must be a string, number or boolean (or a list of them)")
+        if len({isinstance(item, str) for item in values}) > 1:
+            raise InvalidFilterError(f"Filter {field_name!r} mixes strings and numbers")
+
+
+def build_knn_filter(filters: Optional[dict]) -> Optional[dict]:
+    """Translate a field -> value(s) mapping into a filter for the knn clause"""
+    if not filters:
+        return None
+    validate_filters(filters)
+
+    clauses = []
+    for field_name, value in sorted(filters.items()):
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({"terms": {field_name: sorted(value)}})
+        else:
+            clauses.append({"term": {field_name: value}})
+
+    return {"bool": {"filter": clauses}}
@@ -0,0 +1,294 @@
+"""
+Token Usage and Cost Accounting for Bedrock Calls
+
+Turns the `usage` block of each Bedrock response into an accounting record:
+1. Per-call usage record (input/output/cache tokens and estimated USD cost)
+   attached to the recommendation
+2. Rolling aggregates by model and complaint type over a sliding window
+3. Optional per-tenant token budgets that reject requests, or downgrade
+   them to a cheaper model, once a tenant's budget for the window is spent
+4. Aggregates and budget usage are logged every `report_interval_seconds`
+   as structured fields (`token_usage` / `token_budgets` in JSON logs)
+
+Like the Bedrock scheduler, aggregates and budgets are process-local: each
+Lambda execution environment keeps its own counters, so size per-tenant
+budgets for one environment (or fleet budget / expected concurrency).
+"""
+
+import json
+import math
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# On-demand USD prices per 1K tokens: (input, output)
+DEFAULT_PRICES = {
+    'anthropic.claude-3-sonnet-20240229-v1:0': (0.003, 0.015),
+    'anthropic.claude-3-5-sonnet-20240620-v1:0': (0.003, 0.015),
+    'anthropic.claude-3-haiku-20240307-v1:0': (0.00025, 0.00125),
+    'anthropic.claude-3-5-haiku-20241022-v1:0': (0.0008, 0.004),
+    'anthropic.claude-3-opus-20240229-v1:0': (0.015, 0.075),
+}
+
+# Prompt-cache writes and reads are billed relative to the input price
+CACHE_WRITE_FACTOR = 1.25
+CACHE_READ_FACTOR = 0.1
+
+BUDGET_ACTIONS = ('reject', 'downgrade')
+
+
+class _ReportTimer:
+    """Says when a periodic report is due; one caller per interval gets True"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        if self.interval_seconds <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last < self.interval_seconds:
+                return False
+            self._last = now
+            return True
+
+
+class TokenBudgetExceededError(Exception):
+    """Raised when a tenant has spent its token budget for the current window"""
+
+    def __init__(self, message: str, retry_after: float = 60.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelPricing:
+    """Per-model token prices used to estimate the cost of a call"""
+
+    def __init__(self, prices: Optional[dict] = None):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'ModelPricing':
+        """Defaults, overridden by BEDROCK_PRICING: {"<model id>": [input, output]} per 1K tokens"""
+        prices = dict(DEFAULT_PRICES)
+        for model_id, (input_price, output_price) in json.loads(environ.get('BEDROCK_PRICING', '{}')).items():
+            prices[model_id] = (float(input_price), float(output_price))
+        return cls(prices)
+
+    def price(self, model_id: str) -> Optional[tuple]:
+        """(input, output) per 1K tokens; cross-region profiles (`us.anthropic...`) use the base model's price"""
+        return self.prices.get(model_id) or self.prices.get(model_id.split('.', 1)[-1])
+
+    def usage_record(self, model_id: str, usage: dict, price_factor: float = 1.0) -> dict:
+        """Normalize a Bedrock `usage` block and add total tokens and estimated cost"""
+        record = {
+            'model_id': model_id,
+            'input_tokens': int(usage.get('input_tokens', 0)),
+            'output_tokens': int(usage.get('output_tokens', 0)),
+            'cache_read_tokens': int(usage.get('cache_read_input_tokens', 0)),
+            'cache_write_tokens': int(usage.get('cache_creation_input_tokens', 0)),
+        }
+        record['total_tokens'] = (
+            record['input_tokens'] + record['output_tokens']
+            + record['cache_read_tokens'] + record['cache_write_tokens']
+        )
+
+        price = self.price(model_id)
+        if price is None:
+            record['cost_usd'] = None
+        else:
+            input_price, output_price = price
+            cost = (
+                record['input_tokens'] * input_price
+                + record['cache_write_tokens'] * input_price * CACHE_WRITE_FACTOR
+                + record['cache_read_tokens'] * input_price * CACHE_READ_FACTOR
+                + record['output_tokens'] * output_price
+            ) / 1000
+            record['cost_usd'] = round(cost * price_factor, 8)
+        return record
+
+
+class UsageAggregator:
+    """Rolling token/cost totals by (model, complaint type) over a sliding window"""
+
+    FIELDS = ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens', 'total_tokens')
+
+    def __init__(
+        self,
+        window_seconds: float = 3600.0,
+        bucket_seconds: float = 60.0,
+        report_interval_seconds: float = 300.0,
+    ):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        # Oldest first: (bucket start, {(model, complaint type): totals})
+        self._buckets: deque = deque()
+        self._lock = threading.Lock()
+        self._report_timer = _ReportTimer(report_interval_seconds)
+
+    @classmethod
+    def from_env(cls, environ: dict) -> 'UsageAggregator':
+        """USAGE_WINDOW_SECONDS, USAGE_BUCKET_SECONDS and USAGE_REPORT_INTERVAL_SECONDS"""
+        return cls(
+            window_seconds=float(environ.get('USAGE_WINDOW_SECONDS', '3600')),
+            bucket_seconds=float(environ.get('USAGE_BUCKET_SECONDS', '60')),
+            report_interval_seconds=float(environ.get('USAGE_REPORT_INTERVAL_SECONDS', '300')),
+        )
+
+    def record(self, model_id: str, complaint_type: Optional[str], usage: dict) -> None:
+        """Add one call's usage record to the current bucket"""
+        now = time.time()
+        start = now - now % self.bucket_seconds
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != start:
+                self._buckets.append((start, defaultdict(self._empty_totals)))
+            self._evict(now)
+            totals = self._buckets[-1][1][(model_id, complaint_type or 'unknown')]
+            totals['calls'] += 1
+            for name in self.FIELDS:
+                totals[name] += usage.get(name, 0)
+            if usage.get('cost_usd') is not None:
+                totals['cost_usd'] += usage['cost_usd']
+        if self._report_timer.due():
+            self.report()
+
+    def report(self) -> None:
+        """Log the window's totals as structured fields (`token_usage` in JSON logs)"""
+        rows = self.snapshot()
+        logger.info(
+            "Token usage over %.0fs: calls=%d tokens=%d cost_usd=%.4f",
+            self.window_seconds, sum(row['calls'] for row in rows), sum(row['total_tokens'] for row in rows),
+            sum(row['cost_usd'] for row in rows), extra={'fields': {'token_usage': rows}},
+        )
+
+    def snapshot(self) -> list[dict]:
+        """Totals per (model, complaint type) for the window, most expensive first"""
+        combined = defaultdict(self._empty_totals)
+        with self._lock:
+            self._evict(time.time())
+            for _, bucket in self._buckets:
+                for key, totals in bucket.items():
+                    for name, value in totals.items():
+                        combined[key][name] += value
+
+        rows = [
+            {'model_id': model_id, 'complaint_type': complaint_type, **totals}
+            for (model_id, complaint_type), totals in combined.items()
+        ]
+        for row in rows:
+            row['avg_tokens_per_call'] = row['total_tokens'] / row['calls'] if row['calls'] else 0.0
+        return sorted(rows, key=lambda row: (row['cost_usd'], row['total_tokens']), reverse=True)
+
+    def _evict(self, now: float) -> None:
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= now - self.window_seconds:
+            self._buckets.popleft()
+
+    @classmethod
+    def _empty_totals(cls) -> dict:
+        return {'calls': 0, **{name: 0 for name in cls.FIELDS}, 'cost_usd': 0.0}
+
+
+class TokenBudgets:
+    """Per-tenant token budgets over fixed windows (e.g. per UTC day)
+
+    Admission is checked before a call and usage is charged after it, so
+    concurrent in-flight calls can overshoot a budget by their own size.
+    """
+
+    def __init__(
+        self,
+        limits: dict,
+        default_limit: Optional[int] = None,
+        window_seconds: float = 86400.0,
+        action: str = 'reject',
+        fallback_model_id: Optional[str] = None,
+        report_interval_seconds: float = 300.0,
+    ):
+        if action not in BUDGET_ACTIONS:
+            raise ValueError(f"Unknown budget action {action!r}; expected one of {BUDGET_ACTIONS}")
+        if action == 'downgrade' and not fallback_model_id:
+            raise ValueError("The downgrade budget action requires a fallback model")
+        self.limits = limits
+        self.default_limit = default_limit
+        self.window_seconds = window_seconds
+        self.action = action
+        self.fallback_model_id = fallback_model_id
+        self._used: dict = {}  # tenant -> (window index, tokens)
+        self._lock = threading.Lock()
+        self._report_timer = _ReportTimer(report_interval_seconds)
+
+    @classmethod
+    def from_env(cls, environ: dict) -> Optional['TokenBudgets']:
+        """Build budgets from TENANT_TOKEN_BUDGET* variables, or None when none are set"""
+        limits = {tenant: int(limit) for tenant, limit in json.loads(environ.get('TENANT_TOKEN_BUDGETS', '{}')).items()}
+        default_limit = environ.get('TENANT_TOKEN_BUDGET_DEFAULT')
+        if not limits and not default_limit:
+            return None
+        return cls(
+            limits,
+            default_limit=int(default_limit) if default_limit else None,
+            window_seconds=float(environ.get('TENANT_TOKEN_BUDGET_WINDOW_SECONDS', '86400')),
+            action=environ.get('TENANT_TOKEN_BUDGET_ACTION', 'reject'),
+            fallback_model_id=environ.get('BEDROCK_FALLBACK_MODEL_ID'),
+            report_interval_seconds=float(environ.get('USAGE_REPORT_INTERVAL_SECONDS', '300')),
+        )
+
+    def limit(self, tenant_id: Optional[str]) -> Optional[int]:
+        return self.limits.get(tenant_id, self.default_limit)
+
+    def used(self, tenant_id: Optional[str]) -> int:
+        """Tokens charged to the tenant in the current window"""
+        window, tokens = self._used.get(tenant_id, (None, 0))
+        return tokens if window == self._window() else 0
+
+    def admit(self, tenant_id: Optional[str], model_id: str) -> str:
+        """Model to call for this tenant; raises TokenBudgetExceededError when rejected"""
+        limit = self.limit(tenant_id)
+        if limit is None or self.used(tenant_id) < limit:
+            return model_id
+        if self.action == 'downgrade':
+            logger.info("Tenant %s is over its token budget; using %s", tenant_id, self.fallback_model_id)
+            return self.fallback_model_id
+
+        reset_in = (self._window() + 1) * self.window_seconds - time.time()
+        raise TokenBudgetExceededError(
+            f"Tenant {tenant_id} used its budget of {limit} tokens",
+            retry_after=max(1.0, math.ceil(reset_in)),
+        )
+
+    def charge(self, tenant_id: Optional[str], tokens: int) -> None:
+        """Add a call's tokens to the tenant's current window"""
+        window = self._window()
+        with self._lock:
+            used_window, used = self._used.get(tenant_id, (window, 0))
+            self._used[tenant_id] = (window, (used if used_window == window else 0) + tokens)
+        if self._report_timer.due():
+            self.report()
+
+    def report(self) -> None:
+        """Log per-tenant usage against limits as structured fields (`token_budgets` in JSON logs)"""
+        budgets = self.snapshot()
+        over = sum(
+            1 for budget in budgets.values() if budget['limit'] is not None and budget['used'] >= budget['limit']
+        )
+        logger.info(
+            "Token budgets: tenants=%d over_budget=%d", len(budgets), over,
+            extra={'fields': {'token_budgets': budgets}},
+        )
+
+    def snapshot(self) -> dict:
+        """Used and limit per tenant for the current window"""
+        return {
+            tenant_id: {'used': self.used(tenant_id), 'limit': self.limit(tenant_id)}
+            for tenant_id in set(self.limits) | set(self._used)
+        }
+
+    def _window(self) -> int:
+        return int(time.time() // self.window_seconds)
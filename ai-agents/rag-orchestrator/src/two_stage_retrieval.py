@@ -0,0 +1,82 @@
+"""
+Two-stage (Truncated-vector) Retrieval
+
+Cheap first pass, exact second pass:
+1. kNN over a truncated, re-normalized prefix of the embedding (e.g. the
+   first 256 of 1536 dimensions) returns a wide candidate set
+2. Candidates are rescored against the full query vector, either on the
+   OpenSearch nodes with a `knn_score` rescore (TWO_STAGE_RESCORE=server,
+   the default: only the final top k hits travel back) or here with one
+   vectorized NumPy matrix-vector product (=client, which fetches every
+   candidate's full embedding)
+
+Works best with Matryoshka-trained embedding models, whose leading
+dimensions carry most of the signal; for other models widen the candidate
+set to recover recall.
+"""
+
+from dataclasses import replace
+import logging
+
+import numpy as np
+
+from models import HistoricalCase
+
+logger = logging.getLogger(__name__)
+
+RESCORE_MODES = ('server', 'client')
+
+
+def truncate_embedding(embedding: list, dimension: int) -> list:
+    """First `dimension` components, L2-normalized so cosine scores stay comparable"""
+    prefix = np.asarray(embedding[:dimension], dtype=np.float32)
+    norm = np.linalg.norm(prefix)
+    return (prefix / norm if norm > 0 else prefix).tolist()
+
+
+def rescore_cases(query_embedding: list, cases: list[HistoricalCase], top_k: int) -> list[HistoricalCase]:
+    """Rank candidates by full-vector cosine similarity (on the cosinesimil score scale)"""
+    scorable = [case for case in cases if len(case.embedding) == len(query_embedding)]
+    if len(scorable) < len(cases):
+        logger.warning(
+            "%d of %d candidates lack a full-length embedding and were not rescored",
+            len(cases) - len(scorable), len(cases),
+        )
+    if not scorable:
+        return cases[:top_k]
+
+    matrix = np.asarray([case.embedding for case in scorable], dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    cosine = (matrix @ query) / np.maximum(norms, 1e-12)
+
+    k = min(top_k, len(scorable))
+    top = np.argpartition(-cosine, k - 1)[:k]
+    top = top[np.argsort(-cosine[top])]
+    return [replace(scorable[i], similarity_score=float((1 + cosine[i]) / 2)) for i in top]
+
+
+def knn_rescore(query_embedding: list, window_size: int, field: str = 'embedding') -> dict:
+    """`rescore` clause that reorders the first pass's top hits by exact full-vector cosine on the nodes"""
+    return {
+        'window_size': window_size,
+        'query': {
+            'query_weight': 0.0,
+            'rescore_query_weight': 1.0,
+            'rescore_query': {
+                'script_score': {
+                    'query': {'match_all': {}},
+                    'script': {
+                        'source': 'knn_score',
+                        'lang': 'knn',
+                        'params': {'field': field, 'query_value': query_embedding, 'space_type': 'cosinesimil'},
+                    },
+                },
+            },
+        },
+    }
+
+
+def rescored_similarity(score: float) -> float:
+    """The knn_score cosinesimil script scores 1 + cosine; map to the kNN query's (1 + cosine) / 2 scale"""
+    return score / 2
@@ -0,0 +1,110 @@
+import fnmatch
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class StubIndices:
+    """In-memory `client.indices`: index names, one alias map, and created bodies"""
+
+    def __init__(self):
+        self.bodies = {}
+        self.aliases = {}  # alias -> index
+
+    def create(self, index, body):
+        self.bodies[index] = body
+
+    def get(self, index, ignore=None):
+        return {name: {} for name in self.bodies if fnmatch.fnmatch(name, index)}
+
+    def exists(self, index):
+        return index in self.bodies or index in self.aliases
+
+    def exists_alias(self, name):
+        return name in self.aliases
+
+    def get_alias(self, name):
+        return {self.aliases[name]: {'aliases': {name: {}}}} if name in self.aliases else {}
+
+    def update_aliases(self, body):
+        for action in body['actions']:
+            if 'remove' in action:
+                self.aliases.pop(action['remove']['alias'], None)
+            else:
+                self.aliases[action['add']['alias']] = action['add']['index']
+
+    def delete(self, index):
+        self.bodies.pop(index)
+
+
+class StubOpenSearch:
+    """Minimal OpenSearch client: index management calls plus an in-memory, versioned document store"""
+
+    def __init__(self):
+        self.indices = StubIndices()
+        self.documents = {}  # index -> {_id: _source}
+        self.versions = {}  # (index, _id) -> version
+        self.reindexed = []
+        self.warmed = []
+        # Called with (source, dest) after each reindex snapshot, e.g. to simulate concurrent writes
+        self.on_reindex = None
+        self.transport = self
+
+    def perform_request(self, method, url):
+        self.warmed.append(url.rsplit('/', 1)[-1])
+        return {'_shards': {'total': 1, 'successful': 1}}
+
+    def resolve(self, index: str) -> str:
+        return self.indices.aliases.get(index, index)
+
+    def index_document(self, index, doc_id, source, version=None):
+        """Write one document; external versions below the stored one are conflicts (returns False)"""
+        index = self.resolve(index)
+        current = self.versions.get((index, doc_id))
+        if version is None:
+            version = (current or 0) + 1
+        elif current is not None and version < current:
+            return False
+        self.documents.setdefault(index, {})[doc_id] = source
+        self.versions[(index, doc_id)] = version
+        return True
+
+    def mget(self, body, _source_includes=None):
+        docs = []
+        for doc in body['docs']:
+            source = self.documents.get(self.resolve(doc['_index']), {}).get(doc['_id'])
+            docs.append({'_id': doc['_id'], 'found': source is not None, '_source': source or {}})
+        return {'docs': docs}
+
+    def get(self, index, id, _source_includes=None, ignore=None):
+        source = self.documents.get(self.resolve(index), {}).get(id)
+        return {'found': source is not None, '_source': source or {}}
+
+    def reindex(self, body, **kwargs):
+        source, dest = body['source']['index'], body['dest']['index']
+        self.reindexed.append((source, dest, body.get('script')))
+        source_name = source
+        since = body['source'].get('query', {}).get('range', {}).get('updated_at', {}).get('gte')
+        external = body['dest'].get('version_type') == 'external'
+        source = self.resolve(source)
+        copied = 0
+        for doc_id, document in list(self.documents.get(source, {}).items()):
+            if since and document.get('updated_at', '') < since:
+                continue
+            version = self.versions[(source, doc_id)]
+            current = self.versions.get((dest, doc_id))
+            if external and current is not None and version <= current:
+                continue
+            self.index_document(dest, doc_id, document, version if external else None)
+            copied += 1
+        if self.on_reindex:
+            self.on_reindex(source_name, dest)
+        return {'failures': [], 'created': copied, 'updated': 0}
+
+
+@pytest.fixture
+def opensearch():
+    return StubOpenSearch()
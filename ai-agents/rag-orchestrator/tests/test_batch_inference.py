@@ -0,0 +1,165 @@
+"""Batch inference job files, submission and output mapping against local Bedrock/S3 stubs"""
+
+import json
+
+import pytest
+
+from batch_inference import BATCH_PRICE_FACTOR, BatchInferencePipeline, BatchItem
+from models import HistoricalCase, ResolutionRecommendation
+from prompts import parse_llm_response
+from token_accounting import ModelPricing, TokenBudgets, UsageAggregator
+
+JOB_ID = 'abc123'
+FAILING_RECORD = 'C-2'
+
+
+class StubBody:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def iter_lines(self):
+        return iter(self.data.splitlines())
+
+
+class StubS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        return {'Body': StubBody(self.objects[(Bucket, Key)])}
+
+
+class StubBedrock:
+    """Runs a job synchronously on creation: reads the S3 input and writes `<job id>/<file>.out`"""
+
+    def __init__(self, s3: StubS3):
+        self.s3 = s3
+        self.jobs = []
+
+    def create_model_invocation_job(self, jobName, roleArn, modelId, inputDataConfig, outputDataConfig):
+        self.jobs.append({'jobName': jobName, 'modelId': modelId, 'input': inputDataConfig, 'output': outputDataConfig})
+        bucket, key = inputDataConfig['s3InputDataConfig']['s3Uri'][len('s3://'):].split('/', 1)
+        output_prefix = outputDataConfig['s3OutputDataConfig']['s3Uri'][len(f's3://{bucket}/'):]
+
+        lines = []
+        for line in self.s3.objects[(bucket, key)].splitlines():
+            record = json.loads(line)
+            if record['recordId'] == FAILING_RECORD:
+                lines.append({'recordId': record['recordId'], 'error': {'errorMessage': 'model error'}})
+                continue
+            answer = {'recommendations': [], 'primary': f"fix {record['recordId']}", 'confidence': 0.9, 'reasoning': ''}
+            lines.append({
+                'recordId': record['recordId'],
+                'modelInput': record['modelInput'],
+                'modelOutput': {
+                    'content': [{'type': 'text', 'text': json.dumps(answer)}],
+                    'usage': {'input_tokens': 100, 'output_tokens': 20},
+                },
+            })
+        body = b''.join(json.dumps(line).encode('utf-8') + b'\n' for line in lines)
+        self.s3.put_object(Bucket=bucket, Key=f"{output_prefix}{JOB_ID}/{key.rsplit('/', 1)[-1]}.out", Body=body)
+        return {'jobArn': f"arn:aws:bedrock:us-east-1:123456789012:model-invocation-job/{JOB_ID}"}
+
+    def get_model_invocation_job(self, jobIdentifier):
+        return {'status': 'PartiallyCompleted'}
+
+
+class StubOrchestrator:
+    model_id = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+    def _generate_embedding(self, text):
+        return [0.1, 0.2]
+
+    def _retrieve_similar_cases(self, embedding, top_k=5, tenant_id=None, filters=None):
+        return [HistoricalCase('H-1', 'billing', 'refund', 'resolved', embedding, 0.9, {})]
+
+    def _build_recommendation_prompt(self, summary, cases):
+        return f"{summary} ({len(cases)} cases)"
+
+    def _build_bedrock_request(self, prompt):
+        return {
+            'anthropic_version': 'bedrock-2023-06-01',
+            'system': [{'type': 'text', 'text': 'instructions'}],
+            'messages': [{'role': 'user', 'content': [{'type': 'text', 'text': prompt}]}],
+        }
+
+    def _parse_llm_response(self, text):
+        return parse_llm_response(text)
+
+    def _build_recommendation(self, complaint_id, parsed, cases, processing_time, timings, token_usage=None):
+        return ResolutionRecommendation.from_llm_output(
+            f"rec-{complaint_id}", complaint_id, parsed, cases, processing_time, timings, token_usage
+        )
+
+
+@pytest.fixture
+def pipeline():
+    s3 = StubS3()
+    return BatchInferencePipeline(
+        StubOrchestrator(), bucket='bucket', role_arn='arn:aws:iam::123456789012:role/batch',
+        prefix='jobs', bedrock_control=StubBedrock(s3), s3=s3,
+    )
+
+
+ITEMS = [BatchItem(f'C-{i}', f'complaint {i}') for i in range(1, 4)]
+
+
+def test_prepare_keys_records_by_complaint(pipeline):
+    prepared = pipeline.prepare(ITEMS, job_name='job')
+
+    assert [record['recordId'] for record in prepared.records] == ['C-1', 'C-2', 'C-3']
+    assert set(prepared.cases) == {'C-1', 'C-2', 'C-3'}
+
+
+def test_submit_uploads_job_file_and_starts_job(pipeline):
+    prepared = pipeline.prepare(ITEMS, job_name='job')
+    job_arn = pipeline.submit(prepared)
+
+    uploaded = pipeline.s3.objects[('bucket', 'jobs/input/job.jsonl')]
+    assert [json.loads(line)['recordId'] for line in uploaded.splitlines()] == ['C-1', 'C-2', 'C-3']
+    job = pipeline.bedrock_control.jobs[0]
+    assert job['modelId'] == StubOrchestrator.model_id
+    assert job['output']['s3OutputDataConfig']['s3Uri'] == 's3://bucket/jobs/output/'
+    assert job_arn.endswith(JOB_ID)
+
+
+def test_collect_reads_job_output_and_skips_failed_records(pipeline):
+    prepared = pipeline.prepare(ITEMS, job_name='job')
+    job_arn = pipeline.submit(prepared)
+
+    assert ('bucket', f'jobs/output/{JOB_ID}/job.jsonl.out') in pipeline.s3.objects
+    results = pipeline.collect(job_arn, prepared)
+
+    assert sorted(results) == ['C-1', 'C-3']
+    assert results['C-1'].primary_recommendation == 'fix C-1'
+    assert results['C-1'].cited_cases[0].case_id == 'H-1'
+    assert results['C-1'].token_usage['input_tokens'] == 100
+
+
+def test_run_round_trips_record_ids(pipeline):
+    results = pipeline.run(ITEMS, job_prefix='backfill', poll_interval=0)
+
+    assert {recommendation.complaint_id for recommendation in results.values()} == {'C-1', 'C-3'}
+
+
+def test_collect_records_usage_and_charges_tenant_budgets(pipeline):
+    pipeline.usage_aggregator = UsageAggregator(report_interval_seconds=0)
+    pipeline.token_budgets = TokenBudgets({'acme': 1000}, report_interval_seconds=0)
+    items = [BatchItem('C-1', 'complaint 1', tenant_id='acme', complaint_type='billing'), *ITEMS[1:]]
+    prepared = pipeline.prepare(items, job_name='job')
+
+    results = pipeline.collect(pipeline.submit(prepared), prepared)
+
+    charged = results['C-1'].token_usage['total_tokens']
+    assert pipeline.token_budgets.used('acme') == charged
+    rows = {row['complaint_type']: row for row in pipeline.usage_aggregator.snapshot()}
+    assert (rows['billing']['calls'], rows['billing']['total_tokens']) == (1, charged)
+    assert rows['unknown']['calls'] == 1
+    # Batch tokens are billed at the batch discount
+    assert rows['billing']['cost_usd'] == pytest.approx(
+        ModelPricing().usage_record(StubOrchestrator.model_id, {'input_tokens': 100, 'output_tokens': 20})['cost_usd']
+        * BATCH_PRICE_FACTOR
+    )
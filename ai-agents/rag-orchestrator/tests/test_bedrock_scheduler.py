@@ -0,0 +1,125 @@
+"""Bedrock scheduler: token buckets, AIMD rate adaptation and priority lanes"""
+
+import threading
+import time
+
+import pytest
+
+from bedrock_scheduler import (
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+    BedrockScheduler,
+    BedrockThrottledError,
+    TokenBucket,
+)
+
+
+def test_bucket_refills_at_per_minute_rate_up_to_capacity():
+    bucket = TokenBucket(60)  # one token per second
+    bucket.consume(60)
+
+    bucket.refill(bucket.updated_at + 10)
+    assert bucket.tokens == pytest.approx(10)
+
+    bucket.refill(bucket.updated_at + 120)
+    assert bucket.tokens == 60
+
+
+def test_bucket_wait_time():
+    bucket = TokenBucket(60)
+    bucket.consume(55)
+
+    assert bucket.wait_time(5) == 0.0
+    assert bucket.wait_time(8) == pytest.approx(3)
+    assert bucket.wait_time(5, reserve=10) == pytest.approx(10)
+    # Oversized requests only wait for a full bucket
+    assert bucket.wait_time(1000) == pytest.approx(55)
+
+
+def test_acquire_consumes_and_release_settles_actual_usage():
+    scheduler = BedrockScheduler(requests_per_minute=10, tokens_per_minute=1000)
+
+    reservation = scheduler.acquire(300)
+    assert scheduler.stats()['available_requests'] == pytest.approx(9, abs=0.01)
+    assert scheduler.stats()['available_tokens'] == pytest.approx(700, abs=1)
+
+    scheduler.release(reservation, actual_tokens=100)
+    assert scheduler.stats()['available_tokens'] == pytest.approx(900, abs=1)
+
+    scheduler.cancel(scheduler.acquire(200))
+    assert scheduler.stats()['available_tokens'] == pytest.approx(900, abs=1)
+
+
+def test_acquire_times_out_with_retry_after():
+    scheduler = BedrockScheduler(requests_per_minute=1, tokens_per_minute=1000)
+    scheduler.acquire(10)
+
+    with pytest.raises(BedrockThrottledError) as raised:
+        scheduler.acquire(10, timeout=0.01)
+    assert raised.value.retry_after > 0
+    assert scheduler.stats()['waiting'] == {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKFILL: 0}
+
+
+def test_unknown_priority_is_rejected():
+    scheduler = BedrockScheduler(requests_per_minute=10, tokens_per_minute=1000)
+
+    with pytest.raises(ValueError):
+        scheduler.acquire(10, priority='urgent')
+    assert scheduler.stats()['available_requests'] == pytest.approx(10, abs=0.01)
+
+
+def test_throttle_halves_rate_and_success_adds_back():
+    scheduler = BedrockScheduler(requests_per_minute=100, tokens_per_minute=10000, increase_step=0.1)
+
+    scheduler.on_throttle()
+    assert scheduler.scale == 0.5
+    assert scheduler.stats()['requests_per_minute'] == 50
+    assert scheduler.stats()['tokens_per_minute'] == 5000
+
+    scheduler.on_success()
+    assert scheduler.scale == pytest.approx(0.6)
+    for _ in range(10):
+        scheduler.on_success()
+    assert scheduler.scale == 1.0
+
+
+def test_throttle_never_drops_below_min_scale():
+    scheduler = BedrockScheduler(requests_per_minute=100, tokens_per_minute=10000, min_scale=0.1)
+
+    for _ in range(10):
+        scheduler.on_throttle()
+
+    assert scheduler.scale == 0.1
+    assert scheduler.throttle_count == 10
+
+
+def test_backfill_leaves_reserve_for_interactive():
+    scheduler = BedrockScheduler(requests_per_minute=10, tokens_per_minute=100000, backfill_reserve=0.2)
+    for _ in range(8):
+        scheduler.acquire(10)
+
+    # 2 requests left: all inside the 20% reserve, so backfill waits but interactive does not
+    with pytest.raises(BedrockThrottledError):
+        scheduler.acquire(10, priority=PRIORITY_BACKFILL, timeout=0.01)
+    scheduler.acquire(10, priority=PRIORITY_INTERACTIVE, timeout=0.01)
+
+
+def test_backfill_yields_to_waiting_interactive():
+    scheduler = BedrockScheduler(requests_per_minute=6000, tokens_per_minute=1000000, backfill_reserve=0)
+    scheduler.request_bucket.consume(scheduler.request_bucket.tokens)
+    order = []
+
+    def call(priority):
+        scheduler.acquire(10, priority=priority, timeout=5)
+        order.append(priority)
+
+    interactive = threading.Thread(target=call, args=(PRIORITY_INTERACTIVE,))
+    interactive.start()
+    while not scheduler.stats()['waiting'][PRIORITY_INTERACTIVE]:
+        time.sleep(0.001)
+    backfill = threading.Thread(target=call, args=(PRIORITY_BACKFILL,))
+    backfill.start()
+    interactive.join()
+    backfill.join()
+
+    assert order == [PRIORITY_INTERACTIVE, PRIORITY_BACKFILL]
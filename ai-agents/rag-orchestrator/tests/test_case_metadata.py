@@ -0,0 +1,46 @@
+"""Metadata allow-lists, source filtering and the per-case byte cap"""
+
+import json
+
+from case_metadata import CASE_SOURCE_FIELDS, MetadataPolicy, cap_metadata, project
+
+
+def _size(metadata):
+    return len(json.dumps(metadata, separators=(',', ':')))
+
+
+def test_exact_fit_is_not_truncated():
+    metadata = {'channel': 'phone', 'region': 'west'}
+
+    assert cap_metadata(metadata, _size(metadata)) == (metadata, False)
+    assert cap_metadata(metadata, _size(metadata) - 1) == ({'channel': 'phone'}, True)
+
+
+def test_oversized_key_is_skipped_and_later_keys_kept():
+    metadata = {'audit_log': 'x' * 10_000, 'channel': 'phone', 'region': 'west'}
+
+    capped, truncated = cap_metadata(metadata, 100)
+
+    assert capped == {'channel': 'phone', 'region': 'west'}
+    assert truncated is True
+    assert _size(capped) <= 100
+
+
+def test_empty_and_small_metadata_pass_through():
+    assert cap_metadata({}, 10) == ({}, False)
+    assert cap_metadata({'a': 1}, 4096) == ({'a': 1}, False)
+
+
+def test_source_includes_narrows_only_with_both_allow_lists():
+    assert MetadataPolicy().source_includes() == [*CASE_SOURCE_FIELDS, 'metadata']
+    assert MetadataPolicy(prompt_fields=('channel',)).source_includes()[-1] == 'metadata'
+
+    policy = MetadataPolicy.from_env({
+        'CASE_METADATA_PROMPT_FIELDS': 'region, channel', 'CASE_METADATA_RESPONSE_FIELDS': 'channel',
+    })
+    assert policy.source_includes() == [*CASE_SOURCE_FIELDS, 'metadata.channel', 'metadata.region']
+
+
+def test_project():
+    assert project({'a': 1, 'b': 2}, ('b', 'c')) == {'b': 2}
+    assert project({'a': 1}, None) == {'a': 1}
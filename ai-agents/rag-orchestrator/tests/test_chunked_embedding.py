@@ -0,0 +1,105 @@
+"""Chunked embedding: window sizing, overlap, over-long words, pooling and failed chunks"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from bedrock_scheduler import CHARS_PER_TOKEN
+from chunked_embedding import (
+    DEFAULT_MODEL_MAX_TOKENS,
+    DEFAULT_WINDOW_TOKENS,
+    ChunkedEmbedder,
+    chunk_text,
+    estimate_tokens,
+    pool,
+)
+
+
+def _words(count):
+    # Each "wNNN " is 5 characters, i.e. 2 estimated tokens
+    return ' '.join(f'w{n:03d}' for n in range(count))
+
+
+def test_windows_fit_the_budget_and_overlap():
+    chunks = chunk_text(_words(100), max_tokens=20, overlap_tokens=4)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 20 for chunk in chunks)
+    for previous, following in zip(chunks, chunks[1:]):
+        tail = previous.split()[-2:]
+        assert following.split()[:2] == tail
+    assert {word for chunk in chunks for word in chunk.split()} == set(_words(100).split())
+
+
+def test_over_long_words_are_split_by_characters():
+    token = 'x' * (25 * CHARS_PER_TOKEN)
+
+    chunks = chunk_text(f"see {token} end", max_tokens=10, overlap_tokens=2)
+
+    assert ''.join(chunks).count('x') >= len(token)
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+
+
+def test_chunking_edge_cases():
+    assert chunk_text('') == chunk_text('   ') == []
+    assert chunk_text('short text') == ['short text']
+    with pytest.raises(ValueError):
+        chunk_text('text', max_tokens=8, overlap_tokens=8)
+
+
+def test_mean_pooling_is_token_weighted_and_normalized():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+    pooled = pool(vectors, 'mean', np.array([3, 1]))
+
+    assert pooled == pytest.approx(np.array([3.0, 1.0]) / np.sqrt(10))
+    assert np.linalg.norm(pool(vectors, 'mean')) == pytest.approx(1.0)
+
+
+def test_max_pooling_and_unknown_mode():
+    pooled = pool(np.array([[0.5, -1.0], [0.1, 0.2]]), 'max')
+
+    assert pooled == pytest.approx(np.array([0.5, 0.2]) / np.linalg.norm([0.5, 0.2]))
+    assert pool(np.zeros((2, 2)), 'max') == pytest.approx([0.0, 0.0])
+    with pytest.raises(ValueError):
+        pool(np.ones((1, 2)), 'median')
+
+
+def test_window_defaults_to_the_model_limit():
+    embedder = ChunkedEmbedder.from_env(lambda text: [1.0], {})
+
+    assert embedder.max_tokens == DEFAULT_WINDOW_TOKENS
+    assert DEFAULT_MODEL_MAX_TOKENS * 0.8 < DEFAULT_WINDOW_TOKENS < DEFAULT_MODEL_MAX_TOKENS
+    assert ChunkedEmbedder.from_env(lambda text: [1.0], {'EMBEDDING_MODEL_MAX_TOKENS': '8192'}).max_tokens > 7000
+    assert ChunkedEmbedder.from_env(lambda text: [1.0], {'EMBEDDING_CHUNK_TOKENS': '128'}).max_tokens == 128
+
+
+def test_short_text_is_one_call():
+    calls = []
+    embedder = ChunkedEmbedder(lambda text: calls.append(text) or [1.0, 0.0], max_tokens=20, overlap_tokens=4)
+
+    assert embedder('a short complaint') == [1.0, 0.0]
+    assert calls == ['a short complaint']
+
+
+def test_long_text_pools_chunks_and_skips_failures():
+    def embed(text):
+        if 'w050' in text:
+            raise RuntimeError('endpoint timeout')
+        return [1.0, 0.0] if 'w000' in text else [0.0, 1.0]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        embedder = ChunkedEmbedder(embed, executor=executor, max_tokens=20, overlap_tokens=4)
+        vector = embedder(_words(100))
+
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    assert 0 < vector[0] < vector[1]
+
+
+def test_all_chunks_failing_raises():
+    def embed(text):
+        raise RuntimeError('endpoint down')
+
+    with pytest.raises(RuntimeError, match='chunks failed'):
+        ChunkedEmbedder(embed, max_tokens=20, overlap_tokens=4)(_words(100))
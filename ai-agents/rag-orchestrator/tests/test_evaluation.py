@@ -0,0 +1,112 @@
+"""Retrieval evaluation: metrics, the local stand-in index and the report"""
+
+import json
+import math
+
+import pytest
+
+from evaluation import (
+    LabelledQuery,
+    LocalVectorIndex,
+    evaluate,
+    format_report,
+    load_corpus,
+    load_queries,
+    ndcg_at_k,
+    recall_at_k,
+    reciprocal_rank,
+)
+from models import HistoricalCase
+
+
+def _case(case_id, embedding):
+    return HistoricalCase(case_id, 'billing', 'refund', 'resolved', embedding, 0.0, {})
+
+
+CORPUS = [
+    _case('east', [1.0, 0.0, 0.0]),
+    _case('north-east', [0.7, 0.7, 0.0]),
+    _case('north', [0.0, 1.0, 0.0]),
+    _case('up', [0.0, 0.0, 1.0]),
+]
+
+
+def test_recall_and_reciprocal_rank():
+    query = LabelledQuery('q1', '', ['a', 'c'])
+
+    assert recall_at_k(['a', 'b', 'c'], query, 1) == 0.5
+    assert recall_at_k(['a', 'b', 'c'], query, 3) == 1.0
+    assert reciprocal_rank(['b', 'c', 'a'], query) == 0.5
+    assert reciprocal_rank(['b'], query) == 0.0
+    assert recall_at_k(['a'], LabelledQuery('q2', '', []), 1) == 0.0
+
+
+def test_ndcg_uses_graded_relevance():
+    query = LabelledQuery('q1', '', ['a', 'b'], relevance={'a': 2, 'b': 1})
+
+    assert ndcg_at_k(['a', 'b'], query, 2) == pytest.approx(1.0)
+    swapped = (1 + 2 / math.log2(3)) / (2 + 1 / math.log2(3))
+    assert ndcg_at_k(['b', 'a'], query, 2) == pytest.approx(swapped)
+    assert ndcg_at_k(['x'], query, 1) == 0.0
+
+
+def test_local_index_ranks_by_cosine():
+    index = LocalVectorIndex(CORPUS)
+
+    results = index.search([2.0, 0.2, 0.0], top_k=2)
+
+    assert [case.case_id for case in results] == ['east', 'north-east']
+    assert results[0].similarity_score > results[1].similarity_score
+    assert len(index.search([1.0, 0.0, 0.0], top_k=10)) == 4
+
+
+def test_int8_index_keeps_ranking_close():
+    exact = LocalVectorIndex(CORPUS)
+    quantized = LocalVectorIndex(CORPUS, quantization='int8')
+
+    for query in ([1.0, 0.1, 0.0], [0.1, 1.0, 0.2], [0.0, 0.2, 1.0]):
+        assert quantized.search(query, 1)[0].case_id == exact.search(query, 1)[0].case_id
+    with pytest.raises(ValueError):
+        LocalVectorIndex(CORPUS, quantization='pq')
+
+
+def test_evaluate_reports_quality_and_latency():
+    index = LocalVectorIndex(CORPUS)
+    queries = [
+        LabelledQuery('q1', '', ['east'], query_embedding=[1.0, 0.0, 0.0]),
+        LabelledQuery('q2', '', ['up'], query_embedding=[0.0, 1.0, 0.0]),
+    ]
+
+    report = evaluate(queries, index.search, k_values=(1, 4), label='local', warmup=0)
+
+    assert report.recall_at_k == {1: 0.5, 4: 1.0}
+    assert report.mrr == pytest.approx((1 + 1 / 4) / 2)
+    assert set(report.latency_ms) == {'p50', 'p95', 'p99', 'mean'}
+    assert [row['query_id'] for row in report.per_query] == ['q1', 'q2']
+    assert format_report(report).startswith('[local] 2 queries')
+
+
+def test_evaluate_embeds_queries_without_embeddings():
+    index = LocalVectorIndex(CORPUS)
+    queries = [LabelledQuery('q1', 'north', ['north'])]
+
+    report = evaluate(queries, index.search, embed=lambda text: [0.0, 1.0, 0.0], k_values=(1,), warmup=0)
+
+    assert report.recall_at_k == {1: 1.0}
+    with pytest.raises(ValueError):
+        evaluate(queries, index.search)
+
+
+def test_load_queries_and_corpus(tmp_path):
+    queries_path = tmp_path / 'queries.jsonl'
+    queries_path.write_text(
+        json.dumps({'query_id': 1, 'complaint_summary': 's', 'relevant_case_ids': ['east']}) + '\n\n'
+    )
+    corpus_path = tmp_path / 'corpus.jsonl'
+    corpus_path.write_text(json.dumps({'case_id': 'east', 'embedding': [1.0, 0.0]}) + '\n')
+
+    query, = load_queries(str(queries_path))
+    case, = load_corpus(str(corpus_path))
+
+    assert (query.query_id, query.relevant_case_ids, query.query_embedding) == ('1', ['east'], None)
+    assert (case.case_id, case.embedding, case.metadata) == ('east', [1.0, 0.0], {})
@@ -0,0 +1,147 @@
+"""Index mapping, versioning, blue/green deploys and rollback against a stub client"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from index_management import IndexManager, IndexSettings, document_id, truncated_field
+
+
+def test_index_body_mapping_and_hnsw_parameters():
+    body = IndexSettings(engine='lucene', m=24, ef_construction=128).index_body()
+
+    properties = body['mappings']['properties']
+    method = properties['embedding']['method']
+    assert properties['embedding']['dimension'] == 1536
+    assert (method['engine'], method['space_type']) == ('lucene', 'cosinesimil')
+    assert method['parameters'] == {'m': 24, 'ef_construction': 128}
+    assert properties['metadata'] == {'type': 'object', 'enabled': False}
+    assert body['mappings']['dynamic'] is False
+    # Lucene reads ef_search from the query, so it is not an index setting
+    assert 'knn.algo_param.ef_search' not in body['settings']['index']
+    assert 'embedding_256' not in properties
+
+
+def test_native_engine_sets_ef_search_and_truncated_field():
+    body = IndexSettings(engine='faiss', ef_search=64, truncated_dimension=256).index_body()
+
+    assert body['settings']['index']['knn.algo_param.ef_search'] == 64
+    assert body['mappings']['properties'][truncated_field(256)]['dimension'] == 256
+
+
+def test_fingerprint_tracks_settings():
+    assert IndexSettings().fingerprint() == IndexSettings().fingerprint()
+    assert IndexSettings(m=32).fingerprint() != IndexSettings().fingerprint()
+    assert IndexSettings().index_body()['mappings']['_meta']['settings_fingerprint'] == IndexSettings().fingerprint()
+
+
+def test_from_env():
+    settings = IndexSettings.from_env({'KNN_ENGINE': 'faiss', 'KNN_HNSW_M': '32', 'KNN_TRUNCATED_DIMENSION': '128'})
+
+    assert (settings.engine, settings.m, settings.truncated_dimension) == ('faiss', 32, 128)
+    assert IndexSettings.from_env({}) == IndexSettings()
+
+
+def test_create_index_picks_next_version(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings())
+
+    assert manager.create_index() == 'cases-v1'
+    assert manager.create_index() == 'cases-v2'
+    opensearch.indices.create('cases-v10', {})
+    opensearch.indices.create('cases-archive', {})
+
+    assert manager.versions() == [(1, 'cases-v1'), (2, 'cases-v2'), (10, 'cases-v10')]
+    assert manager.create_index() == 'cases-v11'
+
+
+def test_first_deploy_creates_and_points_alias(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings(engine='faiss'))
+
+    assert manager.deploy() == 'cases-v1'
+
+    assert opensearch.indices.aliases == {'cases': 'cases-v1'}
+    assert opensearch.reindexed == []
+    assert opensearch.warmed == ['cases-v1']
+
+
+def test_deploy_reindexes_from_current_and_swaps(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings(truncated_dimension=256))
+    manager.deploy()
+    opensearch.index_document('cases', 'C-1', {'case_id': 'C-1'})
+
+    assert manager.deploy(delete_old=True) == 'cases-v2'
+
+    source, dest, script = opensearch.reindexed[0]
+    assert (source, dest) == ('cases-v1', 'cases-v2')
+    assert script['params'] == {'field': 'embedding_256', 'dimension': 256}
+    assert opensearch.indices.aliases == {'cases': 'cases-v2'}
+    assert 'cases-v1' not in opensearch.indices.bodies
+    assert opensearch.documents['cases-v2'] == {'C-1': {'case_id': 'C-1'}}
+    # Lucene graphs load with the segment; no warmup call
+    assert opensearch.warmed == []
+
+
+def test_deploy_copies_writes_made_during_the_reindex(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings())
+    manager.deploy()
+    opensearch.index_document('cases', 'C-1', {'case_id': 'C-1', 'updated_at': '2020-01-01T00:00:00+00:00'})
+    now = datetime.now(timezone.utc).isoformat()
+
+    def concurrent_writes(source, dest):
+        # Writers still target the alias (the old index) while the deploy runs
+        if len(opensearch.reindexed) == 1:
+            opensearch.index_document('cases', 'C-2', {'case_id': 'C-2', 'updated_at': now}, version=5)
+            opensearch.index_document('cases', 'C-1', {'case_id': 'C-1', 'v': 2, 'updated_at': now}, version=5)
+
+    opensearch.on_reindex = concurrent_writes
+    manager.deploy()
+
+    assert opensearch.documents['cases-v2'] == opensearch.documents['cases-v1']
+    assert opensearch.documents['cases-v2']['C-1']['v'] == 2
+    # Initial copy, one catch-up pass, and the final pass after the swap
+    assert len(opensearch.reindexed) == 3
+
+
+def test_catch_up_never_regresses_newer_documents(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings())
+    now = datetime.now(timezone.utc).isoformat()
+    opensearch.index_document('old', 'C-1', {'v': 1, 'updated_at': now}, version=100)
+    opensearch.index_document('new', 'C-1', {'v': 2, 'updated_at': now}, version=200)
+
+    manager.reindex('old', 'new', since='2020-01-01T00:00:00+00:00')
+
+    assert opensearch.documents['new']['C-1']['v'] == 2
+
+
+def test_document_id_is_tenant_scoped():
+    assert document_id('C-1') == 'C-1'
+    assert document_id('C-1', 'acme') == 'acme:C-1'
+    assert document_id('C-1', 'acme') != document_id('C-1', 'globex')
+
+
+def test_deploy_refuses_concrete_index_named_like_alias(opensearch):
+    opensearch.indices.create('cases', {})
+
+    with pytest.raises(ValueError):
+        IndexManager(opensearch, 'cases', IndexSettings()).deploy()
+
+
+def test_rollback_to_previous_version(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings())
+    manager.deploy()
+    manager.deploy()
+
+    assert manager.rollback() == 'cases-v1'
+    assert opensearch.indices.aliases == {'cases': 'cases-v1'}
+    with pytest.raises(ValueError):
+        manager.rollback()
+
+
+def test_describe(opensearch):
+    manager = IndexManager(opensearch, 'cases', IndexSettings())
+    manager.deploy()
+
+    description = manager.describe()
+
+    assert (description['current_index'], description['versions']) == ('cases-v1', ['cases-v1'])
+    assert description['settings_fingerprint'] == IndexSettings().fingerprint()
@@ -0,0 +1,112 @@
+"""Incremental index updates: tenant routing, change detection, versioning and dead letters"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import index_updater
+from index_updater import DeadLetterFile, FileEventSource, IncrementalIndexUpdater
+from tenant_routing import TenantRouter
+
+
+@pytest.fixture(autouse=True)
+def bulk(monkeypatch):
+    """helpers.bulk against the stub client; `_id`s listed in `reject` fail"""
+    state = SimpleNamespace(calls=[], reject=set())
+
+    def fake_bulk(client, actions, chunk_size, refresh, raise_on_error):
+        actions = list(actions)
+        state.calls.append(actions)
+        errors = []
+        for action in actions:
+            if action['_id'] in state.reject:
+                errors.append({'index': {'_id': action['_id'], 'status': 400, 'error': 'mapper_parsing_exception'}})
+                continue
+            client.index_document(action['_index'], action['_id'], action['_source'], action['_version'])
+        return len(actions) - len(errors), errors
+
+    monkeypatch.setattr(index_updater, 'helpers', SimpleNamespace(bulk=fake_bulk))
+    return state
+
+
+def _event(case_id, tenant_id=None, summary='Charged twice', **fields):
+    return {'case_id': case_id, 'tenant_id': tenant_id, 'complaint_summary': summary, 'resolution': 'refund',
+            'outcome': 'resolved', **fields}
+
+
+def _updater(client, **kwargs):
+    router = TenantRouter(client, 'cases', static_routes={'acme': 'cases-acme'})
+    return IncrementalIndexUpdater(client, 'cases', embed=lambda text: [0.5, 0.5, 0.5, 0.5], router=router, **kwargs)
+
+
+def test_events_go_to_the_tenant_index_under_tenant_scoped_ids(opensearch):
+    stats = _updater(opensearch).process([_event('C-1', 'acme'), _event('C-1', 'globex'), _event('C-2')])
+
+    assert stats.indexed == 3
+    assert set(opensearch.documents['cases-acme']) == {'acme:C-1'}
+    assert set(opensearch.documents['cases']) == {'globex:C-1', 'C-2'}
+    document = opensearch.documents['cases']['globex:C-1']
+    assert (document['case_id'], document['tenant_id']) == ('C-1', 'globex')
+
+
+def test_routed_alias_is_written_through(opensearch):
+    opensearch.indices.aliases['cases-acme'] = 'cases-acme-v3'
+
+    _updater(opensearch).process([_event('C-1', 'acme')])
+
+    assert set(opensearch.documents['cases-acme-v3']) == {'acme:C-1'}
+
+
+def test_unchanged_and_superseded_events_are_skipped(opensearch, bulk):
+    updater = _updater(opensearch)
+    updater.process([_event('C-1', 'acme')])
+
+    stats = updater.process([_event('C-1', 'acme'), _event('C-2', summary='old'), _event('C-2', summary='new')])
+
+    assert (stats.received, stats.unchanged, stats.indexed) == (3, 2, 1)
+    assert opensearch.documents['cases']['C-2']['complaint_summary'] == 'new'
+    assert [action['_id'] for action in bulk.calls[-1]] == ['C-2']
+
+
+def test_documents_are_versioned_by_write_time(opensearch, bulk):
+    _updater(opensearch, truncated_dimension=2).process([_event('C-1')])
+
+    action, = bulk.calls[0]
+    assert action['_version_type'] == 'external_gte'
+    assert action['_version'] > 1_600_000_000_000
+    assert action['_source']['embedding_2'] == pytest.approx([0.7071, 0.7071], abs=1e-4)
+
+
+def test_failures_are_dead_lettered_before_commit(opensearch, bulk, tmp_path):
+    events_path = tmp_path / 'events.jsonl'
+    events_path.write_text(''.join(json.dumps(_event(f'C-{n}')) + '\n' for n in range(3)))
+    dead_letter = tmp_path / 'events.jsonl.deadletter'
+    bulk.reject.add('C-1')
+    source = FileEventSource(str(events_path))
+
+    totals = _updater(opensearch, dead_letter=DeadLetterFile(str(dead_letter))).run(source)
+
+    assert (totals.indexed, totals.failed) == (2, 1)
+    assert [json.loads(line)['case_id'] for line in dead_letter.read_text().splitlines()] == ['C-1']
+    assert source.committed_offset == events_path.stat().st_size
+
+
+def test_failures_without_dead_letter_roll_back(opensearch, bulk, tmp_path):
+    events_path = tmp_path / 'events.jsonl'
+    events_path.write_text(json.dumps(_event('C-1')) + '\n')
+    bulk.reject.add('C-1')
+    source = FileEventSource(str(events_path))
+
+    _updater(opensearch).run(source)
+
+    assert source.offset == source.committed_offset == 0
+
+
+def test_zero_vector_embeddings_are_never_indexed(opensearch):
+    updater = IncrementalIndexUpdater(opensearch, 'cases', embed=lambda text: [0.0, 0.0])
+
+    stats = updater.process([_event('C-1')])
+
+    assert (stats.indexed, stats.failed) == (0, 1)
+    assert 'cases' not in opensearch.documents
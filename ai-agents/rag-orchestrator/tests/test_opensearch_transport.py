@@ -0,0 +1,98 @@
+"""OpenSearch transport config parsing, client construction and pool metrics"""
+
+import logging
+import queue
+from types import SimpleNamespace
+
+import opensearch_transport
+from opensearch_transport import PoolMetrics, TransportConfig, build_opensearch_client, connection_pool_stats
+
+
+def test_from_env_defaults():
+    config = TransportConfig.from_env({})
+
+    assert config.hosts == ['localhost:9200']
+    assert config.pool_maxsize == 256
+    assert (config.timeout_seconds, config.max_retries) == (5.0, 2)
+    assert config.use_ssl and config.http_compress and config.retry_on_timeout
+    assert config.sniffer_timeout is None
+
+
+def test_from_env_overrides():
+    config = TransportConfig.from_env({
+        'OPENSEARCH_ENDPOINT': 'node-a:9200, node-b:9200,',
+        'OPENSEARCH_POOL_MAXSIZE': '32',
+        'OPENSEARCH_TIMEOUT_SECONDS': '1.5',
+        'OPENSEARCH_MAX_RETRIES': '0',
+        'OPENSEARCH_HTTP_COMPRESS': 'off',
+        'OPENSEARCH_USE_SSL': 'no',
+        'OPENSEARCH_SNIFFER_TIMEOUT_SECONDS': '30',
+        'OPENSEARCH_CA_CERTS': '/etc/ca.pem',
+    })
+
+    assert config.hosts == ['node-a:9200', 'node-b:9200']
+    assert (config.pool_maxsize, config.timeout_seconds, config.max_retries) == (32, 1.5, 0)
+    assert not config.http_compress and not config.use_ssl
+    assert (config.sniffer_timeout, config.ca_certs) == (30.0, '/etc/ca.pem')
+
+
+def test_build_client_passes_pool_and_retry_settings(monkeypatch):
+    created = []
+    monkeypatch.setattr(opensearch_transport, 'OpenSearch', lambda **kwargs: created.append(kwargs) or kwargs)
+
+    build_opensearch_client(TransportConfig(hosts=['node-a:9200'], pool_maxsize=64, ca_certs='/etc/ca.pem'))
+
+    kwargs = created[0]
+    assert kwargs['pool_maxsize'] == 64
+    assert (kwargs['timeout'], kwargs['max_retries'], kwargs['retry_on_status']) == (5.0, 2, (502, 503, 504))
+    assert kwargs['http_compress'] is True
+    assert kwargs['ca_certs'] == '/etc/ca.pem'
+    assert 'sniffer_timeout' not in kwargs
+
+
+def _client_with_pool(available: int):
+    pool = SimpleNamespace(pool=queue.LifoQueue(), maxsize=4, num_connections=2, num_requests=9)
+    for _ in range(available):
+        pool.pool.put(None)
+    connection = SimpleNamespace(host='https://node-a:9200', pool=pool)
+    return SimpleNamespace(transport=SimpleNamespace(connection_pool=SimpleNamespace(connections=[connection])))
+
+
+def test_connection_pool_stats():
+    assert connection_pool_stats(_client_with_pool(3)) == [{
+        'host': 'https://node-a:9200',
+        'maxsize': 4,
+        'available_slots': 3,
+        'connections_opened': 2,
+        'requests': 9,
+    }]
+
+
+def test_pool_metrics_track_in_flight_and_peak():
+    metrics = PoolMetrics(report_interval_seconds=0)
+
+    with metrics.track():
+        with metrics.track():
+            assert metrics.snapshot()['in_flight'] == 2
+
+    assert metrics.snapshot() == {'in_flight': 0, 'peak_in_flight': 2, 'total_requests': 2}
+
+
+def test_pool_metrics_report_on_interval(monkeypatch, caplog):
+    now = [100.0]
+    monkeypatch.setattr('opensearch_transport.time.monotonic', lambda: now[0])
+    metrics = PoolMetrics(client=_client_with_pool(4), report_interval_seconds=60)
+    metrics._last_report = now[0]
+    caplog.set_level(logging.INFO, logger='opensearch_transport')
+
+    with metrics.track():
+        pass
+    assert not caplog.records
+
+    now[0] += 60
+    with metrics.track():
+        pass
+
+    record, = caplog.records
+    assert record.fields['opensearch_pool']['total_requests'] == 2
+    assert record.fields['opensearch_pool']['nodes'][0]['available_slots'] == 4
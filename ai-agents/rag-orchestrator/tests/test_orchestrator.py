@@ -0,0 +1,182 @@
+"""Lambda handler request validation and orchestrator behaviour against stubbed clients"""
+
+import json
+import logging
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+import orchestrator
+import structured_logging
+from models import HistoricalCase
+from token_accounting import TokenBudgetExceededError, TokenBudgets
+
+
+def _event(body, authorizer=None):
+    event = {'body': json.dumps(body)}
+    if authorizer is not None:
+        event['requestContext'] = {'authorizer': authorizer}
+    return event
+
+
+REQUEST = {'complainSummary': 'Charged twice', 'complaintId': 'C-1'}
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Replace the RAG pipeline with a recorder; returns the recorded calls"""
+    calls = []
+
+    def generate_recommendation(self, complaint_summary, complaint_id, **kwargs):
+        calls.append(kwargs)
+        raise RuntimeError('pipeline not under test')
+
+    monkeypatch.setattr(orchestrator.RAGOrchestrator, 'generate_recommendation', generate_recommendation)
+    return calls
+
+
+@pytest.mark.parametrize('authorizer', [
+    {'tenant_id': 'acme'},
+    {'lambda': {'tenant_id': 'acme'}},
+    {'claims': {'tenant_id': 'acme'}},
+    {'jwt': {'claims': {'tenant_id': 'acme'}}},
+])
+def test_tenant_comes_from_authorizer(generated, authorizer):
+    orchestrator.lambda_handler(_event(REQUEST, authorizer), None)
+
+    assert generated[0]['tenant_id'] == 'acme'
+
+
+def test_body_tenant_must_match_authorizer(generated):
+    response = orchestrator.lambda_handler(_event({**REQUEST, 'tenantId': 'globex'}, {'tenant_id': 'acme'}), None)
+
+    assert response['statusCode'] == 403
+    assert generated == []
+
+
+def test_body_tenant_without_authorizer_is_rejected(generated):
+    response = orchestrator.lambda_handler(_event({**REQUEST, 'tenantId': 'acme'}), None)
+
+    assert response['statusCode'] == 403
+
+
+def test_invalid_filters_return_400(generated):
+    response = orchestrator.lambda_handler(_event({**REQUEST, 'filters': {'region': ['west', 1]}}), None)
+
+    assert response['statusCode'] == 400
+    assert 'region' in json.loads(response['body'])['error']
+    assert generated == []
+
+
+def test_unknown_priority_is_rejected_before_any_work(monkeypatch):
+    rag = orchestrator.RAGOrchestrator()
+    monkeypatch.setattr(rag, '_generate_embedding', lambda text: pytest.fail('embedding should not run'))
+
+    with pytest.raises(ValueError):
+        rag.generate_recommendation('Charged twice', 'C-1', priority='urgent')
+
+
+def test_full_metadata_is_loaded_by_tenant_scoped_id(monkeypatch, opensearch):
+    opensearch.index_document('cases-acme', 'acme:H-1', {'metadata': {'audit_log': ['...']}})
+    monkeypatch.setattr(orchestrator.metadata_loader, 'client', opensearch)
+    monkeypatch.setattr(orchestrator.tenant_router, 'static_routes', {'acme': 'cases-acme'})
+    orchestrator.tenant_router.invalidate()
+    case = HistoricalCase('H-1', 'billing', 'refund', 'resolved', [], 0.9, {}, metadata_truncated=True)
+
+    assert orchestrator.RAGOrchestrator().load_full_metadata(case, tenant_id='acme') == {'audit_log': ['...']}
+    orchestrator.tenant_router.invalidate()
+
+
+def _prefetched(*embeddings):
+    future = Future()
+    future.set_result([
+        HistoricalCase(f'H-{n}', 'billing', 'refund', 'resolved', embedding, 7.5, {})
+        for n, embedding in enumerate(embeddings)
+    ])
+    return future
+
+
+def test_prefetched_candidates_are_reranked_by_cosine():
+    rag = orchestrator.RAGOrchestrator()
+    rag.speculative_min_score = 0.75
+
+    cases = rag._rerank_prefetched(_prefetched([0.0, 1.0], [1.0, 0.1], [1.0, 0.0]), [1.0, 0.0], top_k=2)
+
+    assert [case.case_id for case in cases] == ['H-2', 'H-1']
+    assert cases[0].similarity_score == pytest.approx(1.0)
+
+
+def test_prefetch_falls_back_to_knn_below_the_score_threshold():
+    rag = orchestrator.RAGOrchestrator()
+    rag.speculative_min_score = 0.75
+    # The second-best candidate is orthogonal to the query: (1 + 0) / 2 = 0.5
+    candidates = ([1.0, 0.0], [0.0, 1.0], [-1.0, 0.0])
+
+    assert rag._rerank_prefetched(_prefetched(*candidates), [1.0, 0.0], top_k=2) is None
+    assert rag._rerank_prefetched(_prefetched(*candidates), [1.0, 0.0], top_k=1) is not None
+
+
+def test_prefetch_falls_back_to_knn_without_enough_scorable_candidates():
+    rag = orchestrator.RAGOrchestrator()
+
+    # Wrong-dimension embeddings cannot be scored
+    assert rag._rerank_prefetched(_prefetched([1.0, 0.0], [1.0, 0.0, 0.0]), [1.0, 0.0], top_k=2) is None
+
+
+class SlowRecorder(logging.Handler):
+    """Listener-side handler that takes a while per record, like a backed-up stdout pipe"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(0.005)
+        self.records.append(record)
+
+
+def test_queued_records_are_written_before_the_handler_returns(generated, monkeypatch):
+    recorder = SlowRecorder()
+    monkeypatch.setattr(structured_logging._listener, 'handlers', (recorder,))
+    context = SimpleNamespace(aws_request_id='req-123')
+
+    response = orchestrator.lambda_handler(_event(REQUEST), context)
+
+    assert response['statusCode'] == 500
+    errors = [record for record in recorder.records if record.levelno == logging.ERROR]
+    assert errors and errors[-1].getMessage().startswith('Error in lambda_handler')
+    assert errors[-1].context['aws_request_id'] == 'req-123'
+    assert structured_logging._queue.unfinished_tasks == 0
+
+
+def test_token_budget_is_checked_before_embedding(monkeypatch):
+    budgets = TokenBudgets({'acme': 100}, report_interval_seconds=0)
+    budgets.charge('acme', 100)
+    monkeypatch.setattr(orchestrator, 'token_budgets', budgets)
+    rag = orchestrator.RAGOrchestrator()
+    monkeypatch.setattr(rag, '_generate_embedding', lambda text: pytest.fail('embedding should not run'))
+
+    with pytest.raises(TokenBudgetExceededError):
+        rag.generate_recommendation('Charged twice', 'C-1', tenant_id='acme')
+
+
+def test_admitted_model_is_used_for_the_bedrock_call(monkeypatch):
+    budgets = TokenBudgets({}, default_limit=100, action='downgrade', fallback_model_id='cheap.model',
+                           report_interval_seconds=0)
+    budgets.charge('acme', 100)
+    monkeypatch.setattr(orchestrator, 'token_budgets', budgets)
+    rag = orchestrator.RAGOrchestrator()
+    calls = []
+    monkeypatch.setattr(rag, '_generate_embedding', lambda text: [0.1, 0.2])
+    monkeypatch.setattr(rag, '_retrieve_similar_cases', lambda *args, **kwargs: [])
+    monkeypatch.setattr(rag, '_invoke_bedrock', lambda prompt, priority, model_id: calls.append(model_id) or (
+        '{"recommendations": [], "primary": "refund", "confidence": 0.5}', {'input_tokens': 10}
+    ))
+
+    recommendation = rag.generate_recommendation('Charged twice', 'C-1', tenant_id='acme')
+
+    assert calls == ['cheap.model']
+    assert recommendation.token_usage['model_id'] == 'cheap.model'
+    assert budgets.used('acme') == 110
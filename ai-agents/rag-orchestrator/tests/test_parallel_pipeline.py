@@ -0,0 +1,91 @@
+"""Process-pool batch runner: inline vs process execution, failure isolation and the CLI executor option"""
+
+import json
+import os
+
+import pytest
+
+import batch_inference
+import parallel_pipeline
+from batch_inference import BatchItem
+from case_metadata import MetadataPolicy
+from models import HistoricalCase
+from parallel_pipeline import ProcessPoolBatchRunner
+
+RESPONSE = '{"recommendations": [{"rank": 1, "resolution": "refund"}], "primary": "refund", "confidence": 0.9}'
+
+
+class StubOrchestrator:
+    metadata_policy = MetadataPolicy()
+
+    def _generate_embedding(self, text):
+        return [0.1, 0.2]
+
+    def _retrieve_similar_cases(self, embedding, top_k=5, tenant_id=None, filters=None):
+        return [HistoricalCase('H-1', 'billing', 'refund', 'resolved', embedding, 0.9, {'channel': 'phone'})]
+
+    def _call_bedrock_metered(self, prompt, priority=None, tenant_id=None, complaint_type=None):
+        if 'throttle' in prompt:
+            raise RuntimeError('throttled')
+        return RESPONSE, {'model_id': 'm', 'input_tokens': 10, 'output_tokens': 5}
+
+
+def crash_on_poison(chunk):
+    """Stands in for build_prompts_chunk; kills its worker process on a poisoned summary"""
+    if any(summary == 'poison' for summary, _ in chunk):
+        os._exit(1)
+    return [f"{summary} ({len(cases)} cases)" for summary, cases in chunk]
+
+
+def _items(*summaries):
+    return [BatchItem(f'C-{n}', summary) for n, summary in enumerate(summaries)]
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_inline_and_process_modes_produce_the_same_recommendations(processes):
+    runner = ProcessPoolBatchRunner(StubOrchestrator(), processes=processes, chunk_size=2)
+
+    results = runner.run(_items('a', 'b', 'c'))
+
+    assert set(results) == {'C-0', 'C-1', 'C-2'}
+    body = json.loads(results['C-1'])
+    assert (body['complaint_id'], body['primary_recommendation']) == ('C-1', 'refund')
+    assert set(body['stage_timings_ms']) == {'embed', 'retrieve', 'llm', 'parse'}
+    assert runner._cpu_pool is None
+
+
+def test_failed_bedrock_calls_are_dropped_per_item():
+    results = ProcessPoolBatchRunner(StubOrchestrator(), processes=0).run(_items('a', 'throttle', 'c'))
+
+    assert set(results) == {'C-0', 'C-2'}
+
+
+def test_dead_worker_drops_only_its_item_and_the_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(parallel_pipeline, 'build_prompts_chunk', crash_on_poison)
+    runner = ProcessPoolBatchRunner(StubOrchestrator(), processes=2, chunk_size=2, max_chunks_in_flight=1)
+
+    results = runner.run(_items('a', 'poison', 'c', 'd'))
+
+    # C-1 killed its worker alone; its chunk-mate and later chunks ran on the replacement pool
+    assert set(results) == {'C-0', 'C-2', 'C-3'}
+
+
+def test_cli_executor_runs_on_demand_without_batch_job_settings(tmp_path, monkeypatch):
+    import orchestrator
+
+    monkeypatch.setattr(orchestrator, 'RAGOrchestrator', StubOrchestrator)
+    input_path = tmp_path / 'complaints.jsonl'
+    input_path.write_text(''.join(
+        json.dumps({'complaintId': f'C-{n}', 'complainSummary': 'charged twice'}) + '\n' for n in range(3)
+    ))
+    output_path = tmp_path / 'recommendations.jsonl'
+
+    batch_inference.main(['--input', str(input_path), '--output', str(output_path), '--executor', 'thread'])
+
+    lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(line['complaint_id'] for line in lines) == ['C-0', 'C-1', 'C-2']
+
+
+def test_cli_requires_job_settings_for_batch_jobs(tmp_path):
+    with pytest.raises(SystemExit):
+        batch_inference.main(['--input', str(tmp_path / 'complaints.jsonl')])
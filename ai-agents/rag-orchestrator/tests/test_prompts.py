@@ -0,0 +1,37 @@
+"""Prompt rendering, the Bedrock request shape and LLM response parsing"""
+
+from models import HistoricalCase
+from prompts import EMPTY_RESPONSE, RECOMMENDATION_INSTRUCTIONS, build_recommendation_prompt, parse_llm_response
+
+import orchestrator
+
+
+def _case(case_id, score, metadata=None):
+    return HistoricalCase(case_id, 'billing', 'refund', 'resolved', [], score, metadata or {})
+
+
+def test_cases_render_by_similarity_then_id():
+    prompt = build_recommendation_prompt('Charged twice', [_case('B', 0.8), _case('C', 0.9), _case('A', 0.8)])
+
+    assert prompt.index('Case C') < prompt.index('Case A') < prompt.index('Case B')
+    assert prompt.endswith('CURRENT COMPLAINT:\nCharged twice')
+
+
+def test_metadata_fields_limit_rendered_details():
+    prompt = build_recommendation_prompt('x', [_case('A', 0.9, {'channel': 'phone', 'notes': 'long'})], ('channel',))
+
+    assert '"channel": "phone"' in prompt
+    assert 'notes' not in prompt
+
+
+def test_bedrock_request_sends_instructions_as_plain_system_prompt():
+    request = orchestrator.RAGOrchestrator()._build_bedrock_request('cases and complaint')
+
+    assert request['system'] == [{'type': 'text', 'text': RECOMMENDATION_INSTRUCTIONS}]
+    assert request['messages'][0]['content'][0]['text'] == 'cases and complaint'
+
+
+def test_parse_llm_response():
+    assert parse_llm_response('Sure: {"primary": "refund", "confidence": 0.9}') == {'primary': 'refund', 'confidence': 0.9}
+    assert parse_llm_response('no json here') == EMPTY_RESPONSE
+    assert parse_llm_response('{"primary": ') == EMPTY_RESPONSE
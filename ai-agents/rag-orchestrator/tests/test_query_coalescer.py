@@ -0,0 +1,104 @@
+"""kNN query coalescing: single-flight sharing, the result window, errors and counter reports"""
+
+import logging
+import threading
+import time
+
+import pytest
+
+import query_coalescer
+from query_coalescer import QueryCoalescer
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_queries_share_one_search():
+    coalescer = QueryCoalescer(report_interval_seconds=0)
+    release = threading.Event()
+    calls = []
+
+    def search():
+        calls.append(1)
+        release.wait(5)
+        return {'hits': {'hits': []}}
+
+    key = coalescer.key('cases', [0.1, 0.2], {'size': 5})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.run(key, search))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: coalescer.in_flight_hits == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    snapshot = coalescer.snapshot()
+    assert (snapshot['requests'], snapshot['searches'], snapshot['in_flight_hits']) == (5, 1, 4)
+    assert snapshot['hit_rate'] == pytest.approx(0.8)
+    assert snapshot['in_flight'] == 0
+
+
+def test_result_window_is_off_by_default():
+    coalescer = QueryCoalescer.from_env({})
+    key = coalescer.key('cases', [0.1], {})
+
+    coalescer.run(key, lambda: 'first')
+
+    assert coalescer.window_seconds == 0
+    assert coalescer.run(key, lambda: 'second') == 'second'
+    assert coalescer.searches == 2
+
+
+def test_result_window_shares_recent_results():
+    coalescer = QueryCoalescer.from_env({'KNN_COALESCE_WINDOW_MS': '60000'})
+    key = coalescer.key('cases', [0.1], {})
+
+    coalescer.run(key, lambda: 'first')
+
+    assert coalescer.run(key, lambda: 'second') == 'first'
+    assert (coalescer.searches, coalescer.window_hits) == (1, 1)
+
+
+def test_errors_are_not_shared_with_later_callers():
+    coalescer = QueryCoalescer(window_seconds=60)
+    key = coalescer.key('cases', [0.1], {})
+
+    def fail():
+        raise TimeoutError('search timed out')
+
+    with pytest.raises(TimeoutError):
+        coalescer.run(key, fail)
+    assert coalescer.run(key, lambda: 'retried') == 'retried'
+
+
+def test_keys_distinguish_index_body_and_quantized_vector():
+    coalescer = QueryCoalescer(quantum=0.01)
+
+    assert coalescer.key('a', [0.101], {}) == coalescer.key('a', [0.099], {})
+    assert coalescer.key('a', [0.1], {}) != coalescer.key('b', [0.1], {})
+    assert coalescer.key('a', [0.1], {'size': 5}) != coalescer.key('a', [0.1], {'size': 10})
+    assert QueryCoalescer().key('a', [0.101], {}) != QueryCoalescer().key('a', [0.099], {})
+
+
+def test_counters_are_reported_on_the_interval(monkeypatch, caplog):
+    now = [1000.0]
+    monkeypatch.setattr(query_coalescer.time, 'monotonic', lambda: now[0])
+    coalescer = QueryCoalescer(report_interval_seconds=60)
+    key = coalescer.key('cases', [0.1], {})
+
+    with caplog.at_level(logging.INFO, logger='query_coalescer'):
+        coalescer.run(key, lambda: 'result')
+        assert not caplog.records
+        now[0] += 60
+        coalescer.run(key, lambda: 'result')
+
+    record, = caplog.records
+    # The report includes the request that triggered it
+    assert record.fields['knn_coalescer']['searches'] == 2
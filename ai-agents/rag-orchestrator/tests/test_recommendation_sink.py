@@ -0,0 +1,126 @@
+"""Recommendation sink: row flattening, flush thresholds, failed writes and the percentile query"""
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from models import HistoricalCase, ResolutionRecommendation
+import recommendation_sink
+from recommendation_sink import RecommendationSink, query_percentiles, recommendation_to_row
+
+
+@pytest.fixture(autouse=True)
+def close_sinks(monkeypatch):
+    """Close every sink a test creates, so none is left for the exit hook"""
+    sinks = []
+    monkeypatch.setattr(recommendation_sink.atexit, 'register', sinks.append)
+    yield
+    for close in sinks:
+        close()
+
+
+def _recommendation(n: int, processing_ms: float = 100.0) -> ResolutionRecommendation:
+    case = HistoricalCase('H-1', 'billing', 'refund', 'resolved', [0.1] * 4, 0.9, {'channel': 'phone'})
+    return ResolutionRecommendation(
+        id=f'rec-{n}',
+        complaint_id=f'C-{n}',
+        recommendations=[{'rank': 1}],
+        primary_recommendation='refund',
+        confidence_score=0.8,
+        cited_cases=(case,),
+        reasoning='',
+        created_at='2026-01-01T00:00:00',
+        processing_time_ms=processing_ms,
+        stage_timings_ms={'embed': 10.0, 'llm': processing_ms - 10, 'parse': 1.0},
+        token_usage={'model_id': 'm', 'input_tokens': 100, 'output_tokens': 20, 'cost_usd': 0.001},
+    )
+
+
+def test_row_drops_embeddings_and_keeps_timings_and_usage():
+    row = recommendation_to_row(_recommendation(1), tenant_id='acme')
+
+    assert row['cited_case_ids'] == ['H-1']
+    assert row['cited_similarity_scores'] == [0.9]
+    assert (row['embed_ms'], row['parse_ms'], row['retrieve_ms']) == (10.0, 1.0, None)
+    assert (row['tenant_id'], row['input_tokens'], row['cost_usd']) == ('acme', 100, 0.001)
+    assert 'embedding' not in row and 'metadata' not in row
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_round_trip_through_query_percentiles(tmp_path, file_format):
+    sink = RecommendationSink(str(tmp_path), file_format=file_format, max_rows=1000, background=False)
+    for n in range(1, 101):
+        sink.write(_recommendation(n, processing_ms=float(n)), tenant_id='acme' if n <= 50 else 'globex')
+    path = sink.flush()
+
+    assert path.endswith(f'.{file_format}') and '/dt=' in path and '/hour=' in path
+    results = query_percentiles(str(tmp_path), file_format=file_format)
+    assert results['rows'] == 100
+    assert results['processing_time_ms']['p50'] == pytest.approx(50.5)
+    assert results['parse_ms'] == {'p50': 1.0, 'p90': 1.0, 'p95': 1.0, 'p99': 1.0}
+    assert results['retrieve_ms'] == {}
+    assert query_percentiles(str(tmp_path), file_format=file_format, tenant_id='acme')['rows'] == 50
+
+
+def test_inline_flush_on_row_count(tmp_path):
+    sink = RecommendationSink(str(tmp_path), max_rows=3, background=False)
+    for n in range(3):
+        sink.write(_recommendation(n))
+
+    assert sink._rows == []
+    assert query_percentiles(str(tmp_path))['rows'] == 3
+
+
+def test_flush_if_due_on_age(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('recommendation_sink.time.monotonic', lambda: now[0])
+    sink = RecommendationSink(str(tmp_path), max_age_seconds=5, background=False)
+
+    sink.write(_recommendation(1))
+    sink.flush_if_due()
+    assert len(sink._rows) == 1
+
+    now[0] += 5
+    sink.flush_if_due()
+    assert sink._rows == []
+
+
+def test_failed_write_requeues_rows_up_to_bound(tmp_path, monkeypatch):
+    sink = RecommendationSink(str(tmp_path), max_rows=100, max_buffered_rows=3, background=False)
+    for n in range(2):
+        sink.write(_recommendation(n))
+
+    def fail(rows):
+        raise OSError('bucket unavailable')
+
+    monkeypatch.setattr(sink, '_write_rows', fail)
+    with pytest.raises(OSError):
+        sink.flush()
+    assert [row['id'] for row in sink._rows] == ['rec-0', 'rec-1']
+
+    sink.write(_recommendation(2))
+    sink.write(_recommendation(3))
+    with pytest.raises(OSError):
+        sink.flush()
+    # Only the newest max_buffered_rows survive
+    assert [row['id'] for row in sink._rows] == ['rec-1', 'rec-2', 'rec-3']
+    monkeypatch.undo()
+
+
+def test_from_env_flushes_inline_with_short_age_in_lambda(tmp_path):
+    sink = RecommendationSink.from_env({'RECOMMENDATION_SINK_URI': str(tmp_path), 'AWS_LAMBDA_FUNCTION_NAME': 'recs'})
+
+    assert sink._thread is None
+    assert sink.max_age_seconds == 5
+    assert RecommendationSink.from_env({}) is None
+
+
+def test_background_thread_flushes_and_close_writes_the_rest(tmp_path):
+    sink = RecommendationSink(str(tmp_path), max_rows=2)
+    for n in range(3):
+        sink.write(_recommendation(n))
+
+    sink.close()
+
+    assert sink._rows == []
+    assert query_percentiles(str(tmp_path))['rows'] == 3
@@ -0,0 +1,87 @@
+"""Response JSON shape of the slotted result types, with and without orjson"""
+
+import dataclasses
+import json
+
+import pytest
+
+import serialization
+from models import HistoricalCase, ResolutionRecommendation
+from serialization import dumps, recommendation_to_dict
+
+# Keys of the original (asdict-based) response body; clients rely on these
+BASE_RECOMMENDATION_KEYS = {
+    'id', 'complaint_id', 'recommendations', 'primary_recommendation', 'confidence_score',
+    'cited_cases', 'reasoning', 'created_at', 'processing_time_ms',
+}
+BASE_CASE_KEYS = {'case_id', 'complaint_type', 'resolution', 'outcome', 'embedding', 'similarity_score', 'metadata'}
+# Keys added since, additive for clients
+ADDED_RECOMMENDATION_KEYS = {'stage_timings_ms', 'token_usage'}
+ADDED_CASE_KEYS = {'metadata_truncated'}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    elif serialization.orjson is None:
+        pytest.skip('orjson not installed')
+    return request.param
+
+
+def _recommendation() -> ResolutionRecommendation:
+    cases = [
+        HistoricalCase('H-1', 'billing', 'refund', 'resolved', [0.25, -0.5], 0.91, {'channel': 'phone'}),
+        HistoricalCase('H-2', 'billing', 'credit', 'resolved', [0.5, 0.125], 0.87, {}, metadata_truncated=True),
+    ]
+    return ResolutionRecommendation.from_llm_output(
+        'rec-1', 'C-1',
+        {'recommendations': [{'rank': 1, 'resolution': 'refund'}], 'primary': 'refund', 'confidence': 0.9,
+         'reasoning': 'H-1 matches'},
+        cases, 123.4, {'embed': 10.0}, {'model_id': 'm', 'input_tokens': 100},
+    )
+
+
+def test_response_keeps_original_keys_and_adds_only_known_ones(backend):
+    body = json.loads(dumps(_recommendation()))
+
+    assert set(body) == BASE_RECOMMENDATION_KEYS | ADDED_RECOMMENDATION_KEYS
+    assert isinstance(body['cited_cases'], list)
+    for case in body['cited_cases']:
+        assert set(case) == BASE_CASE_KEYS | ADDED_CASE_KEYS
+
+
+def test_round_trip_matches_asdict(backend):
+    recommendation = _recommendation()
+
+    body = json.loads(dumps(recommendation))
+
+    expected = dataclasses.asdict(recommendation)
+    expected['cited_cases'] = [dataclasses.asdict(case) for case in recommendation.cited_cases]
+    assert body == expected
+    assert body['cited_cases'][1]['metadata_truncated'] is True
+
+
+def test_backends_agree_on_lists_of_results(monkeypatch):
+    results = [_recommendation(), _recommendation()]
+    with_default = json.loads(dumps(results))
+    monkeypatch.setattr(serialization, 'orjson', None)
+
+    assert json.loads(dumps(results)) == with_default
+    assert len(with_default) == 2
+
+
+def test_dict_view_shares_nested_values():
+    recommendation = _recommendation()
+
+    view = recommendation_to_dict(recommendation)
+
+    assert view['cited_cases'][0]['embedding'] is recommendation.cited_cases[0].embedding
+    assert view['stage_timings_ms'] is recommendation.stage_timings_ms
+
+
+def test_result_types_are_frozen():
+    case = _recommendation().cited_cases[0]
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        case.similarity_score = 0.0
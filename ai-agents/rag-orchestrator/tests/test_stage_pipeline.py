@@ -0,0 +1,136 @@
+"""Staged pipeline: stage order, failure isolation, the bottleneck and the recommendation stages"""
+
+import argparse
+import json
+import threading
+import time
+
+import pytest
+
+import batch_inference
+from batch_inference import BatchItem, parse_stage_workers, run_staged
+from bedrock_scheduler import PRIORITY_BACKFILL
+from models import HistoricalCase, ResolutionRecommendation
+from prompts import parse_llm_response
+from stage_pipeline import PipelineItem, Stage, StagedPipeline
+
+RESPONSE = '{"recommendations": [{"rank": 1, "resolution": "refund"}], "primary": "refund", "confidence": 0.9}'
+
+
+class StubOrchestrator:
+    def __init__(self):
+        self.priorities = []
+
+    def _generate_embedding(self, text):
+        if text == 'fail':
+            raise RuntimeError('embedding throttled')
+        return [0.1, 0.2]
+
+    def _retrieve_similar_cases(self, embedding, top_k=5, tenant_id=None, filters=None):
+        return [HistoricalCase('H-1', 'billing', 'refund', 'resolved', embedding, 0.9, {})]
+
+    def _build_recommendation_prompt(self, summary, cases):
+        return f"{summary} ({len(cases)} cases)"
+
+    def _call_bedrock_metered(self, prompt, priority=None, tenant_id=None, complaint_type=None):
+        self.priorities.append(priority)
+        return RESPONSE, {'model_id': 'm', 'input_tokens': 10, 'output_tokens': 5}
+
+    def _parse_llm_response(self, text):
+        return parse_llm_response(text)
+
+    def _build_recommendation(self, complaint_id, parsed, cases, processing_time, timings, token_usage=None):
+        return ResolutionRecommendation.from_llm_output(
+            f"rec-{complaint_id}", complaint_id, parsed, cases, processing_time, timings, token_usage
+        )
+
+
+def _items(*summaries):
+    return [PipelineItem(f'C-{n}', summary) for n, summary in enumerate(summaries)]
+
+
+def test_each_item_passes_the_stages_in_order():
+    seen = {}
+    lock = threading.Lock()
+
+    def record(name):
+        def fn(item):
+            with lock:
+                seen.setdefault(item.complaint_id, []).append(name)
+        return fn
+
+    pipeline = StagedPipeline([Stage(name, record(name), workers=3, queue_size=2) for name in ('a', 'b', 'c')])
+
+    finished = pipeline.run(_items(*'xyzw' * 5))
+
+    assert len(finished) == 20
+    assert all(order == ['a', 'b', 'c'] for order in seen.values())
+    assert all(list(item.stage_timings) == ['a', 'b', 'c'] for item in finished)
+
+
+def test_a_failed_item_skips_later_stages_without_stopping_others():
+    def explode(item):
+        if item.complaint_summary == 'bad':
+            raise ValueError('unparseable')
+
+    later = []
+    pipeline = StagedPipeline([Stage('first', explode), Stage('second', later.append)])
+
+    finished = {item.complaint_id: item for item in pipeline.run(_items('ok', 'bad', 'ok'))}
+
+    assert finished['C-1'].error == 'first: unparseable'
+    assert [item.complaint_id for item in later] == ['C-0', 'C-2']
+    metrics = pipeline.metrics()
+    assert (metrics['first']['processed'], metrics['first']['failed']) == (3, 1)
+    assert metrics['second']['processed'] == 2
+
+
+def test_bottleneck_is_the_busiest_stage():
+    pipeline = StagedPipeline([
+        Stage('fast', lambda item: None),
+        Stage('slow', lambda item: time.sleep(0.01)),
+        Stage('medium', lambda item: time.sleep(0.002)),
+    ])
+
+    pipeline.run(_items(*'abcde'))
+
+    assert pipeline.bottleneck() == 'slow'
+    assert pipeline.metrics()['slow']['avg_ms'] >= 10
+
+
+def test_recommendation_stages_keep_the_parse_timing():
+    lines = run_staged(StubOrchestrator(), [BatchItem('C-1', 'charged twice'), BatchItem('C-2', 'fail')])
+
+    body, = (json.loads(line) for line in lines)
+    assert body['complaint_id'] == 'C-1'
+    assert set(body['stage_timings_ms']) == {'embed', 'retrieve', 'prompt', 'llm', 'parse'}
+
+
+def test_staged_runs_use_backfill_priority():
+    orchestrator = StubOrchestrator()
+
+    run_staged(orchestrator, [BatchItem('C-1', 'charged twice')], workers={'llm': 2})
+
+    assert orchestrator.priorities == [PRIORITY_BACKFILL]
+
+
+def test_cli_staged_executor(tmp_path, monkeypatch):
+    import orchestrator
+
+    monkeypatch.setattr(orchestrator, 'RAGOrchestrator', StubOrchestrator)
+    input_path = tmp_path / 'complaints.jsonl'
+    input_path.write_text(json.dumps({'complaintId': 'C-1', 'complainSummary': 'charged twice'}) + '\n')
+    output_path = tmp_path / 'recommendations.jsonl'
+
+    batch_inference.main([
+        '--input', str(input_path), '--output', str(output_path), '--executor', 'staged', '--stage-workers', 'llm=4',
+    ])
+
+    assert json.loads(output_path.read_text())['complaint_id'] == 'C-1'
+
+
+def test_parse_stage_workers():
+    assert parse_stage_workers('llm=32, embed=8') == {'llm': 32, 'embed': 8}
+    assert parse_stage_workers('') == {}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_stage_workers('llm')
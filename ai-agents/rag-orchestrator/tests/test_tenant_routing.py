@@ -0,0 +1,107 @@
+"""Tenant routing: settings cache bounds/TTLs and knn filter validation"""
+
+import pytest
+
+from tenant_routing import InvalidFilterError, TenantRouter, build_knn_filter, validate_filters
+
+
+class StubSettingsClient:
+    def __init__(self, documents=None, fail=False):
+        self.documents = documents or {}
+        self.fail = fail
+        self.gets = []
+
+    def get(self, index, id, ignore=None):
+        self.gets.append(id)
+        if self.fail:
+            raise ConnectionError('settings index unavailable')
+        if id in self.documents:
+            return {'found': True, '_source': self.documents[id]}
+        return {'found': False}
+
+
+def test_static_route_and_settings_index():
+    client = StubSettingsClient({'acme': {'index': 'cases-acme', 'top_k': 8}})
+    router = TenantRouter(client, 'cases', settings_index='tenants', static_routes={'globex': 'cases-globex'})
+
+    assert router.resolve('globex').index == 'cases-globex'
+    acme = router.resolve('acme')
+    assert (acme.index, acme.top_k, acme.filters) == ('cases-acme', 8, {})
+    assert client.gets == ['acme']
+
+
+def test_unknown_tenant_shares_default_index_with_tenant_filter():
+    router = TenantRouter(StubSettingsClient(), 'cases', settings_index='tenants')
+
+    settings = router.resolve('initech')
+
+    assert settings.index == 'cases'
+    assert settings.filters == {'tenant_id': 'initech'}
+
+
+def test_settings_are_cached_until_ttl(monkeypatch):
+    client = StubSettingsClient()
+    router = TenantRouter(client, 'cases', settings_index='tenants', ttl_seconds=300, error_ttl_seconds=5)
+    now = [1000.0]
+    monkeypatch.setattr('tenant_routing.time.monotonic', lambda: now[0])
+
+    router.resolve('acme')
+    router.resolve('acme')
+    assert client.gets == ['acme']
+
+    now[0] += 301
+    router.resolve('acme')
+    assert client.gets == ['acme', 'acme']
+
+
+def test_settings_error_is_cached_briefly(monkeypatch):
+    client = StubSettingsClient(fail=True)
+    router = TenantRouter(client, 'cases', settings_index='tenants', ttl_seconds=300, error_ttl_seconds=5)
+    now = [1000.0]
+    monkeypatch.setattr('tenant_routing.time.monotonic', lambda: now[0])
+
+    assert router.resolve('acme').index == 'cases'
+    now[0] += 6
+    router.resolve('acme')
+
+    assert client.gets == ['acme', 'acme']
+
+
+def test_cache_is_bounded_lru():
+    client = StubSettingsClient()
+    router = TenantRouter(client, 'cases', settings_index='tenants', max_entries=2)
+
+    router.resolve('a')
+    router.resolve('b')
+    router.resolve('a')  # refreshes a; b is now least recently used
+    router.resolve('c')
+
+    assert list(router._cache) == ['a', 'c']
+    router.resolve('b')
+    assert client.gets == ['a', 'b', 'c', 'b']
+
+
+def test_build_knn_filter():
+    knn_filter = build_knn_filter({'region': ['west', 'east'], 'tenant_id': 'acme'})
+
+    assert knn_filter == {'bool': {'filter': [
+        {'terms': {'region': ['east', 'west']}},
+        {'term': {'tenant_id': 'acme'}},
+    ]}}
+    assert build_knn_filter({}) is None
+
+
+@pytest.mark.parametrize('filters', [
+    {'region': ['west', 1]},
+    {'region': [{'nested': 'object'}]},
+    {'region': None},
+    {'region': []},
+    ['region', 'west'],
+])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(InvalidFilterError):
+        validate_filters(filters)
+
+
+def test_numeric_filters_are_accepted():
+    validate_filters({'priority': [1, 2.5], 'escalated': True})
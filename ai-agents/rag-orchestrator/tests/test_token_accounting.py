@@ -0,0 +1,109 @@
+"""Token accounting: pricing, rolling aggregation, tenant budgets and their periodic reports"""
+
+import logging
+
+import pytest
+
+import token_accounting
+from token_accounting import ModelPricing, TokenBudgetExceededError, TokenBudgets, UsageAggregator
+
+HAIKU = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls time.time() and time.monotonic() in token_accounting"""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(token_accounting.time, 'time', lambda: now[0])
+    monkeypatch.setattr(token_accounting.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_usage_record_prices_input_output_and_cache_tokens():
+    pricing = ModelPricing({'m': (0.003, 0.015)})
+
+    record = pricing.usage_record('m', {
+        'input_tokens': 1000, 'output_tokens': 200,
+        'cache_read_input_tokens': 2000, 'cache_creation_input_tokens': 400,
+    })
+
+    assert record['total_tokens'] == 3600
+    # 1000 * 0.003 + 400 * 0.003 * 1.25 + 2000 * 0.003 * 0.1 + 200 * 0.015, per 1K tokens
+    assert record['cost_usd'] == pytest.approx((3.0 + 1.5 + 0.6 + 3.0) / 1000)
+    assert pricing.usage_record('m', {'input_tokens': 1000}, price_factor=0.5)['cost_usd'] == pytest.approx(0.0015)
+
+
+def test_pricing_lookup_and_overrides():
+    pricing = ModelPricing.from_env({'BEDROCK_PRICING': '{"custom.model": [1, 2]}'})
+
+    assert pricing.price(f'us.{HAIKU}') == pricing.price(HAIKU)
+    assert pricing.price('custom.model') == (1.0, 2.0)
+    assert pricing.usage_record('unknown.model', {'input_tokens': 10})['cost_usd'] is None
+
+
+def test_aggregator_groups_sorts_and_evicts_old_buckets(clock):
+    aggregator = UsageAggregator(window_seconds=120, bucket_seconds=60, report_interval_seconds=0)
+    pricing = ModelPricing()
+
+    aggregator.record(HAIKU, 'billing', pricing.usage_record(HAIKU, {'input_tokens': 1000, 'output_tokens': 100}))
+    aggregator.record(HAIKU, 'billing', pricing.usage_record(HAIKU, {'input_tokens': 3000, 'output_tokens': 100}))
+    aggregator.record(HAIKU, None, pricing.usage_record(HAIKU, {'input_tokens': 100}))
+
+    billing, unknown = aggregator.snapshot()
+    assert (billing['complaint_type'], billing['calls'], billing['total_tokens']) == ('billing', 2, 4200)
+    assert billing['avg_tokens_per_call'] == 2100
+    assert unknown['complaint_type'] == 'unknown'
+
+    clock[0] += 60
+    aggregator.record(HAIKU, 'billing', pricing.usage_record(HAIKU, {'input_tokens': 10}))
+    assert aggregator.snapshot()[0]['calls'] == 3
+    clock[0] += 150
+    assert aggregator.snapshot()[0]['calls'] == 1
+
+
+def test_budget_rejects_until_the_window_refills(clock):
+    budgets = TokenBudgets({'acme': 1000}, window_seconds=3600, report_interval_seconds=0)
+    clock[0] = 3600 * 100 + 600  # ten minutes into a window
+
+    budgets.charge('acme', 1200)
+    with pytest.raises(TokenBudgetExceededError) as error:
+        budgets.admit('acme', HAIKU)
+    assert error.value.retry_after == 3000
+    assert budgets.admit('globex', HAIKU) == HAIKU
+
+    clock[0] += 3000
+    assert budgets.used('acme') == 0
+    assert budgets.admit('acme', HAIKU) == HAIKU
+    budgets.charge('acme', 10)
+    assert budgets.snapshot()['acme'] == {'used': 10, 'limit': 1000}
+
+
+def test_budget_downgrade_and_default_limit():
+    budgets = TokenBudgets({}, default_limit=100, action='downgrade', fallback_model_id=HAIKU)
+
+    budgets.charge('acme', 100)
+
+    assert budgets.admit('acme', 'big.model') == HAIKU
+    assert budgets.admit('globex', 'big.model') == 'big.model'
+    with pytest.raises(ValueError):
+        TokenBudgets({}, action='downgrade')
+    assert TokenBudgets.from_env({}) is None
+
+
+def test_aggregates_and_budgets_are_reported_on_the_interval(clock, caplog):
+    aggregator = UsageAggregator(report_interval_seconds=300)
+    budgets = TokenBudgets({'acme': 1000}, report_interval_seconds=300)
+    usage = ModelPricing().usage_record(HAIKU, {'input_tokens': 2000})
+
+    with caplog.at_level(logging.INFO, logger='token_accounting'):
+        aggregator.record(HAIKU, 'billing', usage)
+        budgets.charge('acme', 2000)
+        assert not caplog.records
+        clock[0] += 300
+        aggregator.record(HAIKU, 'billing', usage)
+        budgets.charge('acme', 1)
+
+    usage_record, budget_record = caplog.records
+    assert usage_record.fields['token_usage'][0]['calls'] == 2
+    assert budget_record.fields['token_budgets'] == {'acme': {'used': 2001, 'limit': 1000}}
+    assert 'over_budget=1' in budget_record.getMessage()
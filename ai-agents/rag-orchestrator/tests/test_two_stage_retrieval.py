@@ -0,0 +1,103 @@
+"""Two-stage retrieval: truncation, client-side rescoring and the server-side rescore query"""
+
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import orchestrator
+from models import HistoricalCase
+from two_stage_retrieval import knn_rescore, rescore_cases, rescored_similarity, truncate_embedding
+
+
+def _case(case_id, embedding, score=0.0):
+    return HistoricalCase(case_id, 'billing', 'refund', 'resolved', embedding, score, {})
+
+
+def test_truncate_embedding_renormalizes_the_prefix():
+    assert truncate_embedding([3.0, 4.0, 12.0], 2) == pytest.approx([0.6, 0.8])
+    assert truncate_embedding([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+
+def test_rescore_cases_ranks_by_full_vector_cosine():
+    cases = [_case('a', [0.0, 1.0]), _case('b', [1.0, 1.0]), _case('c', [1.0, 0.0])]
+
+    ranked = rescore_cases([1.0, 0.0], cases, top_k=2)
+
+    assert [case.case_id for case in ranked] == ['c', 'b']
+    assert ranked[0].similarity_score == pytest.approx(1.0)
+    assert ranked[1].similarity_score == pytest.approx((1 + np.sqrt(0.5)) / 2)
+
+
+def test_unscorable_candidates_are_logged(caplog):
+    cases = [_case('a', [1.0, 0.0]), _case('b', []), _case('c', [1.0, 0.0, 0.0])]
+
+    with caplog.at_level(logging.WARNING, logger='two_stage_retrieval'):
+        ranked = rescore_cases([1.0, 0.0], cases, top_k=3)
+
+    assert [case.case_id for case in ranked] == ['a']
+    assert '2 of 3 candidates' in caplog.text
+
+
+def test_knn_rescore_clause():
+    clause = knn_rescore([0.1, 0.2], window_size=100)
+
+    assert clause['window_size'] == 100
+    assert clause['query']['query_weight'] == 0.0
+    script = clause['query']['rescore_query']['script_score']['script']
+    assert (script['source'], script['lang']) == ('knn_score', 'knn')
+    assert script['params'] == {'field': 'embedding', 'query_value': [0.1, 0.2], 'space_type': 'cosinesimil'}
+    # 1 + cosine -> (1 + cosine) / 2
+    assert rescored_similarity(2.0) == 1.0 and rescored_similarity(1.0) == 0.5
+
+
+@pytest.fixture
+def search_bodies(monkeypatch):
+    """Record search bodies; hits come back with knn_score-scale scores"""
+    bodies = []
+
+    def search(index, body):
+        bodies.append(body)
+        hits = [
+            {'_score': 1.8 - n * 0.1, '_source': {'case_id': f'H-{n}', 'complaint_type': 'billing',
+                                                  'resolution': 'refund', 'outcome': 'resolved',
+                                                  'embedding': [1.0, float(n), 0.0, 0.0]}}
+            for n in range(body['size'])
+        ]
+        return {'hits': {'hits': hits}}
+
+    monkeypatch.setattr(orchestrator, 'opensearch_client', SimpleNamespace(search=search))
+    return bodies
+
+
+def _two_stage(mode):
+    rag = orchestrator.RAGOrchestrator()
+    rag.truncated_dimension, rag.two_stage_candidates, rag.two_stage_rescore = 2, 20, mode
+    return rag
+
+
+def test_server_rescore_returns_only_top_k(search_bodies):
+    cases = _two_stage('server')._knn_search('cases', {}, [1.0, 0.0, 0.0, 0.0], top_k=3, two_stage=True)
+
+    body, = search_bodies
+    assert body['size'] == 3
+    assert body['query']['knn']['embedding_2']['k'] == 20
+    assert body['rescore']['window_size'] == 20
+    assert [case.similarity_score for case in cases] == pytest.approx([0.9, 0.85, 0.8])
+
+
+def test_client_rescore_fetches_candidates_and_rescores_locally(search_bodies):
+    cases = _two_stage('client')._knn_search('cases', {}, [1.0, 0.0, 0.0, 0.0], top_k=3, two_stage=True)
+
+    body, = search_bodies
+    assert body['size'] == 20 and 'rescore' not in body
+    assert [case.case_id for case in cases] == ['H-0', 'H-1', 'H-2']
+    assert cases[0].similarity_score == pytest.approx(1.0)
+
+
+def test_unknown_rescore_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv('TWO_STAGE_RESCORE', 'gpu')
+
+    with pytest.raises(ValueError):
+        orchestrator.RAGOrchestrator()
@@ -0,0 +1,182 @@
+"""
+Rate-limit-aware Transport for the Jira Client
+requests.Session subclass that retries throttled and failed calls
+
+- Honors Retry-After and X-RateLimit-Remaining / X-RateLimit-Reset
+- Exponential backoff with full jitter when the server gives no hint
+- Adaptive concurrency limit (AIMD): grows while calls succeed, halves
+  on every 429 so bulk creation settles at the rate Jira allows
+
+Non-idempotent calls (issue-creating POSTs) are only retried on 429/503,
+which Jira returns before doing any work, so retries never duplicate issues.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+IDEMPOTENT_POST_SUFFIXES = ("/issue/bulkfetch", "/search/jql")  # Read-only POST endpoints
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to retry"""
+    max_retries: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 60.0
+    rejected_statuses: frozenset = frozenset({429, 503})  # Request was not processed
+    transient_statuses: frozenset = frozenset({500, 502, 504})  # Request may have been processed
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as delay-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """X-RateLimit-Reset as an ISO-8601 timestamp (Jira Cloud) or epoch seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value) - time.time())
+    except ValueError:
+        pass
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a shared cool-down after throttling"""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """Additive increase: about +1 slot per limit's worth of successful calls"""
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self, delay: float) -> None:
+        """Multiplicative decrease, and hold every caller back for `delay` seconds"""
+        with self._cond:
+            self.throttled += 1
+            # Concurrent 429s from one burst count as a single congestion signal
+            if time.monotonic() >= self.paused_until:
+                self.limit = max(self.minimum, self.limit / 2)
+            self.pause(delay)
+
+    def record_retry(self) -> None:
+        with self._cond:
+            self.retries += 1
+
+    def pause(self, delay: float) -> None:
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+
+class RateLimitedSession(requests.Session):
+    """Session whose every request goes through the limiter and retry policy"""
+
+    def __init__(self, limiter: Optional[AdaptiveLimiter] = None, policy: Optional[RetryPolicy] = None):
+        super().__init__()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.policy = policy or RetryPolicy()
+
+    def request(self, method, url, *args, **kwargs):
+        idempotent = method.upper() in IDEMPOTENT_METHODS or (
+            method.upper() == "POST" and url.endswith(IDEMPOTENT_POST_SUFFIXES)
+        )
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.policy.max_retries:
+                    raise
+                response = None
+            finally:
+                self.limiter.release()
+
+            if response is not None:
+                self._observe_quota(response)
+                retryable = response.status_code in self.policy.rejected_statuses or (
+                    idempotent and response.status_code in self.policy.transient_statuses
+                )
+                if not retryable or attempt >= self.policy.max_retries:
+                    if response.status_code < 400:
+                        self.limiter.on_success()
+                    return response
+
+            delay = self.policy.backoff(attempt)
+            if response is not None and response.status_code in self.policy.rejected_statuses:
+                delay = _parse_retry_after(response.headers.get("Retry-After")) or delay
+                self.limiter.on_throttle(delay)
+
+            self.limiter.record_retry()
+            status = response.status_code if response is not None else "connection error"
+            print(f"↻ {method} {url.rsplit('/rest/api/3', 1)[-1]} got {status}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def _observe_quota(self, response) -> None:
+        """Pause ahead of a 429 when Jira reports the quota is exhausted"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.strip() == "0":
+            delay = _parse_reset(response.headers.get("X-RateLimit-Reset"))
+            if delay:
+                self.limiter.pause(delay)
@@ -0,0 +1,113 @@
+"""Local mock Jira Cloud server for the ticket tooling tests"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class MockJira:
+    """In-memory issues plus a request log; summaries in `reject` fail validation"""
+
+    def __init__(self):
+        self.issues = {}
+        self.requests = []
+        self.reject = set()
+        self.bulk_status = None  # e.g. 400 to fail whole bulk requests
+        self.lock = threading.Lock()
+
+    def create(self, fields):
+        if fields["summary"] in self.reject:
+            return None
+        with self.lock:
+            key = f"SCRUM-{len(self.issues) + 1}"
+            self.issues[key] = fields
+        return {"id": key.split("-")[1], "key": key}
+
+
+def _handler(jira):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None):
+            data = b"" if body is None else json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        def do_POST(self):
+            body = self._body()
+            with jira.lock:
+                jira.requests.append(("POST", self.path, body))
+
+            if self.path.endswith("/issue/bulk"):
+                if jira.bulk_status:
+                    return self._send(jira.bulk_status, {"errorMessages": ["Bulk create failed"]})
+                issues, errors = [], []
+                for number, update in enumerate(body["issueUpdates"]):
+                    created = jira.create(update["fields"])
+                    if created:
+                        issues.append(created)
+                    else:
+                        errors.append({
+                            "status": 400,
+                            "failedElementNumber": number,
+                            "elementErrors": {"errors": {"summary": "rejected"}},
+                        })
+                return self._send(201, {"issues": issues, "errors": errors})
+
+            if self.path.endswith("/issue/bulkfetch"):
+                keys = body["issueIdsOrKeys"]
+                if len(keys) > 100:
+                    return self._send(400, {"errorMessages": ["Too many issues"]})
+                return self._send(200, {
+                    "issues": [{"key": key, "fields": {}} for key in keys if key in jira.issues],
+                    "issueErrors": [f"Issue {key} does not exist" for key in keys if key not in jira.issues],
+                })
+
+            self._send(404, {"errorMessages": ["Not found"]})
+
+        def do_PUT(self):
+            body = self._body()
+            key = self.path.rsplit("/", 1)[-1]
+            with jira.lock:
+                jira.requests.append(("PUT", self.path, body))
+            if key not in jira.issues:
+                return self._send(404, {"errorMessages": ["Issue does not exist"]})
+            jira.issues[key].update(body["fields"])
+            self._send(204)
+
+    return Handler
+
+
+@pytest.fixture
+def mock_jira():
+    jira = MockJira()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(jira))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    jira.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield jira
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def creator(mock_jira):
+    from create_jira_tickets import JiraTicketCreator
+
+    return JiraTicketCreator(cloud_id="test", base_url=mock_jira.base_url, api_token="token")
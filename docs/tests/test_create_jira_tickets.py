@@ -0,0 +1,83 @@
+"""Bulk creation and hierarchy scheduling against the local mock Jira server"""
+
+
+def ticket(key, ticket_type, parent=None):
+    return {
+        "key": key,
+        "type": ticket_type,
+        "name": f"{ticket_type} {key}",
+        "description": f"Description of {key}",
+        "parent": parent,
+        "priority": "P1",
+        "story_points": 3 if ticket_type == "Story" else 0,
+    }
+
+
+TICKETS = [
+    ticket("EPIC-1", "Epic"),
+    ticket("FEAT-1", "Feature", "EPIC-1"),
+    ticket("FEAT-2", "Feature", "EPIC-1"),
+    ticket("STORY-1", "Story", "FEAT-1"),
+    ticket("STORY-2", "Story", "FEAT-1"),
+    ticket("STORY-3", "Story", "FEAT-2"),
+]
+
+
+def bulk_requests(mock_jira):
+    return [body for method, path, body in mock_jira.requests if path.endswith("/issue/bulk")]
+
+
+def test_bulk_keeps_input_order_around_failed_elements(creator, mock_jira):
+    mock_jira.reject = {"Story b", "Story d"}
+    fields = [creator.ticket_fields(ticket(name, "Story")) for name in "abcde"]
+
+    keys = creator.create_issues_bulk(fields)
+
+    assert keys == ["SCRUM-1", None, "SCRUM-2", None, "SCRUM-3"]
+    assert [mock_jira.issues[key]["summary"] for key in keys if key] == ["Story a", "Story c", "Story e"]
+
+
+def test_bulk_request_failure_returns_no_keys(creator, mock_jira):
+    mock_jira.bulk_status = 400
+
+    assert creator.create_issues_bulk([creator.ticket_fields(ticket("a", "Story"))]) == [None]
+
+
+def test_hierarchy_links_children_to_created_parents(creator, mock_jira):
+    result = creator.create_hierarchy(TICKETS)
+
+    assert sorted(result.created) == sorted(t["key"] for t in TICKETS)
+    assert not result.failed and not result.skipped
+    for item in TICKETS:
+        fields = mock_jira.issues[result.created[item["key"]]]
+        expected_parent = result.created.get(item["parent"]) if item["parent"] else None
+        assert fields.get("customfield_10020") == expected_parent
+
+
+def test_hierarchy_creates_siblings_together_after_their_parent(creator, mock_jira):
+    creator.create_hierarchy(TICKETS)
+
+    batches = [
+        sorted(update["fields"]["summary"] for update in body["issueUpdates"])
+        for body in bulk_requests(mock_jira)
+    ]
+    assert batches[0] == ["Epic EPIC-1"]
+    assert batches[1] == ["Feature FEAT-1", "Feature FEAT-2"]
+    assert sorted(batches[2:]) == [["Story STORY-1", "Story STORY-2"], ["Story STORY-3"]]
+
+
+def test_hierarchy_respects_batch_size(creator, mock_jira):
+    creator.create_hierarchy(TICKETS, batch_size=1)
+
+    assert all(len(body["issueUpdates"]) == 1 for body in bulk_requests(mock_jira))
+    assert len(mock_jira.issues) == len(TICKETS)
+
+
+def test_failed_ticket_skips_only_its_subtree(creator, mock_jira):
+    mock_jira.reject = {"Feature FEAT-1"}
+
+    result = creator.create_hierarchy(TICKETS)
+
+    assert result.failed == ["FEAT-1"]
+    assert sorted(result.skipped) == ["STORY-1", "STORY-2"]
+    assert sorted(result.created) == ["EPIC-1", "FEAT-2", "STORY-3"]
@@ -0,0 +1,102 @@
+"""Ticket spec loading/validation, streaming CSV export and priority mapping"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from JIRA_TICKETS import CSV_HEADER, generate_csv, write_csv
+from create_jira_tickets import PRIORITY_NAMES
+from ticket_spec import CSV_COLUMNS, SPEC_PATH, load_spec, ticket_hash
+
+
+def _ticket(key, **fields):
+    return {"type": "Story", "key": key, "name": f"Ticket {key}", "description": "Do it\n", "status": "To Do",
+            **fields}
+
+
+def _write_spec(tmp_path, tickets):
+    path = tmp_path / "tickets.json"
+    path.write_text(json.dumps(tickets))
+    return str(path)
+
+
+def test_shipped_spec_loads_and_validates():
+    spec = load_spec()
+
+    assert spec.tickets == json.load(open(SPEC_PATH))
+    assert set(spec.hashes) == {ticket["key"] for ticket in spec.tickets}
+
+
+def test_spec_is_read_from_json_on_every_load(tmp_path):
+    path = _write_spec(tmp_path, [_ticket("A", type="Epic")])
+    first = load_spec(path)
+
+    _write_spec(tmp_path, [_ticket("A", type="Epic", name="Renamed")])
+    second = load_spec(path)
+
+    assert second.tickets[0]["name"] == "Renamed"
+    assert second.source_hash != first.source_hash
+    assert second.hashes["A"] != first.hashes["A"]
+    assert not (tmp_path / ".ticket_cache").exists()
+
+
+@pytest.mark.parametrize("tickets, message", [
+    ([_ticket("A", status="")], "missing status"),
+    ([_ticket("A", type="Bug")], "unknown type"),
+    ([_ticket("A", parent="NOPE")], "unknown parent"),
+    ([_ticket("A"), _ticket("A")], "Duplicate"),
+    ([_ticket("A", parent="B"), _ticket("B", parent="A")], "cycle"),
+])
+def test_invalid_specs_are_rejected(tmp_path, tickets, message):
+    with pytest.raises(ValueError, match=message):
+        load_spec(_write_spec(tmp_path, tickets))
+
+
+def test_ticket_hash_covers_only_synced_fields():
+    ticket = _ticket("A", priority="P1")
+
+    assert ticket_hash({**ticket, "status": "Done", "assignee": "someone"}) == ticket_hash(ticket)
+    assert ticket_hash({**ticket, "description": "Do it"}) == ticket_hash(ticket)
+    assert ticket_hash({**ticket, "priority": "P0"}) != ticket_hash(ticket)
+
+
+def test_csv_export_round_trips_quotes_commas_and_line_breaks():
+    tricky = _ticket("A", name='Say "hi", twice', description="Line one\nLine two, with comma\n", priority="P1")
+    buffer = io.StringIO(newline="")
+
+    assert write_csv([tricky, _ticket("B", parent="A")], buffer) == 2
+
+    header, first, second = csv.reader(io.StringIO(buffer.getvalue(), newline=""))
+    assert header == CSV_COLUMNS and ",".join(header) == CSV_HEADER
+    assert first[3:5] == ['Say "hi", twice', "Line one\nLine two, with comma"]
+    assert (first[6], second[2], second[6]) == ("P1", "A", "P0")
+
+
+def test_csv_export_streams_its_input():
+    consumed = []
+
+    def tickets():
+        for key in "ABC":
+            consumed.append(key)
+            yield _ticket(key)
+
+    buffer = io.StringIO(newline="")
+
+    assert write_csv(tickets(), buffer) == 3
+    assert consumed == ["A", "B", "C"]
+    assert write_csv(iter(()), io.StringIO()) == 0
+
+
+def test_generate_csv_covers_the_shipped_spec():
+    rows = list(csv.reader(io.StringIO(generate_csv(), newline="")))
+
+    assert [row[1] for row in rows[1:]] == [ticket["key"] for ticket in load_spec().tickets]
+
+
+def test_spec_priorities_map_to_jira_names(creator):
+    fields = creator.ticket_fields(_ticket("A", priority="P2"))
+
+    assert fields["priority"] == {"name": PRIORITY_NAMES["P2"]} == {"name": "Low"}
+    assert "priority" not in creator.ticket_fields(_ticket("B"))
@@ -0,0 +1,48 @@
+"""Existence checks and idempotent re-runs against the local mock Jira server"""
+
+from ticket_sync import TicketSync
+
+
+def ticket(key, ticket_type="Story", parent=None, name=None):
+    return {
+        "key": key,
+        "type": ticket_type,
+        "name": name or f"{ticket_type} {key}",
+        "description": f"Description of {key}",
+        "parent": parent,
+        "priority": "P2",
+        "story_points": 0,
+    }
+
+
+def test_existing_issue_keys_batches_bulkfetch_and_ignores_missing(creator, mock_jira):
+    created = creator.create_issues_bulk([creator.ticket_fields(ticket(str(n))) for n in range(150)])
+    del mock_jira.issues[created[3]]
+
+    found = creator.existing_issue_keys(created + ["SCRUM-9999"])
+
+    assert found == set(created) - {created[3]}
+    fetches = [body for method, path, body in mock_jira.requests if path.endswith("/issue/bulkfetch")]
+    assert [len(body["issueIdsOrKeys"]) for body in fetches] == [100, 51]
+
+
+def test_sync_rerun_only_updates_changed_and_recreates_deleted(creator, mock_jira, tmp_path):
+    tickets = [ticket("EPIC-1", "Epic"), ticket("STORY-1", parent="EPIC-1"), ticket("STORY-2", parent="EPIC-1")]
+    state = str(tmp_path / "state.json")
+
+    first_sync = TicketSync(creator, state)
+    assert len(first_sync.sync(tickets).created) == 3
+    keys = {ref: entry["key"] for ref, entry in first_sync.state.entries.items()}
+
+    del mock_jira.issues[keys["STORY-2"]]
+    tickets[1] = ticket("STORY-1", parent="EPIC-1", name="Renamed story")
+
+    second_sync = TicketSync(creator, state)
+    report = second_sync.sync(tickets)
+
+    assert report.created == ["STORY-2"]
+    assert report.updated == ["STORY-1"]
+    assert report.unchanged == ["EPIC-1"]
+    recreated = second_sync.state.entries["STORY-2"]["key"]
+    assert mock_jira.issues[recreated]["customfield_10020"] == keys["EPIC-1"]
+    assert mock_jira.issues[keys["STORY-1"]]["summary"] == "Renamed story"
@@ -0,0 +1,131 @@
+"""
+Dependency-aware Ticket Graph Scheduler
+Creates a ticket hierarchy as a DAG where each ticket depends on its parent
+
+- Tickets are declared as data (type, key, parent, ...) instead of a
+  hand-written call sequence
+- A bounded worker pool starts a ticket's children as soon as its Jira key
+  resolves, independently of unrelated branches
+- When a ticket fails, only the subtree under it is skipped
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class TicketNode:
+    """One ticket in the graph; `parent` is the ref of the ticket it depends on"""
+    ref: str
+    ticket: Dict
+    parent: Optional[str] = None
+    children: List[str] = field(default_factory=list)
+
+
+@dataclass
+class GraphResult:
+    """Outcome of a scheduler run, keyed by ticket ref"""
+    created: Dict[str, str] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+
+class TicketGraph:
+    """Ticket declarations indexed by ref, with parent -> children edges
+
+    `resolved` maps refs that already exist in Jira to their keys; tickets
+    whose parent is resolved start immediately under that key.
+    """
+
+    def __init__(self, tickets: List[Dict], resolved: Optional[Dict[str, str]] = None):
+        self.resolved = resolved or {}
+        self.nodes: Dict[str, TicketNode] = {}
+        for ticket in tickets:
+            if ticket["key"] in self.nodes:
+                raise ValueError(f"Duplicate ticket key: {ticket['key']}")
+            self.nodes[ticket["key"]] = TicketNode(ticket["key"], ticket, ticket.get("parent") or None)
+
+        for node in self.nodes.values():
+            if node.parent is None or (node.parent in self.resolved and node.parent not in self.nodes):
+                continue
+            if node.parent not in self.nodes:
+                raise ValueError(f"Ticket {node.ref} has unknown parent {node.parent}")
+            self.nodes[node.parent].children.append(node.ref)
+
+        self._check_acyclic()
+
+    def roots(self) -> List[str]:
+        """Tickets with no parent in the graph (top-level, or under a resolved parent)"""
+        return [ref for ref, node in self.nodes.items() if node.parent not in self.nodes]
+
+    def subtree(self, ref: str) -> List[str]:
+        """All descendants of `ref` (excluding itself)"""
+        descendants = []
+        stack = list(self.nodes[ref].children)
+        while stack:
+            child = stack.pop()
+            descendants.append(child)
+            stack.extend(self.nodes[child].children)
+        return descendants
+
+    def _check_acyclic(self) -> None:
+        reachable = set(self.roots())
+        for root in self.roots():
+            reachable.update(self.subtree(root))
+        cyclic = sorted(set(self.nodes) - reachable)
+        if cyclic:
+            raise ValueError(f"Ticket parent cycle involving: {', '.join(cyclic)}")
+
+
+# A batch is a list of (node, resolved parent key); the callback returns one key (or None) per node
+CreateBatch = Callable[[List[Tuple[TicketNode, Optional[str]]]], List[Optional[str]]]
+
+
+class DagScheduler:
+    """Runs a TicketGraph on a bounded pool, creating siblings together in batches"""
+
+    def __init__(self, create_batch: CreateBatch, workers: int = 8, batch_size: int = 50):
+        self.create_batch = create_batch
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def run(self, graph: TicketGraph) -> GraphResult:
+        result = GraphResult()
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            def submit(refs: List[str], parent_key: Optional[str]) -> None:
+                for i in range(0, len(refs), self.batch_size):
+                    batch = [(graph.nodes[ref], parent_key) for ref in refs[i:i + self.batch_size]]
+                    pending[executor.submit(self.create_batch, batch)] = batch
+
+            by_parent = {}
+            for ref in graph.roots():
+                by_parent.setdefault(graph.resolved.get(graph.nodes[ref].parent), []).append(ref)
+            for parent_key, refs in by_parent.items():
+                submit(refs, parent_key)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    try:
+                        keys = future.result()
+                    except Exception as e:
+                        print(f"✗ Batch of {len(batch)} tickets failed: {str(e)}")
+                        keys = [None] * len(batch)
+
+                    for (node, _), jira_key in zip(batch, keys):
+                        if jira_key:
+                            result.created[node.ref] = jira_key
+                            if node.children:
+                                submit(node.children, jira_key)
+                        else:
+                            result.failed.append(node.ref)
+                            skipped = graph.subtree(node.ref)
+                            if skipped:
+                                print(f"⚠ Skipping {len(skipped)} tickets under failed {node.ref}")
+                            result.skipped.extend(skipped)
+
+        return result
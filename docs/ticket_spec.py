@@ -0,0 +1,89 @@
+"""
+Compiled Ticket Spec
+Single source of truth for the SmartResolve epics, features and stories
+
+- jira_tickets.json declares every ticket once (type, key, parent, ...)
+- Every load parses and validates the JSON directly; the spec is small
+  enough that caching the parsed result buys nothing
+- Per-ticket hashes of the synced fields let the REST sync path update
+  only tickets that changed
+
+Both JIRA_TICKETS.py (CSV import) and create_jira_tickets.py (REST) load
+their tickets from here.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ticket_graph import TicketGraph
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jira_tickets.json")
+
+CSV_COLUMNS = ["Type", "Key", "Parent", "Name", "Description", "Status", "Priority", "Assignee", "Story Points"]
+TICKET_TYPES = {"Epic", "Feature", "Story"}
+REQUIRED_FIELDS = ("type", "key", "name", "description", "status")
+
+# Ticket fields that are pushed to Jira; a change in any of them triggers an update
+SYNCED_FIELDS = ("type", "name", "description", "parent", "priority", "story_points")
+
+
+def ticket_hash(ticket: Dict) -> str:
+    """Stable hash of the synced fields of a ticket declaration"""
+    content = {name: ticket.get(name) for name in SYNCED_FIELDS}
+    content["description"] = (content["description"] or "").strip()
+    canonical = json.dumps(content, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def csv_row(ticket: Dict) -> List:
+    """One CSV import row for a ticket, in CSV_COLUMNS order"""
+    return [
+        ticket["type"],
+        ticket["key"],
+        ticket.get("parent", ""),
+        ticket["name"],
+        ticket["description"].strip(),
+        ticket["status"],
+        ticket.get("priority", "P0"),
+        ticket.get("assignee", ""),
+        ticket.get("story_points", 0),
+    ]
+
+
+@dataclass
+class CompiledSpec:
+    """Parsed tickets plus per-ticket hashes of their synced fields"""
+    source_hash: str
+    tickets: List[Dict]
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+
+def validate(tickets: List[Dict]) -> None:
+    """Reject malformed tickets, unknown parents and cycles"""
+    for ticket in tickets:
+        missing = [name for name in REQUIRED_FIELDS if not ticket.get(name)]
+        if missing:
+            raise ValueError(f"Ticket {ticket.get('key', '?')} is missing {', '.join(missing)}")
+        if ticket["type"] not in TICKET_TYPES:
+            raise ValueError(f"Ticket {ticket['key']} has unknown type {ticket['type']}")
+    TicketGraph(tickets)
+
+
+def compile_spec(source: bytes) -> CompiledSpec:
+    """Parse and validate the spec and hash each ticket's synced fields"""
+    tickets = json.loads(source)
+    validate(tickets)
+
+    compiled = CompiledSpec(source_hash=hashlib.sha256(source).hexdigest(), tickets=tickets)
+    for ticket in tickets:
+        compiled.hashes[ticket["key"]] = ticket_hash(ticket)
+    return compiled
+
+
+def load_spec(path: str = SPEC_PATH) -> CompiledSpec:
+    """Read, parse and validate the spec at `path`"""
+    with open(path, "rb") as f:
+        return compile_spec(f.read())
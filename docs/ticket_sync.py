@@ -0,0 +1,118 @@
+"""
+Idempotent Jira Ticket Sync
+Re-runnable alternative to create_tickets that never duplicates issues
+
+- A local state file maps each ticket ref (EPIC-001, STORY-004, ...) to its
+  Jira key, a content hash and the parent key it was linked under
+- One bulk fetch (/issue/bulkfetch) confirms which recorded issues still exist
+- Only new tickets are created and only changed tickets are updated, so an
+  unchanged re-run costs a single API call
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ticket_spec import ticket_hash
+
+
+@dataclass
+class SyncReport:
+    """Refs touched by one sync run"""
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+
+class SyncState:
+    """ref -> {"key", "hash", "parent_key"}, persisted as JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def record(self, ref: str, key: str, digest: str, parent_key: str = None) -> None:
+        self.entries[ref] = {"key": key, "hash": digest, "parent_key": parent_key}
+
+    def save(self) -> None:
+        """Write atomically so an interrupted run never leaves a truncated state file"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class TicketSync:
+    """Brings Jira in line with a list of ticket declarations"""
+
+    def __init__(self, creator, state_path: str = "jira_sync_state.json"):
+        self.creator = creator
+        self.state = SyncState(state_path)
+
+    def sync(self, tickets: List[Dict], hashes: Optional[Dict[str, str]] = None) -> SyncReport:
+        """Create/update what changed; `hashes` (ref -> ticket_hash) can come from a compiled spec"""
+        report = SyncReport()
+
+        existing = self.creator.existing_issue_keys([entry["key"] for entry in self.state.entries.values()])
+        if existing is None:
+            print("✗ Could not verify existing issues; aborting sync to avoid duplicates")
+            return report
+
+        # Refs whose issue was deleted in Jira are treated as new
+        keys = {ref: entry["key"] for ref, entry in self.state.entries.items() if entry["key"] in existing}
+        hashes = hashes or {ticket["key"]: ticket_hash(ticket) for ticket in tickets}
+
+        to_create = [ticket for ticket in tickets if ticket["key"] not in keys]
+        if to_create:
+            result = self.creator.create_hierarchy(to_create, resolved=dict(keys))
+            keys.update(result.created)
+            for ticket in to_create:
+                ref = ticket["key"]
+                if ref in result.created:
+                    self.state.record(ref, keys[ref], hashes[ref], keys.get(ticket.get("parent")))
+                    report.created.append(ref)
+                else:
+                    report.failed.append(ref)
+            self.state.save()
+
+        to_update = []
+        for ticket in tickets:
+            ref = ticket["key"]
+            if ref in report.created or ref in report.failed:
+                continue
+            entry = self.state.entries[ref]
+            parent_key = keys.get(ticket.get("parent"))
+            # A recreated parent has a new key, so its children need relinking too
+            if entry["hash"] == hashes[ref] and entry.get("parent_key") == parent_key:
+                report.unchanged.append(ref)
+            else:
+                to_update.append((ticket, parent_key))
+
+        if to_update:
+            with ThreadPoolExecutor(max_workers=self.creator.pool_size) as executor:
+                results = executor.map(
+                    lambda item: self.creator.update_issue(
+                        keys[item[0]["key"]], self.creator.ticket_fields(item[0], item[1])
+                    ),
+                    to_update,
+                )
+                for (ticket, parent_key), ok in zip(to_update, results):
+                    ref = ticket["key"]
+                    if ok:
+                        self.state.record(ref, keys[ref], hashes[ref], parent_key)
+                        report.updated.append(ref)
+                    else:
+                        report.failed.append(ref)
+            self.state.save()
+
+        print(
+            f"✓ Sync complete: {len(report.created)} created, {len(report.updated)} updated, "
+            f"{len(report.unchanged)} unchanged, {len(report.failed)} failed"
+        )
+        return report